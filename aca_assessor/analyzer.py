@@ -1,26 +1,92 @@
 """
 Analyzer module for ACA compatibility assessment.
 """
-from typing import Dict, List, Any
+import hashlib
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Tuple
 from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn
+from . import quantity
+from .models import Deployment, AnalysisResult
+from .parallel import ordered_map
+from .profiling import get_profiler
+from .rules import RuleEngine, merge_rules
+
+if TYPE_CHECKING:
+    from rich.table import Table
 
 console = Console()
 
+# Minimum number of seconds between progress bar updates
+PROGRESS_INTERVAL = 0.1
+
+# Analyzer used by each worker process in parallel mode, set once per process
+_worker_analyzer: Optional['ACAAnalyzer'] = None
+
+
+def _init_worker(analyzer: 'ACAAnalyzer'):
+    """Store the analyzer in a worker process so it is not re-sent with every chunk."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_chunk(chunk: List[Deployment]) -> List[AnalysisResult]:
+    """Analyze a chunk of deployments in a worker process."""
+    return [_worker_analyzer.analyze_deployment(deployment) for deployment in chunk]
+
+
 class ACAAnalyzer:
-    def __init__(self):
+    def __init__(self, workers: int = 1, chunk_size: int = 500, constraints: Dict[str, Any] = None,
+                 rules: List[Dict[str, Any]] = None, disabled_rules: List[str] = None,
+                 template_cache_size: int = 4096):
+        # Number of processes used to analyze deployments in parallel
+        self.workers = max(1, workers)
+        # Number of deployments sent to a worker process at a time
+        self.chunk_size = max(1, chunk_size)
         # ACA limitations and constraints
         self.aca_constraints = {
             'max_memory': '16Gi',
             'max_cpu': '4',
             'supported_volume_types': ['secret', 'configmap'],
             'max_replicas': 30,
-            'supported_protocols': ['TCP', 'HTTP', 'HTTPS']
+            'supported_protocols': ['TCP', 'HTTP', 'HTTPS'],
+            'unsupported_kinds': ['DaemonSet', 'StatefulSet'],
+            'supported_service_types': ['ClusterIP', 'LoadBalancer'],
+            'max_exposed_ports': 1,
+            'max_ingress_backends': 1
         }
-
-    def analyze_deployments(self, deployments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if constraints:
+            self.aca_constraints.update(constraints)
+        # Built-in rules plus custom rules from the configuration file
+        self.rule_specs = merge_rules(rules, disabled_rules)
+        self.rule_engine = self._compile_rules()
+        # Results memoized per pod template fingerprint, least recently used first
+        self.template_cache_size = max(0, template_cache_size)
+        self._templates: 'OrderedDict[Tuple[Any, ...], AnalysisResult]' = OrderedDict()
+
+    def _compile_rules(self) -> RuleEngine:
+        """Compile the rule specs against the current constraints."""
+        converters = {'cpu': quantity.cpu_cores, 'memory': quantity.memory_gib}
+        return RuleEngine(self.rule_specs, self.aca_constraints, converters)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compiled rules hold closures, so worker processes recompile them from the specs
+        state = self.__dict__.copy()
+        del state['rule_engine']
+        # Each worker process builds its own template cache
+        del state['_templates']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.rule_engine = self._compile_rules()
+        self._templates = OrderedDict()
+
+    def analyze_deployments(self, deployments: List[Deployment]) -> List[AnalysisResult]:
         """Analyze deployments for ACA compatibility."""
+        from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn
+
         analysis_results = []
         
         with Progress(
@@ -31,129 +97,119 @@ class ACAAnalyzer:
             console=console
         ) as progress:
             task = progress.add_task("[yellow]Analyzing deployments...", total=len(deployments))
+            last_update = 0.0
             
-            for deployment in deployments:
-                progress.update(task, description=f"[yellow]Analyzing {deployment['namespace']}/{deployment['name']}")
-                
-                analysis = {
-                    'name': deployment['name'],
-                    'namespace': deployment['namespace'],
-                    'compatibility_issues': [],
-                    'recommendations': [],
-                    'compatibility_score': 100  # Start with perfect score and deduct based on issues
-                }
-
-                # Analyze each aspect
-                self._analyze_resources(deployment, analysis)
-                self._analyze_volumes(deployment, analysis)
-                self._analyze_networking(deployment, analysis)
-                self._analyze_scaling(deployment, analysis)
-
-                # Calculate final score
-                analysis['compatibility_score'] = max(0, analysis['compatibility_score'])
+            for analysis in self.iter_analysis(deployments):
                 analysis_results.append(analysis)
-                
-                progress.advance(task)
+
+                # Redrawing for every deployment dominates large runs, so updates are rate-limited
+                now = time.monotonic()
+                if now - last_update >= PROGRESS_INTERVAL:
+                    progress.update(task, completed=len(analysis_results),
+                                    description=f"[yellow]Analyzing {analysis.namespace}/{analysis.name}")
+                    last_update = now
+
+            progress.update(task, completed=len(analysis_results), description="[yellow]Analyzed deployments")
 
         return analysis_results
 
-    def _analyze_resources(self, deployment: Dict[str, Any], analysis: Dict[str, Any]):
-        """Analyze resource requirements."""
-        for container in deployment['containers']:
-            resources = container['resources']
-            
-            # Check CPU limits
-            if 'limits' in resources and 'cpu' in resources['limits']:
-                cpu_limit = self._convert_cpu_to_cores(resources['limits']['cpu'])
-                if cpu_limit > 4:
-                    analysis['compatibility_issues'].append(
-                        f"Container '{container['name']}' CPU limit ({resources['limits']['cpu']}) exceeds ACA maximum (4 cores)"
-                    )
-                    analysis['recommendations'].append(
-                        f"Reduce CPU limit for container '{container['name']}' to 4 cores or less"
-                    )
-                    analysis['compatibility_score'] -= 15
-
-            # Check memory limits
-            if 'limits' in resources and 'memory' in resources['limits']:
-                memory_limit = self._convert_memory_to_gi(resources['limits']['memory'])
-                if memory_limit > 16:
-                    analysis['compatibility_issues'].append(
-                        f"Container '{container['name']}' memory limit ({resources['limits']['memory']}) exceeds ACA maximum (16Gi)"
-                    )
-                    analysis['recommendations'].append(
-                        f"Reduce memory limit for container '{container['name']}' to 16Gi or less"
-                    )
-                    analysis['compatibility_score'] -= 15
-
-    def _analyze_volumes(self, deployment: Dict[str, Any], analysis: Dict[str, Any]):
-        """Analyze volume configurations."""
-        for volume in deployment['volumes']:
-            if volume['type'] not in self.aca_constraints['supported_volume_types']:
-                analysis['compatibility_issues'].append(
-                    f"Volume type '{volume['type']}' is not supported in ACA"
-                )
-                analysis['recommendations'].append(
-                    f"Consider using Azure Storage or other cloud storage solutions for persistent storage needs"
-                )
-                analysis['compatibility_score'] -= 10
-
-    def _analyze_networking(self, deployment: Dict[str, Any], analysis: Dict[str, Any]):
-        """Analyze networking configuration."""
-        for container in deployment['containers']:
-            for port in container['ports']:
-                if port['protocol'] not in self.aca_constraints['supported_protocols']:
-                    analysis['compatibility_issues'].append(
-                        f"Protocol '{port['protocol']}' is not supported in ACA"
-                    )
-                    analysis['recommendations'].append(
-                        f"Consider using HTTP/HTTPS or TCP for container '{container['name']}'"
-                    )
-                    analysis['compatibility_score'] -= 10
-
-    def _analyze_scaling(self, deployment: Dict[str, Any], analysis: Dict[str, Any]):
-        """Analyze scaling configuration."""
-        if deployment['replicas'] > self.aca_constraints['max_replicas']:
-            analysis['compatibility_issues'].append(
-                f"Deployment replica count ({deployment['replicas']}) exceeds ACA maximum ({self.aca_constraints['max_replicas']})"
-            )
-            analysis['recommendations'].append(
-                "Consider reducing max replicas or splitting the service"
+    def iter_analysis(self, deployments: Iterable[Deployment]) -> Iterator[AnalysisResult]:
+        """Analyze deployments lazily, yielding each result, in input order, as soon as it is ready."""
+        if self.workers > 1:
+            yield from self._iter_parallel(deployments)
+            return
+        for deployment in deployments:
+            yield self.analyze_deployment(deployment)
+
+    def _iter_parallel(self, deployments: Iterable[Deployment]) -> Iterator[AnalysisResult]:
+        """Analyze deployments in chunks across a process pool, preserving input order."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        iterator = iter(deployments)
+        chunks = iter(lambda: list(islice(iterator, self.chunk_size)), [])
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self,)) as executor:
+            for _, results in ordered_map(executor, _analyze_chunk, chunks, window=self.workers * 2):
+                yield from results
+
+    def analyze_deployment(self, deployment: Deployment) -> AnalysisResult:
+        """Analyze a single deployment for ACA compatibility."""
+        # Plain dict records are still accepted and converted once
+        deployment = Deployment.from_dict(deployment)
+
+        # Copies of the same pod template share one evaluation
+        profiler = get_profiler()
+        with profiler.phase('fingerprint'):
+            fingerprint = self.rule_engine.fingerprint(deployment)
+        template = self._templates.get(fingerprint)
+        profiler.count('template_cache_misses' if template is None else 'template_cache_hits')
+        if template is None:
+            template = self._evaluate(deployment, fingerprint)
+            if self.template_cache_size:
+                self._templates[fingerprint] = template
+                if len(self._templates) > self.template_cache_size:
+                    self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(fingerprint)
+
+        return AnalysisResult(
+            deployment.name,
+            deployment.namespace,
+            list(template.compatibility_issues),
+            list(template.recommendations),
+            template.compatibility_score,
+            list(template.rule_ids),
+            template.template,
+            deployment.cluster,
+            deployment.kind
+        )
+
+    def apply_usage(self, analysis_results: Iterable[AnalysisResult],
+                    usage: Dict[Tuple[str, str, str], Dict[str, Any]]) -> Iterator[AnalysisResult]:
+        """
+        Add observed usage and a right-sizing recommendation to the results of sampled workloads.
+        Results are copied rather than changed, so cached results never carry a stale sample.
+        """
+        for result in analysis_results:
+            profile = usage.get((result.namespace, result.kind, result.name))
+            if profile is None:
+                yield result
+                continue
+            yield AnalysisResult(
+                result.name,
+                result.namespace,
+                list(result.compatibility_issues),
+                list(result.recommendations) + [profile['recommendation']],
+                result.compatibility_score,
+                list(result.rule_ids),
+                result.template,
+                result.cluster,
+                result.kind,
+                profile
             )
-            analysis['compatibility_score'] -= 10
-
-    def _convert_cpu_to_cores(self, cpu: str) -> float:
-        """Convert CPU string to number of cores."""
-        try:
-            if cpu.endswith('m'):
-                return float(cpu[:-1]) / 1000
-            return float(cpu)
-        except ValueError:
-            return 0
-
-    def _convert_memory_to_gi(self, memory: str) -> float:
-        """Convert memory string to GiB."""
-        try:
-            num = float(''.join(filter(str.isdigit, memory)))
-            unit = ''.join(filter(str.isalpha, memory)).lower()
-            
-            conversions = {
-                'ki': num / (1024 * 1024),
-                'mi': num / 1024,
-                'gi': num,
-                'ti': num * 1024,
-                'k': num / (1000 * 1024),
-                'm': num / 1024,
-                'g': num,
-                't': num * 1024
-            }
-            
-            return conversions.get(unit, num)
-        except ValueError:
-            return 0
 
-    def generate_report(self, analysis_results: List[Dict[str, Any]]):
+    def _evaluate(self, deployment: Deployment, fingerprint: Tuple[Any, ...]) -> AnalysisResult:
+        """Run the compiled rules against a deployment."""
+        # Start with perfect score and deduct based on issues
+        analysis = AnalysisResult(deployment.name, deployment.namespace, kind=deployment.kind)
+        analysis.template = hashlib.sha1(repr(fingerprint).encode('utf-8')).hexdigest()[:12]
+
+        # Run the compiled compatibility rules, timing each group of checks when profiling
+        profiler = get_profiler()
+        self.rule_engine.evaluate(deployment, analysis, profiler if profiler.enabled else None)
+
+        # Calculate final score
+        analysis.compatibility_score = max(0, analysis.compatibility_score)
+        return analysis
+
+    def generate_report(self, analysis_results: List[AnalysisResult]):
         """Generate a formatted report of the analysis results."""
+        console.print(self.build_report_table(analysis_results))
+
+    def build_report_table(self, analysis_results: List[AnalysisResult]) -> 'Table':
+        """Build the report table of the analysis results."""
+        from rich.table import Table
+        from .report import display_name
+
         table = Table(title="ACA Compatibility Assessment Report")
         
         table.add_column("Application", style="cyan")
@@ -163,10 +219,10 @@ class ACAAnalyzer:
 
         for result in analysis_results:
             table.add_row(
-                f"{result['namespace']}/{result['name']}",
+                display_name(result),
                 f"{result['compatibility_score']}%",
                 "\n".join(result['compatibility_issues']) or "No issues found",
                 "\n".join(result['recommendations']) or "No recommendations"
             )
 
-        console.print(table)
+        return table
@@ -0,0 +1,217 @@
+"""
+Inventory snapshot cache module for ACA Assessor.
+Persists collected deployments and their analysis results between runs, so that
+later runs only fetch what changed since the stored resourceVersion and only
+re-analyze deployments whose records changed.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Any, Optional
+
+from rich.console import Console
+
+from . import __version__, records
+from .models import Deployment, AnalysisResult
+from .profiling import get_profiler
+
+console = Console()
+
+# Bumped whenever the on-disk layout changes
+SNAPSHOT_FORMAT = 5
+
+
+def record_hash(record: Deployment) -> str:
+    """Return a stable hash of a deployment record, used to detect spec changes."""
+    encoded = json.dumps(record.to_dict(), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def analysis_hash(analyzer: Any) -> str:
+    """Return a stable hash of an analyzer's rules and constraints, which cached results depend on."""
+    settings = {'rules': analyzer.rule_specs, 'constraints': analyzer.aca_constraints}
+    encoded = json.dumps(settings, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def resource_version_expired(error: Exception) -> bool:
+    """Whether a watch failed with 410 Gone, i.e. the API server no longer holds events back to our resourceVersion."""
+    return getattr(error, 'status', None) == 410
+
+
+class InventorySnapshot:
+    def __init__(self, context: str, namespace: Optional[str], resource_version: Optional[str] = None,
+                 created: Optional[float] = None, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.context = context
+        self.namespace = namespace
+        # resourceVersion of the last list or watch event applied to this snapshot
+        self.resource_version = resource_version
+        # Time of the last full list; the TTL is measured from here
+        self.created = created if created is not None else time.time()
+        # Keyed by "namespace/name"; each entry holds resource_version, spec_hash, record and result
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def from_list(cls, collector: Any, namespace: Optional[str], previous: Optional['InventorySnapshot'] = None,
+                  excluded_namespaces: List[str] = None) -> 'InventorySnapshot':
+        """Build a snapshot from a full deployment list, reusing the results of records unchanged since previous."""
+        snapshot = cls(collector.context, namespace)
+        if previous is not None:
+            # Seeding with the old entries lets apply() carry over results for unchanged records
+            snapshot.entries = dict(previous.entries)
+
+        excluded = set(excluded_namespaces or [])
+        seen = set()
+        for items, resource_version in collector.iter_raw_deployment_pages(namespace):
+            snapshot.resource_version = snapshot.resource_version or resource_version
+            for obj in items:
+                metadata = obj.get('metadata') or {}
+                if metadata.get('namespace') in excluded:
+                    continue
+                snapshot.apply(obj)
+                seen.add(f"{metadata.get('namespace')}/{metadata.get('name')}")
+
+        # Drop deployments that no longer exist
+        snapshot.entries = {key: entry for key, entry in snapshot.entries.items() if key in seen}
+        return snapshot
+
+    def apply(self, obj: Dict[str, Any]):
+        """Add or update a raw deployment object, keeping its analysis result if the record is unchanged."""
+        record = records.process_deployment(obj)
+        key = f"{record.namespace}/{record.name}"
+        spec_hash = record_hash(record)
+        previous = self.entries.get(key)
+        self.entries[key] = {
+            'resource_version': (obj.get('metadata') or {}).get('resourceVersion'),
+            'spec_hash': spec_hash,
+            'record': record,
+            'result': previous['result'] if previous and previous['spec_hash'] == spec_hash else None
+        }
+
+    def remove(self, obj: Dict[str, Any]):
+        """Remove a raw deployment object from the snapshot."""
+        metadata = obj.get('metadata') or {}
+        self.entries.pop(f"{metadata.get('namespace')}/{metadata.get('name')}", None)
+
+    def select(self, excluded_namespaces: List[str] = None) -> List[Dict[str, Any]]:
+        """Return entries outside the excluded namespaces, ordered by namespace and name."""
+        excluded = set(excluded_namespaces or [])
+        return [
+            self.entries[key] for key in sorted(self.entries)
+            if self.entries[key]['record'].namespace not in excluded
+        ]
+
+
+class InventoryCache:
+    def __init__(self, directory: str, ttl: int, watch_timeout: int = 2, analysis_hash: Optional[str] = None):
+        self.directory = os.path.expanduser(directory)
+        # Maximum age in seconds before a snapshot is rebuilt from a full list
+        self.ttl = ttl
+        self.watch_timeout = watch_timeout
+        # Hash of the rules and constraints; cached results analyzed under other settings are discarded on load
+        self.analysis_hash = analysis_hash
+
+    def snapshot_path(self, context: str, namespace: Optional[str]) -> str:
+        """Return the snapshot file for a context and namespace scope."""
+        scope = namespace or '_all'
+        readable = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{context}--{scope}")
+        digest = hashlib.sha1(f"{context}\0{scope}".encode('utf-8')).hexdigest()[:8]
+        return os.path.join(self.directory, f"{readable}-{digest}.jsonl")
+
+    def load(self, context: str, namespace: Optional[str]) -> Optional[InventorySnapshot]:
+        """Load a snapshot, returning None if it is missing, unreadable or from another version."""
+        path = self.snapshot_path(context, namespace)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if header.get('format') != SNAPSHOT_FORMAT or header.get('version') != __version__:
+                    return None
+                # Records stay valid when the rules or constraints change, but their results do not
+                keep_results = header.get('analysis_hash') == self.analysis_hash
+                entries = {}
+                for line in f:
+                    entry = json.loads(line)
+                    entry['record'] = Deployment.from_dict(entry['record'])
+                    if not keep_results:
+                        entry['result'] = None
+                    elif entry['result'] is not None:
+                        entry['result'] = AnalysisResult.from_dict(entry['result'])
+                    entries[entry.pop('key')] = entry
+        except Exception as e:
+            console.print(f"[yellow]Warning: Ignoring unreadable inventory cache {path}: {str(e)}[/yellow]")
+            return None
+
+        if not keep_results:
+            console.print("[yellow]Analysis rules or constraints have changed, discarding cached results[/yellow]")
+        return InventorySnapshot(context, namespace, header.get('resource_version'), header.get('created'), entries)
+
+    def save(self, snapshot: InventorySnapshot):
+        """Write a snapshot as JSON lines, replacing the previous file atomically."""
+        path = self.snapshot_path(snapshot.context, snapshot.namespace)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            header = {
+                'format': SNAPSHOT_FORMAT,
+                'version': __version__,
+                'analysis_hash': self.analysis_hash,
+                'context': snapshot.context,
+                'namespace': snapshot.namespace,
+                'resource_version': snapshot.resource_version,
+                'created': snapshot.created
+            }
+            f.write(json.dumps(header, separators=(',', ':')) + '\n')
+            for key, entry in snapshot.entries.items():
+                line = dict(entry, key=key, record=entry['record'].to_dict(),
+                            result=entry['result'].to_dict() if entry['result'] is not None else None)
+                f.write(json.dumps(line, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, path)
+
+    def refresh(self, collector: Any, namespace: Optional[str] = None, rebuild: bool = False) -> InventorySnapshot:
+        """Bring the cached snapshot for the collector's context up to date and return it."""
+        snapshot = None if rebuild else self.load(collector.context, namespace)
+
+        if snapshot is not None and time.time() - snapshot.created <= self.ttl and snapshot.resource_version:
+            try:
+                with get_profiler().phase('watch'):
+                    changes = self._apply_changes(collector, snapshot)
+                console.print(f"[green]Refreshed cached inventory: {changes} change(s) since the last run[/green]")
+                return snapshot
+            except Exception as e:
+                # Any failed watch falls back to a full list; earlier results are reused by spec hash, so events
+                # applied before the failure do no harm
+                if resource_version_expired(e):
+                    console.print("[yellow]Cached resourceVersion has expired, re-listing deployments...[/yellow]")
+                else:
+                    console.print(f"[yellow]Could not watch for changes since the cached inventory, "
+                                  f"re-listing deployments: {str(e)}[/yellow]")
+
+        return self._relist(collector, namespace, snapshot)
+
+    def _apply_changes(self, collector: Any, snapshot: InventorySnapshot) -> int:
+        """Apply watch events since the snapshot's resourceVersion and return how many were applied."""
+        changes = 0
+        events = collector.watch_deployment_changes(snapshot.namespace, snapshot.resource_version,
+                                                    timeout_seconds=self.watch_timeout)
+        for event_type, obj in events:
+            if event_type in ('ADDED', 'MODIFIED'):
+                snapshot.apply(obj)
+                changes += 1
+            elif event_type == 'DELETED':
+                snapshot.remove(obj)
+                changes += 1
+            resource_version = (obj.get('metadata') or {}).get('resourceVersion')
+            if resource_version:
+                snapshot.resource_version = resource_version
+        return changes
+
+    def _relist(self, collector: Any, namespace: Optional[str],
+                previous: Optional[InventorySnapshot]) -> InventorySnapshot:
+        """Build a new snapshot from a full list, reusing analysis results for unchanged records."""
+        console.print("[yellow]Building inventory snapshot from a full deployment list...[/yellow]")
+        return InventorySnapshot.from_list(collector, namespace, previous)
@@ -2,11 +2,17 @@
 Command-line interface for ACA Assessor.
 """
 import click
+import contextlib
+import json
 import os
+import sys
 from rich.console import Console
-from .collector import KubernetesCollector
-from .analyzer import ACAAnalyzer
-from .config import load_config, get_excluded_namespaces, create_default_config
+# Collectors, the analyzer and the cache pull in the kubernetes client, YAML parsing and rich
+# progress bars, so they are imported where they are used to keep --help and --init-config fast
+from .profiling import get_profiler, start_profiler, stop_profiler
+from .report import StreamingReporter, SummaryReporter, TemplateTally, ClusterRollup, FILE_WRITERS, create_writer
+from .config import (load_config, get_excluded_namespaces, get_cache_settings, get_analysis_settings,
+                     create_default_config)
 
 console = Console()
 
@@ -15,11 +21,82 @@ def cli():
     """ACA Assessor - Analyze Kubernetes applications for Azure Container Apps compatibility."""
     pass
 
+def _parse_kinds_option(ctx, param, value):
+    """Parse --kinds into workload kind names, rejecting unknown kinds before the run starts."""
+    from .inventory import parse_kinds
+    try:
+        return parse_kinds(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
 @cli.command()
 @click.option('--namespace', '-n', help='Kubernetes namespace to analyze. If not specified, analyzes all namespaces.')
 @click.option('--config', '-c', help='Path to configuration file.')
 @click.option('--init-config', is_flag=True, help='Initialize a default configuration file in the current directory.')
-def assess(namespace, config, init_config):
+@click.option('--concurrency', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of namespaces to collect from concurrently.')
+@click.option('--cluster-wide', is_flag=True,
+              help='List deployments from all namespaces with a single paginated API call.')
+@click.option('--page-size', type=click.IntRange(min=1), default=500, show_default=True,
+              help='Number of deployments requested per page with --cluster-wide.')
+@click.option('--raw', is_flag=True,
+              help='Process raw JSON API responses directly instead of building Kubernetes client models (faster, less memory).')
+@click.option('--from-path', type=click.Path(exists=True),
+              help='Assess manifest files or kubectl dumps (a file or directory) instead of a live cluster.')
+@click.option('--workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of worker processes used to parse manifest files and analyze deployments.')
+@click.option('--cache/--no-cache', 'use_cache', default=None,
+              help='Reuse the inventory snapshot from previous runs (overrides the config file).')
+@click.option('--refresh-cache', is_flag=True, help='Discard the cached inventory snapshot and rebuild it.')
+@click.option('--stream', is_flag=True,
+              help='Print each result as soon as it is analyzed instead of a table at the end, keeping memory bounded.')
+@click.option('--output-format', type=click.Choice(['table', 'summary'] + list(FILE_WRITERS)), default='table',
+              show_default=True,
+              help='Report format. summary prints fleet-level totals only; ndjson, csv, json and sarif are '
+                   'written as each result is produced.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True),
+              help='Write the report to a file instead of standard output.')
+@click.option('--pager', is_flag=True, help='Page the terminal report (table and summary formats).')
+@click.option('--profile', 'profile_path', type=click.Path(dir_okay=False, writable=True),
+              help='Record time per phase, API calls, bytes received and per-namespace latency to this file.')
+@click.option('--profile-format', type=click.Choice(['json', 'openmetrics']), default='json', show_default=True,
+              help='Format of the --profile file.')
+@click.option('--profile-pstats', type=click.Path(dir_okay=False, writable=True),
+              help='Also run cProfile and dump pstats data to this file.')
+@click.option('--contexts', help='Comma-separated kubeconfig contexts to assess concurrently in one report.')
+@click.option('--all-contexts', is_flag=True, help='Assess every context in the kubeconfig.')
+@click.option('--cluster-concurrency', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of clusters to collect from concurrently with --contexts or --all-contexts.')
+@click.option('--allow-partial', is_flag=True,
+              help='With --contexts or --all-contexts, exit with status 0 even if some clusters could not be assessed.')
+@click.option('--kinds', 'workload_kinds', default='deployment', show_default=True, callback=_parse_kinds_option,
+              help='Comma-separated workload kinds to assess: deployment, statefulset, daemonset, job, cronjob, '
+                   'or all.')
+@click.option('--related', is_flag=True,
+              help='Join Services, Ingresses and HorizontalPodAutoscalers to workloads for scaling and ingress checks.')
+@click.option('--usage-window', type=click.IntRange(min=0), default=0, show_default=True,
+              help='Seconds to sample pod usage from the metrics API for right-sizing recommendations (requires NumPy).')
+@click.option('--usage-interval', type=click.IntRange(min=1), default=15, show_default=True,
+              help='Seconds between pod usage polls during --usage-window.')
+@click.option('--usage-file', type=click.Path(exists=True, dir_okay=False),
+              help='Read pod usage from a recorded metrics file instead of, or as well as, sampling it.')
+@click.option('--record-usage', type=click.Path(dir_okay=False, writable=True),
+              help='Record the pod usage sampled during --usage-window to this file for later --usage-file runs.')
+@click.option('--plan', is_flag=True,
+              help='Pack the assessed workloads onto ACA workload profiles and print a capacity plan (requires NumPy).')
+@click.option('--plan-by', type=click.Choice(['namespace', 'cluster', 'fleet']), default='namespace', show_default=True,
+              help='Plan one ACA environment per namespace, per cluster, or for the whole fleet.')
+@click.option('--plan-dedicated-only', is_flag=True,
+              help='Plan every replica on dedicated workload profiles instead of using the consumption plan.')
+@click.option('--plan-output', type=click.Path(dir_okay=False, writable=True),
+              help='Also write the capacity plan to this file as JSON.')
+@click.option('--save-snapshot', type=click.Path(dir_okay=False, writable=True),
+              help='Save the results to this snapshot file (gzipped if it ends in .gz) for later `diff` runs.')
+def assess(namespace, config, init_config, concurrency, cluster_wide, page_size, raw, from_path, workers,
+           use_cache, refresh_cache, stream, output_format, output, pager, profile_path, profile_format,
+           profile_pstats, contexts, all_contexts, cluster_concurrency, allow_partial, workload_kinds, related,
+           usage_window, usage_interval, usage_file, record_usage, plan, plan_by, plan_dedicated_only, plan_output,
+           save_snapshot):
     """Assess Kubernetes applications for ACA compatibility."""
     try:
         # Handle config file initialization if requested
@@ -33,6 +110,18 @@ def assess(namespace, config, init_config):
                 console.print("[red]Failed to create configuration file.[/red]")
                 return
 
+        # Machine-readable reports on stdout must not be mixed with status messages and progress bars
+        report_stream = None
+        if output_format in FILE_WRITERS and not output:
+            report_stream = sys.stdout
+            click.get_current_context().with_resource(contextlib.redirect_stdout(sys.stderr))
+
+        if profile_path or profile_pstats:
+            click.get_current_context().with_resource(_profiling(profile_path, profile_format, profile_pstats))
+
+        # Every format except the table is written as results arrive
+        stream = stream or output_format != 'table'
+
         # Load configuration
         config_data = load_config(config)
         
@@ -41,32 +130,354 @@ def assess(namespace, config, init_config):
         if excluded_ns_list:
             console.print(f"[yellow]Excluding namespaces from config: {', '.join(excluded_ns_list)}[/yellow]")
 
+        cache_settings = get_cache_settings(config_data)
+        if use_cache is not None:
+            cache_settings['enabled'] = use_cache
+
+        if cache_settings['enabled'] and not from_path and (workload_kinds != ('Deployment',) or related):
+            # Snapshots hold deployments only and are refreshed from the deployment watch stream
+            console.print("[yellow]The inventory cache is only used for deployments without --related[/yellow]")
+            cache_settings['enabled'] = False
+
         # Initialize collector and analyzer
-        collector = KubernetesCollector()
-        analyzer = ACAAnalyzer()
+        from .analyzer import ACAAnalyzer
+        if from_path:
+            from .manifests import ManifestCollector
+            collector = ManifestCollector(from_path, workers=workers, kinds=workload_kinds, related=related)
+        elif contexts or all_contexts:
+            from .collector import MultiClusterCollector
+            if all_contexts:
+                context_names = MultiClusterCollector.available_contexts()
+            else:
+                context_names = [name.strip() for name in contexts.split(',') if name.strip()]
+            if not context_names:
+                console.print("[red]No kubeconfig contexts to assess[/red]")
+                return
+            if cache_settings['enabled']:
+                # Snapshots are stored per context, so they cannot hold a merged multi-cluster inventory
+                console.print("[yellow]The inventory cache is not used when assessing several contexts[/yellow]")
+                cache_settings['enabled'] = False
+            console.print(f"[yellow]Assessing {len(context_names)} context(s): {', '.join(context_names)}[/yellow]")
+            collector = MultiClusterCollector(context_names, cluster_concurrency=cluster_concurrency,
+                                              concurrency=concurrency, cluster_wide=cluster_wide,
+                                              page_size=page_size, raw=raw, kinds=workload_kinds, related=related)
+        else:
+            from .collector import KubernetesCollector
+            collector = KubernetesCollector(concurrency=concurrency, cluster_wide=cluster_wide,
+                                            page_size=page_size, raw=raw, kinds=workload_kinds, related=related)
+        analyzer = ACAAnalyzer(workers=workers, **get_analysis_settings(config_data))
+
+        usage = None
+        if usage_window or usage_file:
+            usage = _sample_usage(collector, namespace, usage_window, usage_interval, usage_file, record_usage)
+            if usage is None:
+                return
+
+        planner = None
+        if plan or plan_output:
+            try:
+                from .planner import CapacityPlanner
+            except ImportError:
+                console.print("[red]Capacity planning requires NumPy: pip install 'aca-assessor[usage]'[/red]")
+                return
+            planner = CapacityPlanner(plan_by, dedicated_only=plan_dedicated_only)
 
         # Collect deployments
         if namespace:
             console.print(f"[yellow]Collecting deployment information from namespace: {namespace}...[/yellow]")
         else:
             console.print("[yellow]Collecting deployment information from all namespaces...[/yellow]")
-            
-        deployments = collector.collect_deployments(namespace, excluded_ns_list)
 
-        if not deployments:
+        if cache_settings['enabled'] and not from_path:
+            if namespace and namespace in excluded_ns_list:
+                console.print(f"[yellow]Skipping excluded namespace: {namespace}[/yellow]")
+                return
+            analysis_results = _assess_with_cache(collector, analyzer, cache_settings, namespace,
+                                                  excluded_ns_list, refresh_cache, planner)
+            if analysis_results is None:
+                return
+        elif stream:
+            # Records flow through collection and analysis one at a time
+            deployments = collector.iter_deployments(namespace, excluded_ns_list)
+            if planner is not None:
+                deployments = planner.observe(deployments)
+            analysis_results = analyzer.iter_analysis(deployments)
+        else:
+            with get_profiler().phase('collect'):
+                deployments = collector.collect_deployments(namespace, excluded_ns_list)
+
+            if not deployments:
+                console.print("[red]No deployments found in the specified namespace(s)[/red]")
+                _exit_if_clusters_failed(collector, allow_partial)
+                return
+            if planner is not None:
+                planner.add_all(deployments)
+
+            # Analyze deployments - progress is shown by the analyzer
+            with get_profiler().phase('analyze'):
+                analysis_results = analyzer.analyze_deployments(deployments)
+
+        if usage:
+            analysis_results = analyzer.apply_usage(analysis_results, usage)
+
+        snapshot_writer = None
+        if save_snapshot:
+            from .snapshots import ResultSnapshotWriter
+            # A failed or incomplete run leaves any previous snapshot in place
+            snapshot_writer = click.get_current_context().with_resource(
+                contextlib.closing(ResultSnapshotWriter(save_snapshot)))
+            analysis_results = snapshot_writer.observe(analysis_results)
+
+        # When streaming, collection and analysis run as the report consumes results and are timed within it
+        with get_profiler().phase('report'):
+            reported = _write_report(analyzer, analysis_results, output_format, output, report_stream, stream, pager)
+        if not reported:
             console.print("[red]No deployments found in the specified namespace(s)[/red]")
+            _exit_if_clusters_failed(collector, allow_partial)
             return
+        if snapshot_writer is not None:
+            # Collectors report failures and carry on, so a partial inventory must not replace the last snapshot
+            if getattr(collector, 'last_error', None):
+                console.print(f"[red]Collection was incomplete, not saving the snapshot: {collector.last_error}[/red]")
+                sys.exit(1)
+            snapshot_writer.publish()
+            console.print(f"[green]Saved a snapshot of {snapshot_writer.count} result(s) to {save_snapshot}[/green]")
+        if planner is not None:
+            _write_plan(planner, plan_output)
+        _exit_if_clusters_failed(collector, allow_partial)
+
+    except Exception as e:
+        console.print(f"[red]Error during assessment: {str(e)}[/red]")
+        raise click.Abort()
+
+@cli.command()
+@click.option('--namespace', '-n', help='Kubernetes namespace to watch. If not specified, watches all namespaces.')
+@click.option('--config', '-c', help='Path to configuration file.')
+@click.option('--context', help='Kubeconfig context to watch. Defaults to the current context.')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to serve results on.')
+@click.option('--port', type=click.IntRange(min=0, max=65535), default=9464, show_default=True,
+              help='Port to serve results on.')
+@click.option('--page-size', type=click.IntRange(min=1), default=500, show_default=True,
+              help='Number of deployments requested per page when listing.')
+@click.option('--watch-timeout', type=click.IntRange(min=1), default=300, show_default=True,
+              help='Seconds each watch request stays open before it is renewed.')
+@click.option('--workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of worker processes used to analyze the initial list.')
+def watch(namespace, config, context, host, port, page_size, watch_timeout, workers):
+    """Continuously assess deployments as they change and serve the results over HTTP."""
+    try:
+        from .analyzer import ACAAnalyzer
+        from .collector import KubernetesCollector
+        from .daemon import AssessmentDaemon, serve
+
+        config_data = load_config(config)
+        excluded_ns_list = get_excluded_namespaces(config_data)
+        if excluded_ns_list:
+            console.print(f"[yellow]Excluding namespaces from config: {', '.join(excluded_ns_list)}[/yellow]")
 
-        # Analyze deployments - progress is shown by the analyzer
-        analysis_results = analyzer.analyze_deployments(deployments)
+        collector = KubernetesCollector(page_size=page_size, raw=True, context=context)
+        analyzer = ACAAnalyzer(workers=workers, **get_analysis_settings(config_data))
+        daemon = AssessmentDaemon(collector, analyzer, namespace, excluded_ns_list, watch_timeout=watch_timeout)
 
-        # Generate and display report
-        console.print("\n[green]Analysis complete! Here are the results:[/green]")
-        analyzer.generate_report(analysis_results)
+        server, _ = serve(daemon, host, port)
+        bound_host, bound_port = server.server_address[:2]
+        console.print(f"[green]Serving results on http://{bound_host}:{bound_port} "
+                      f"(/results, /metrics, /status, /healthz)[/green]")
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            console.print("[yellow]Stopping...[/yellow]")
+        finally:
+            daemon.stop()
+            server.shutdown()
+            server.server_close()
 
     except Exception as e:
-        console.print(f"[red]Error during assessment: {str(e)}[/red]")
+        console.print(f"[red]Error during watch: {str(e)}[/red]")
         raise click.Abort()
 
+@cli.command()
+@click.argument('old', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output-format', type=click.Choice(['text', 'ndjson']), default='text', show_default=True,
+              help='Print changes as text, or as one JSON object per line.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True),
+              help='Write the changes to this file instead of stdout.')
+@click.option('--fail-on-regression', is_flag=True,
+              help='Exit with status 1 if any workload gained an issue or lost score.')
+def diff(old, new, output_format, output, fail_on_regression):
+    """Compare two result snapshots and show added, removed and changed results."""
+    try:
+        from .report import DiffReporter
+        from .snapshots import diff_snapshots
+
+        with contextlib.ExitStack() as stack:
+            out = stack.enter_context(open(output, 'w', encoding='utf-8')) if output else sys.stdout
+            if output_format == 'ndjson':
+                # Only the counts are printed, on stderr so they stay out of the NDJSON stream
+                reporter = DiffReporter(Console(stderr=True), quiet=True)
+                for change in diff_snapshots(old, new):
+                    reporter.write(change)
+                    out.write(json.dumps(change.to_dict(), separators=(',', ':')) + '\n')
+            else:
+                target = console if out is sys.stdout else Console(file=out, width=160)
+                reporter = DiffReporter(target)
+                for change in diff_snapshots(old, new):
+                    reporter.write(change)
+            reporter.close()
+    except Exception as e:
+        console.print(f"[red]Error comparing snapshots: {str(e)}[/red]")
+        raise click.Abort()
+
+    if fail_on_regression and reporter.regressions:
+        sys.exit(1)
+
+def _assess_with_cache(collector, analyzer, cache_settings, namespace, excluded_ns_list, refresh_cache,
+                       planner=None):
+    """Refresh the cached inventory and analyze only deployments whose records changed."""
+    from .cache import InventoryCache, analysis_hash
+
+    cache = InventoryCache(cache_settings['directory'], cache_settings['ttl'], cache_settings['watch_timeout'],
+                           analysis_hash(analyzer))
+    snapshot = cache.refresh(collector, namespace, rebuild=refresh_cache)
+    entries = snapshot.select(excluded_ns_list)
+
+    if not entries:
+        cache.save(snapshot)
+        console.print("[red]No deployments found in the specified namespace(s)[/red]")
+        return None
+
+    if planner is not None:
+        planner.add_all(entry['record'] for entry in entries)
+
+    pending = [entry for entry in entries if entry['result'] is None]
+    console.print(f"[yellow]Analyzing {len(pending)} changed deployment(s), "
+                  f"reusing {len(entries) - len(pending)} cached result(s)[/yellow]")
+    if pending:
+        results = analyzer.analyze_deployments([entry['record'] for entry in pending])
+        for entry, result in zip(pending, results):
+            entry['result'] = result
+
+    cache.save(snapshot)
+    return [entry['result'] for entry in entries]
+
+
+def _exit_if_clusters_failed(collector, allow_partial):
+    """Exit with status 1 if a multi-cluster run could not assess some of its clusters, unless that is allowed."""
+    if getattr(collector, 'failed', None) and not allow_partial:
+        console.print(f"[red]The report is incomplete, {collector.last_error}; "
+                      f"use --allow-partial to accept a partial report[/red]")
+        sys.exit(1)
+
+def _sample_usage(collector, namespace, usage_window, usage_interval, usage_file, record_usage):
+    """Build workload usage profiles from a recorded metrics file and/or live sampling, or None if unavailable."""
+    try:
+        from .usage import UsageSampler
+    except ImportError:
+        console.print("[red]Usage sampling requires NumPy: pip install 'aca-assessor[usage]'[/red]")
+        return None
+
+    cronjobs = None
+    if hasattr(collector, 'index_cron_jobs'):
+        try:
+            cronjobs = collector.index_cron_jobs(namespace)
+        except Exception as e:
+            console.print(f"[yellow]Could not list CronJobs, Job pods are sampled under their Job: {str(e)}[/yellow]")
+    sampler = UsageSampler(cronjobs=cronjobs)
+    if usage_file:
+        sampler.load(usage_file)
+    if usage_window:
+        if not hasattr(collector, 'list_pod_metrics'):
+            # Samples are keyed by namespace and workload, which is ambiguous across several clusters
+            console.print("[yellow]Live usage sampling needs a single live cluster; use --usage-file instead[/yellow]")
+        else:
+            console.print(f"[yellow]Sampling pod usage every {usage_interval}s for {usage_window}s...[/yellow]")
+            sampler.sample(collector, usage_window, usage_interval, namespace, record_usage)
+    if sampler.unattributed:
+        console.print(f"[yellow]Skipped {sampler.unattributed} pod sample(s) not owned by a workload[/yellow]")
+    return sampler.profiles()
+
+
+def _write_plan(planner, plan_output):
+    """Pack the recorded workloads and print the capacity plan, also writing it as JSON if requested."""
+    with get_profiler().phase('plan'):
+        rows = planner.plan()
+    if not rows:
+        console.print("[yellow]No replicas to plan[/yellow]")
+        return
+    console.print(planner.table(rows))
+    unplaceable = sum(row['replicas'] for row in rows if row['profile'] == 'Unplaceable')
+    if unplaceable:
+        console.print(f"[red]{unplaceable} replica(s) are larger than every workload profile[/red]")
+    if planner.skipped:
+        console.print(f"[yellow]Skipped {planner.skipped} DaemonSet(s), which have no replica count to plan[/yellow]")
+    if plan_output:
+        with open(plan_output, 'w', encoding='utf-8') as f:
+            json.dump({'scope': planner.scope, 'dedicated_only': planner.dedicated_only, 'plan': rows}, f, indent=2)
+        console.print(f"[green]Wrote capacity plan to {plan_output}[/green]")
+
+
+@contextlib.contextmanager
+def _profiling(profile_path, profile_format, profile_pstats):
+    """Profile the rest of the run, then write the trace and print a summary."""
+    import cProfile
+
+    profiler = start_profiler()
+    hot_path = cProfile.Profile() if profile_pstats else None
+    if hot_path is not None:
+        hot_path.enable()
+    try:
+        yield
+    finally:
+        if hot_path is not None:
+            hot_path.disable()
+            hot_path.dump_stats(profile_pstats)
+            console.print(f"[green]Wrote cProfile data to {profile_pstats} (inspect with: python -m pstats {profile_pstats})[/green]")
+        stop_profiler()
+        console.print(profiler.summary_table())
+        if profile_path:
+            profiler.write(profile_path, profile_format)
+            console.print(f"[green]Wrote {profile_format} profile to {profile_path}[/green]")
+
+def _write_report(analyzer, analysis_results, output_format, output, report_stream, stream, pager):
+    """Write analysis results in the requested format and return how many deployments were reported."""
+    with contextlib.ExitStack() as stack:
+        if output_format in FILE_WRITERS:
+            out = report_stream or stack.enter_context(open(output, 'w', encoding='utf-8'))
+            writer = create_writer(output_format, out, rules=analyzer.rule_specs)
+            for result in analysis_results:
+                writer.write(result)
+            writer.close()
+            if output:
+                console.print(f"[green]Wrote {output_format} report for {writer.count} deployment(s) to {output}[/green]")
+            return writer.count
+
+        target = console
+        if output:
+            target = Console(file=stack.enter_context(open(output, 'w', encoding='utf-8')), width=160)
+        elif pager:
+            stack.enter_context(console.pager(styles=True))
+
+        if not stream:
+            analysis_results = list(analysis_results)
+            target.print("\n[green]Analysis complete! Here are the results:[/green]")
+            target.print(analyzer.build_report_table(analysis_results))
+
+            clusters = ClusterRollup()
+            tally = TemplateTally()
+            for result in analysis_results:
+                clusters.add(result)
+                tally.add(result)
+            for table in (clusters.table(), tally.table()):
+                if table is not None:
+                    target.print(table)
+            return len(analysis_results)
+
+        reporter = SummaryReporter(target) if output_format == 'summary' else StreamingReporter(target)
+        for result in analysis_results:
+            reporter.write(result)
+        reporter.close()
+        return reporter.count
+
 if __name__ == '__main__':
     cli()
@@ -1,166 +1,513 @@
 """
 Kubernetes resource collector module for ACA Assessor.
 """
-from typing import Dict, List, Any
-from kubernetes import client, config
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from kubernetes import client, config, watch
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn
+from . import records
+from .inventory import CronJobIndex, RelatedIndex
+from .models import (Deployment, Container, Resources, ResourceList, Port, EnvVar, VolumeMount, Volume,
+                     EMPTY_RESOURCE_LIST)
+from .parallel import ordered_map
+from .profiling import get_profiler
 
 console = Console()
 
 class KubernetesCollector:
-    def __init__(self):
+    def __init__(self, concurrency: int = 1, cluster_wide: bool = False, page_size: int = 500,
+                 raw: bool = False, context: Optional[str] = None, show_progress: bool = True,
+                 kinds: Tuple[str, ...] = ('Deployment',), related: bool = False):
+        # Maximum number of namespaces listed at the same time
+        self.concurrency = max(1, concurrency)
+        # List all namespaces with one paginated call instead of one call per namespace
+        self.cluster_wide = cluster_wide
+        self.page_size = page_size
+        # Map raw JSON responses straight into records, skipping model deserialization
+        self.raw = raw
+        # Progress bars are turned off when several collectors run at once, since rich shows one at a time
+        self.show_progress = show_progress
+        # Error that stopped the last collection, e.g. an unreachable cluster
+        self.last_error: Optional[str] = None
+        # Workload kinds to collect, and whether to join Services, Ingresses and HPAs to them
+        self.kinds = tuple(kinds)
+        self.related = related
         try:
-            config.load_kube_config()
-            self.v1 = client.CoreV1Api()
-            self.apps_v1 = client.AppsV1Api()
-            self.networking_v1 = client.NetworkingV1Api()
-            console.print("[green]Successfully connected to Kubernetes cluster[/green]")
+            # Each collector gets its own API client, so collectors for different contexts can run side by side
+            api_client = config.new_client_from_config(context=context)
+            if context is None:
+                _, active_context = config.list_kube_config_contexts()
+                context = active_context['name']
+            self.context = context
+            self.v1 = client.CoreV1Api(api_client)
+            self.apps_v1 = client.AppsV1Api(api_client)
+            self.networking_v1 = client.NetworkingV1Api(api_client)
+            self.batch_v1 = client.BatchV1Api(api_client)
+            self.autoscaling_v2 = client.AutoscalingV2Api(api_client)
+            self.custom_objects = client.CustomObjectsApi(api_client)
+            console.print(f"[green]Successfully connected to Kubernetes cluster: {context}[/green]")
         except Exception as e:
             console.print(f"[red]Failed to connect to Kubernetes cluster: {str(e)}[/red]")
             raise
 
-    def collect_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> List[Dict[str, Any]]:
+    def collect_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> List[Deployment]:
         """Collect all deployments in the specified namespace or all namespaces."""
+        return list(self.iter_deployments(namespace, excluded_namespaces))
+
+    def iter_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> Iterator[Deployment]:
+        """Yield deployments in the specified namespace or all namespaces as soon as they are collected."""
         if excluded_namespaces is None:
             excluded_namespaces = []
+        self.last_error = None
             
         try:
-            if namespace:
+            if namespace and namespace in excluded_namespaces:
+                console.print(f"[yellow]Skipping excluded namespace: {namespace}[/yellow]")
+                return
+            if self.kinds != ('Deployment',) or self.related:
+                yield from self._iter_inventory(namespace, excluded_namespaces)
+            elif namespace:
                 # Single namespace collection
-                if namespace in excluded_namespaces:
-                    console.print(f"[yellow]Skipping excluded namespace: {namespace}[/yellow]")
-                    return []
-                deployments = self.apps_v1.list_namespaced_deployment(namespace)
-                return self._process_deployments(deployments.items)
+                items, _, _, _ = self._list(self.apps_v1.list_namespaced_deployment, namespace)
+                yield from self._process_items(items)
+            elif self.cluster_wide:
+                yield from self._iter_cluster_wide(excluded_namespaces)
             else:
-                # Multiple namespace collection - show progress
-                namespaces = self.v1.list_namespace()
-                
-                all_deployments = []
-                skipped_namespaces = []
+                yield from self._iter_namespaced(excluded_namespaces)
+        
+        except Exception as e:
+            self.last_error = str(e)
+            console.print(f"[red]Error collecting deployments from {self.context}: {str(e)}[/red]")
+
+    def _iter_namespaced(self, excluded_namespaces: List[str]) -> Iterator[Deployment]:
+        """Yield deployments from all namespaces with one list call per namespace, in namespace order."""
+        # Multiple namespace collection - show progress
+        profiler = get_profiler()
+        with profiler.phase('list_namespaces'):
+            namespaces = self.v1.list_namespace()
+        profiler.count('api_calls')
+        
+        skipped_namespaces = []
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console,
+            disable=not self.show_progress
+        ) as progress:
+            task = progress.add_task(f"[yellow]Collecting deployments from all namespaces...", total=len(namespaces.items))
+            
+            to_collect = []
+            for ns in namespaces.items:
+                ns_name = ns.metadata.name
                 
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[bold blue]{task.description}"),
-                    BarColumn(),
-                    TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                    console=console
-                ) as progress:
-                    task = progress.add_task(f"[yellow]Collecting deployments from all namespaces...", total=len(namespaces.items))
-                    
-                    for ns in namespaces.items:
-                        ns_name = ns.metadata.name
-                        
-                        if ns_name in excluded_namespaces:
-                            progress.update(task, description=f"[yellow]Skipping excluded namespace: {ns_name}")
-                            skipped_namespaces.append(ns_name)
-                        else:
-                            progress.update(task, description=f"[yellow]Collecting from namespace: {ns_name}")
-                            try:
-                                deployments = self.apps_v1.list_namespaced_deployment(ns_name)
-                                all_deployments.extend(deployments.items)
-                            except Exception as e:
-                                console.print(f"[red]Error collecting from namespace {ns_name}: {str(e)}[/red]")
-                        
+                if ns_name in excluded_namespaces:
+                    progress.update(task, description=f"[yellow]Skipping excluded namespace: {ns_name}")
+                    skipped_namespaces.append(ns_name)
+                    progress.advance(task)
+                else:
+                    to_collect.append(ns_name)
+
+            if self.concurrency > 1:
+                # Results are yielded in namespace order regardless of completion order, with a
+                # bounded number of namespaces in flight so memory does not grow with the cluster
+                with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                    collected = ordered_map(executor, self._list_namespace_deployments, to_collect,
+                                            window=self.concurrency * 2)
+                    for ns_name, items in collected:
+                        progress.update(task, description=f"[yellow]Collected from namespace: {ns_name}")
                         progress.advance(task)
-                
-                # Report skipped namespaces
-                if skipped_namespaces:
-                    console.print(f"[yellow]Skipped {len(skipped_namespaces)} excluded namespace(s): {', '.join(skipped_namespaces)}[/yellow]")
-                
-                return self._process_deployments(all_deployments)
+                        if items:
+                            yield from self._process_items(items)
+            else:
+                for ns_name in to_collect:
+                    progress.update(task, description=f"[yellow]Collecting from namespace: {ns_name}")
+                    items = self._list_namespace_deployments(ns_name)
+                    progress.advance(task)
+                    if items:
+                        yield from self._process_items(items)
         
+        # Report skipped namespaces
+        if skipped_namespaces:
+            console.print(f"[yellow]Skipped {len(skipped_namespaces)} excluded namespace(s): {', '.join(skipped_namespaces)}[/yellow]")
+
+    def _iter_cluster_wide(self, excluded_namespaces: List[str]) -> Iterator[Deployment]:
+        """Yield deployments from all namespaces using a single paginated list call."""
+        # Excluded namespaces are filtered by the API server rather than client-side
+        field_selector = ','.join(f"metadata.namespace!={ns}" for ns in excluded_namespaces)
+        collected = 0
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console,
+            disable=not self.show_progress
+        ) as progress:
+            task = progress.add_task("[yellow]Collecting deployments from all namespaces...", total=None)
+
+            for items, remaining, _ in self._iter_deployment_pages(field_selector):
+                # Process each page as it arrives so only one page of objects is held at a time
+                collected += len(items)
+                if remaining is not None:
+                    progress.update(task, total=collected + remaining)
+                progress.update(task, completed=collected,
+                                description=f"[yellow]Collected {collected} deployments")
+                yield from self._process_items(items)
+
+            progress.update(task, total=collected, completed=collected)
+
+    def _iter_inventory(self, namespace: Optional[str], excluded_namespaces: List[str]) -> Iterator[Deployment]:
+        """
+        Yield workloads of every requested kind, listed kind by kind with paginated raw calls.
+        Services, Ingresses and HPAs are listed and indexed first, so each workload is joined
+        to them as it streams past without further API calls.
+        """
+        field_selector = ','.join(f"metadata.namespace!={ns}" for ns in excluded_namespaces if ns != namespace)
+        index = None
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console,
+            disable=not self.show_progress
+        ) as progress:
+            if self.related:
+                index = RelatedIndex()
+                task = progress.add_task("[yellow]Indexing services, ingresses and autoscalers...", total=None)
+                for kind in ('Service', 'Ingress', 'HorizontalPodAutoscaler'):
+                    for items, _, _ in self._iter_kind_pages(kind, field_selector, namespace):
+                        for obj in items:
+                            index.add(kind, obj)
+                    progress.update(task, description=f"[yellow]Indexed {kind} objects")
+                progress.update(task, total=1, completed=1)
+                counts = index.counts
+                console.print(f"[green]Indexed {counts['services']} service(s), {counts['ingresses']} ingress(es) "
+                              f"and {counts['autoscalers']} autoscaler(s)[/green]")
+
+            task = progress.add_task("[yellow]Collecting workloads...", total=None)
+            collected = 0
+            for kind in self.kinds:
+                for items, _, _ in self._iter_kind_pages(kind, field_selector, namespace):
+                    with get_profiler().phase('process'):
+                        workloads = [records.process_workload(obj, kind) for obj in items]
+                        if index is not None:
+                            for obj, workload in zip(items, workloads):
+                                index.attach(workload, records.pod_labels(obj, kind))
+                    collected += len(workloads)
+                    progress.update(task, description=f"[yellow]Collected {collected} workloads ({kind})")
+                    yield from workloads
+            progress.update(task, total=collected, completed=collected)
+
+    def _iter_kind_pages(self, kind: str, field_selector: str = '',
+                         namespace: str = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]]:
+        """Yield pages of raw objects of a kind, in a namespace or across the cluster."""
+        list_all, list_namespaced = {
+            'Deployment': (self.apps_v1.list_deployment_for_all_namespaces, self.apps_v1.list_namespaced_deployment),
+            'StatefulSet': (self.apps_v1.list_stateful_set_for_all_namespaces,
+                            self.apps_v1.list_namespaced_stateful_set),
+            'DaemonSet': (self.apps_v1.list_daemon_set_for_all_namespaces, self.apps_v1.list_namespaced_daemon_set),
+            'Job': (self.batch_v1.list_job_for_all_namespaces, self.batch_v1.list_namespaced_job),
+            'CronJob': (self.batch_v1.list_cron_job_for_all_namespaces, self.batch_v1.list_namespaced_cron_job),
+            'Service': (self.v1.list_service_for_all_namespaces, self.v1.list_namespaced_service),
+            'Ingress': (self.networking_v1.list_ingress_for_all_namespaces, self.networking_v1.list_namespaced_ingress),
+            'HorizontalPodAutoscaler': (self.autoscaling_v2.list_horizontal_pod_autoscaler_for_all_namespaces,
+                                        self.autoscaling_v2.list_namespaced_horizontal_pod_autoscaler),
+        }[kind]
+        return self._iter_pages(list_all, list_namespaced, field_selector, namespace, raw=True)
+
+    def _iter_deployment_pages(self, field_selector: str = '', namespace: str = None,
+                               raw: Optional[bool] = None) -> Iterator[Tuple[List[Any], Optional[int], Optional[str]]]:
+        """Yield the items, remaining item count and list resourceVersion of each page of a deployment list."""
+        return self._iter_pages(self.apps_v1.list_deployment_for_all_namespaces,
+                                self.apps_v1.list_namespaced_deployment, field_selector, namespace, raw)
+
+    def _iter_pages(self, list_all: Any, list_namespaced: Any, field_selector: str = '', namespace: str = None,
+                    raw: Optional[bool] = None) -> Iterator[Tuple[List[Any], Optional[int], Optional[str]]]:
+        """Yield the items, remaining item count and list resourceVersion of each page of a list."""
+        continue_token = None
+        while True:
+            kwargs = {'limit': self.page_size}
+            if field_selector:
+                kwargs['field_selector'] = field_selector
+            if continue_token:
+                kwargs['_continue'] = continue_token
+
+            if namespace:
+                page = self._list(list_namespaced, namespace, raw=raw, **kwargs)
+            else:
+                page = self._list(list_all, raw=raw, **kwargs)
+            items, continue_token, remaining, resource_version = page
+            yield items, remaining, resource_version
+
+            if not continue_token:
+                break
+
+    def _list(self, list_func: Any, *args, raw: Optional[bool] = None,
+              **kwargs) -> Tuple[List[Any], Optional[str], Optional[int], Optional[str]]:
+        """Call a list API and return its items, continue token, remaining item count and resourceVersion."""
+        if raw is None:
+            raw = self.raw
+        profiler = get_profiler()
+        if not raw and not profiler.enabled:
+            result = list_func(*args, **kwargs)
+            metadata = result.metadata
+            return result.items, metadata._continue, metadata.remaining_item_count, metadata.resource_version
+
+        start = time.perf_counter()
+        response = list_func(*args, _preload_content=False, **kwargs)
+        try:
+            data = response.data
+        finally:
+            response.release_conn()
+        profiler.record('api_call', time.perf_counter() - start)
+        profiler.count('api_calls')
+        profiler.count('bytes_received', len(data))
+
+        if not raw:
+            # Profiled runs deserialize separately so API latency and model deserialization are timed apart
+            with profiler.phase('deserialize'):
+                result = self.apps_v1.api_client.deserialize(response, 'V1DeploymentList')
+            metadata = result.metadata
+            return result.items, metadata._continue, metadata.remaining_item_count, metadata.resource_version
+
+        with profiler.phase('decode'):
+            body = json.loads(data)
+        metadata = body.get('metadata') or {}
+        return (body.get('items') or [], metadata.get('continue'),
+                metadata.get('remainingItemCount'), metadata.get('resourceVersion'))
+
+    def iter_raw_deployment_pages(self, namespace: str = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yield pages of raw deployment objects in a namespace or the whole cluster, with the list's resourceVersion."""
+        for items, _, resource_version in self._iter_deployment_pages(namespace=namespace, raw=True):
+            yield items, resource_version
+
+    def list_pod_metrics(self, namespace: str = None) -> List[Dict[str, Any]]:
+        """List the current usage of every pod in a namespace or the whole cluster from the metrics.k8s.io API."""
+        if namespace:
+            items, _, _, _ = self._list(self.custom_objects.list_namespaced_custom_object,
+                                        'metrics.k8s.io', 'v1beta1', namespace, 'pods', raw=True)
+        else:
+            items, _, _, _ = self._list(self.custom_objects.list_cluster_custom_object,
+                                        'metrics.k8s.io', 'v1beta1', 'pods', raw=True)
+        return items
+
+    def index_cron_jobs(self, namespace: str = None) -> CronJobIndex:
+        """List the CronJobs and Jobs in a namespace or the whole cluster, indexed to attribute Job pods to CronJobs."""
+        index = CronJobIndex()
+        # Job pods only need attributing to a CronJob when CronJobs are assessed
+        if 'CronJob' not in self.kinds:
+            return index
+        for items, _, _ in self._iter_kind_pages('CronJob', namespace=namespace):
+            for obj in items:
+                metadata = obj.get('metadata') or {}
+                index.add_cronjob(metadata.get('namespace') or 'default', metadata.get('name'))
+        # Without CronJobs there are no Jobs to map back to one
+        if index:
+            for items, _, _ in self._iter_kind_pages('Job', namespace=namespace):
+                for obj in items:
+                    index.add_job(obj)
+        return index
+
+    def watch_deployment_changes(self, namespace: str = None, resource_version: str = None,
+                                 timeout_seconds: int = 2) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (event type, raw object) for every deployment change since a resourceVersion.
+        Raises ApiException with status 410 when the resourceVersion is too old to resume from.
+        """
+        if namespace:
+            list_func, args = self.apps_v1.list_namespaced_deployment, (namespace,)
+        else:
+            list_func, args = self.apps_v1.list_deployment_for_all_namespaces, ()
+
+        stream = watch.Watch().stream(list_func, *args, resource_version=resource_version,
+                                      timeout_seconds=timeout_seconds, allow_watch_bookmarks=True)
+        for event in stream:
+            yield event['type'], event['raw_object']
+
+    def _process_items(self, items: List[Any]) -> List[Deployment]:
+        """Process listed deployments, whether raw JSON objects or client models."""
+        with get_profiler().phase('process'):
+            if self.raw:
+                return records.process_deployments(items)
+            return self._process_deployments(items)
+
+    def _list_namespace_deployments(self, ns_name: str) -> Optional[List[Any]]:
+        """List the deployments of a single namespace, reporting errors instead of raising."""
+        start = time.perf_counter()
+        try:
+            items, _, _, _ = self._list(self.apps_v1.list_namespaced_deployment, ns_name)
+            return items
         except Exception as e:
-            console.print(f"[red]Error collecting deployments: {str(e)}[/red]")
-            return []
+            # Other namespaces are still collected, but the run is incomplete
+            self.last_error = f"namespace {ns_name}: {str(e)}"
+            console.print(f"[red]Error collecting from namespace {ns_name}: {str(e)}[/red]")
+            return None
+        finally:
+            get_profiler().record_namespace(ns_name, time.perf_counter() - start)
 
-    def _process_deployments(self, deployments: List[Any]) -> List[Dict[str, Any]]:
+    def _process_deployments(self, deployments: List[Any]) -> List[Deployment]:
         """Process deployment information into a structured format."""
         processed = []
         for dep in deployments:
             containers = dep.spec.template.spec.containers
-            processed.append({
-                'name': dep.metadata.name,
-                'namespace': dep.metadata.namespace,
-                'replicas': dep.spec.replicas,
-                'containers': [{
-                    'name': c.name,
-                    'image': c.image,
-                    'resources': self._process_resources(c.resources),
-                    'ports': self._process_ports(c.ports),
-                    'env': self._process_env(c.env),
-                    'volume_mounts': self._process_volume_mounts(c.volume_mounts)
-                } for c in containers],
-                'volumes': self._process_volumes(dep.spec.template.spec.volumes),
-                'labels': dep.metadata.labels or {},
-                'annotations': dep.metadata.annotations or {}
-            })
+            processed.append(Deployment(
+                dep.metadata.name,
+                dep.metadata.namespace,
+                dep.spec.replicas,
+                tuple(Container(
+                    c.name,
+                    c.image,
+                    self._process_resources(c.resources),
+                    self._process_ports(c.ports),
+                    self._process_env(c.env),
+                    self._process_volume_mounts(c.volume_mounts)
+                ) for c in containers),
+                self._process_volumes(dep.spec.template.spec.volumes),
+                dep.metadata.labels,
+                dep.metadata.annotations
+            ))
         return processed
 
-    def _process_resources(self, resources: Any) -> Dict[str, Dict[str, str]]:
+    def _process_resources(self, resources: Any) -> Resources:
         """Process container resource requirements."""
         if not resources:
-            return {'requests': {}, 'limits': {}}
+            return Resources()
         
-        return {
-            'requests': {
-                'cpu': resources.requests.get('cpu', ''),
-                'memory': resources.requests.get('memory', '')
-            } if resources.requests else {},
-            'limits': {
-                'cpu': resources.limits.get('cpu', ''),
-                'memory': resources.limits.get('memory', '')
-            } if resources.limits else {}
-        }
-
-    def _process_ports(self, ports: List[Any]) -> List[Dict[str, Any]]:
+        return Resources(
+            ResourceList(
+                resources.requests.get('cpu', ''),
+                resources.requests.get('memory', '')
+            ) if resources.requests else EMPTY_RESOURCE_LIST,
+            ResourceList(
+                resources.limits.get('cpu', ''),
+                resources.limits.get('memory', '')
+            ) if resources.limits else EMPTY_RESOURCE_LIST
+        )
+
+    def _process_ports(self, ports: List[Any]) -> Tuple[Port, ...]:
         """Process container port configurations."""
         if not ports:
-            return []
-        return [{
-            'name': p.name,
-            'container_port': p.container_port,
-            'protocol': p.protocol
-        } for p in ports]
-
-    def _process_env(self, env: List[Any]) -> List[Dict[str, str]]:
+            return ()
+        return tuple(Port(p.name, p.container_port, p.protocol) for p in ports)
+
+    def _process_env(self, env: List[Any]) -> Tuple[EnvVar, ...]:
         """Process container environment variables."""
         if not env:
-            return []
-        return [{
-            'name': e.name,
-            'value': e.value if e.value else 'FROM_SECRET' if e.value_from else ''
-        } for e in env]
+            return ()
+        return tuple(EnvVar(
+            e.name,
+            e.value if e.value else 'FROM_SECRET' if e.value_from else ''
+        ) for e in env)
 
-    def _process_volume_mounts(self, mounts: List[Any]) -> List[Dict[str, str]]:
+    def _process_volume_mounts(self, mounts: List[Any]) -> Tuple[VolumeMount, ...]:
         """Process container volume mounts."""
         if not mounts:
-            return []
-        return [{
-            'name': m.name,
-            'mount_path': m.mount_path,
-            'read_only': m.read_only if hasattr(m, 'read_only') else False
-        } for m in mounts]
-
-    def _process_volumes(self, volumes: List[Any]) -> List[Dict[str, Any]]:
+            return ()
+        return tuple(VolumeMount(
+            m.name,
+            m.mount_path,
+            m.read_only if hasattr(m, 'read_only') else False
+        ) for m in mounts)
+
+    def _process_volumes(self, volumes: List[Any]) -> Tuple[Volume, ...]:
         """Process pod volumes."""
         if not volumes:
-            return []
+            return ()
         processed = []
         for vol in volumes:
-            vol_info = {'name': vol.name}
             if vol.persistent_volume_claim:
-                vol_info['type'] = 'pvc'
-                vol_info['claim_name'] = vol.persistent_volume_claim.claim_name
+                processed.append(Volume(vol.name, 'pvc', vol.persistent_volume_claim.claim_name))
             elif vol.config_map:
-                vol_info['type'] = 'configmap'
-                vol_info['config_map_name'] = vol.config_map.name
+                processed.append(Volume(vol.name, 'configmap', vol.config_map.name))
             elif vol.secret:
-                vol_info['type'] = 'secret'
-                vol_info['secret_name'] = vol.secret.secret_name
+                processed.append(Volume(vol.name, 'secret', vol.secret.secret_name))
             else:
-                vol_info['type'] = 'other'
-            processed.append(vol_info)
-        return processed
+                processed.append(Volume(vol.name, 'other'))
+        return tuple(processed)
+
+
+class MultiClusterCollector:
+    """Collect deployments from several kubeconfig contexts concurrently, tolerating unreachable clusters."""
+
+    def __init__(self, contexts: List[str], cluster_concurrency: int = 4, concurrency: int = 1,
+                 cluster_wide: bool = False, page_size: int = 500, raw: bool = False,
+                 kinds: Tuple[str, ...] = ('Deployment',), related: bool = False):
+        # Maximum number of clusters collected from at the same time
+        self.cluster_concurrency = max(1, cluster_concurrency)
+        self.contexts = list(contexts)
+        # Context name -> error for clusters that could not be assessed
+        self.failed: Dict[str, str] = {}
+        self.collectors: Dict[str, KubernetesCollector] = {}
+        for context in self.contexts:
+            try:
+                self.collectors[context] = KubernetesCollector(concurrency=concurrency, cluster_wide=cluster_wide,
+                                                               page_size=page_size, raw=raw, context=context,
+                                                               show_progress=False, kinds=kinds, related=related)
+            except Exception as e:
+                self.failed[context] = str(e)
+
+    @property
+    def last_error(self) -> Optional[str]:
+        """Summary of the clusters that could not be assessed, or None if every cluster was collected."""
+        if not self.failed:
+            return None
+        return f"could not assess {len(self.failed)} cluster(s): {', '.join(sorted(self.failed))}"
+
+    @staticmethod
+    def available_contexts() -> List[str]:
+        """Return the names of all contexts in the kubeconfig."""
+        contexts, _ = config.list_kube_config_contexts()
+        return [context['name'] for context in contexts]
+
+    def collect_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> List[Deployment]:
+        """Collect deployments from every cluster."""
+        return list(self.iter_deployments(namespace, excluded_namespaces))
+
+    def iter_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> Iterator[Deployment]:
+        """Yield the deployments of each cluster, in context order, as soon as that cluster has been collected."""
+        reachable = [context for context in self.contexts if context in self.collectors]
+
+        def collect(context: str) -> List[Deployment]:
+            collector = self.collectors[context]
+            deployments = collector.collect_deployments(namespace, excluded_namespaces)
+            if collector.last_error:
+                self.failed[context] = collector.last_error
+            # Tag records with their cluster so the merged report can tell them apart
+            for deployment in deployments:
+                deployment.cluster = context
+            return deployments
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console
+        ) as progress:
+            task = progress.add_task(f"[yellow]Collecting deployments from {len(reachable)} cluster(s)...",
+                                     total=len(reachable))
+
+            # Each cluster's deployments are held until its turn in context order, with a bounded
+            # number of clusters in flight
+            with ThreadPoolExecutor(max_workers=self.cluster_concurrency) as executor:
+                collected = ordered_map(executor, collect, reachable, window=self.cluster_concurrency * 2)
+                for context, deployments in collected:
+                    progress.update(task, description=f"[yellow]Collected from cluster: {context}")
+                    progress.advance(task)
+                    yield from deployments
+
+        if self.failed:
+            console.print(f"[red]Could not assess {len(self.failed)} cluster(s):[/red]")
+            for context, error in self.failed.items():
+                console.print(f"[red]  {context}: {error}[/red]")
+
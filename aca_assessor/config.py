@@ -3,7 +3,6 @@ Configuration module for ACA Assessor.
 Handles loading and parsing configuration files.
 """
 import os
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from rich.console import Console
@@ -24,6 +23,14 @@ DEFAULT_CONFIG = {
     }
 }
 
+# Default inventory cache settings
+DEFAULT_CACHE_SETTINGS = {
+    "enabled": False,
+    "directory": os.path.join(os.path.expanduser("~"), ".cache", "aca-assessor"),
+    "ttl": 86400,        # Seconds before a snapshot is rebuilt from a full list
+    "watch_timeout": 2   # Seconds to wait for changes when refreshing a snapshot
+}
+
 
 def get_config_path() -> Optional[str]:
     """Find the first available configuration file in default locations."""
@@ -48,6 +55,9 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         
     # Load config from file
     try:
+        # Imported here so commands that never read a config file do not pay for it
+        import yaml
+
         with open(config_path, 'r') as config_file:
             config = yaml.safe_load(config_file)
             if not config:
@@ -87,6 +97,52 @@ def get_excluded_namespaces(config: Dict[str, Any]) -> List[str]:
     return unique_excluded
 
 
+def get_cache_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract inventory cache settings from configuration, filling in defaults."""
+    settings = dict(DEFAULT_CACHE_SETTINGS)
+    cache = config.get('cache')
+    if not isinstance(cache, dict):
+        return settings
+
+    if 'enabled' in cache:
+        settings['enabled'] = bool(cache['enabled'])
+    if cache.get('directory'):
+        settings['directory'] = os.path.expanduser(str(cache['directory']))
+    for key in ('ttl', 'watch_timeout'):
+        try:
+            if key in cache:
+                settings[key] = max(1, int(cache[key]))
+        except (TypeError, ValueError):
+            console.print(f"[yellow]Warning: Ignoring invalid cache setting {key}: {cache[key]}[/yellow]")
+
+    return settings
+
+
+def get_analysis_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract constraint overrides and custom rules from configuration."""
+    analysis = config.get('analysis')
+    if not isinstance(analysis, dict):
+        analysis = {}
+
+    constraints = analysis.get('constraints') or {}
+    if not isinstance(constraints, dict):
+        console.print("[yellow]Warning: Ignoring analysis.constraints, expected a mapping[/yellow]")
+        constraints = {}
+
+    rules = analysis.get('rules') or []
+    if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+        console.print("[yellow]Warning: Ignoring analysis.rules, expected a list of rule mappings[/yellow]")
+        rules = []
+
+    disabled = analysis.get('disabled_rules') or []
+    if isinstance(disabled, str):
+        disabled = [rule_id.strip() for rule_id in disabled.split(',') if rule_id.strip()]
+    if not isinstance(disabled, list):
+        disabled = []
+
+    return {'constraints': constraints, 'rules': rules, 'disabled_rules': disabled}
+
+
 def create_default_config(path: str) -> bool:
     """Create a default configuration file at the specified path."""
     try:
@@ -103,6 +159,26 @@ assessment:
     - kube-system
     - kube-public
     - kube-node-lease
+
+cache:
+  # Persist the collected inventory between runs and only fetch what changed
+  enabled: false
+  # Directory where inventory snapshots are stored
+  directory: ~/.cache/aca-assessor
+  # Seconds before a snapshot is rebuilt from a full list
+  ttl: 86400
+
+analysis:
+  # Override ACA limits used by the built-in rules
+  # (max_cpu, max_memory, max_replicas, supported_volume_types, supported_protocols, unsupported_kinds,
+  #  supported_service_types, max_exposed_ports, max_ingress_backends)
+  constraints: {}
+  # Ids of built-in rules to turn off
+  # (cpu-limit, memory-limit, volume-type, port-protocol, max-replicas, workload-kind, service-type,
+  #  exposed-ports, ingress-fanout)
+  disabled_rules: []
+  # Additional rules; a rule with the id of a built-in rule replaces it
+  rules: []
 """
         
         with open(path, 'w') as config_file:
@@ -0,0 +1,262 @@
+"""
+Continuous assessment daemon for ACA Assessor.
+Builds an inventory from one paginated deployment list, then follows the
+deployment watch stream and re-analyzes only deployments that were added or
+whose records changed. Current results are served over HTTP as JSON and in the
+Prometheus text exposition format.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from rich.console import Console
+
+from .cache import InventorySnapshot, resource_version_expired
+from .profiling import escape_label
+
+console = Console()
+
+# Seconds to wait before reconnecting after a failed watch, doubled up to the maximum
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+
+class AssessmentDaemon:
+    """Keeps an in-memory index of analysis results up to date from the deployment watch stream."""
+
+    def __init__(self, collector: Any, analyzer: Any, namespace: Optional[str] = None,
+                 excluded_namespaces: List[str] = None, watch_timeout: int = 300):
+        self.collector = collector
+        self.analyzer = analyzer
+        self.namespace = namespace
+        self.excluded_namespaces = set(excluded_namespaces or [])
+        # Seconds the API server keeps each watch request open before it is renewed
+        self.watch_timeout = watch_timeout
+        self.snapshot = InventorySnapshot(getattr(collector, 'context', None), namespace)
+        # Guards the snapshot and counters, which the HTTP server reads from other threads
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.synced = False
+        self.events: Counter = Counter()
+        self.relists = 0
+        self.reconnects = 0
+        self.analyses = 0
+        self.last_event: Optional[float] = None
+
+    def sync(self):
+        """Rebuild the index from a full list, analyzing only deployments that are new or changed."""
+        console.print("[yellow]Listing deployments...[/yellow]")
+        snapshot = InventorySnapshot.from_list(self.collector, self.namespace, self.snapshot,
+                                               list(self.excluded_namespaces))
+
+        pending = [entry for entry in snapshot.entries.values() if entry['result'] is None]
+        if pending:
+            results = self.analyzer.analyze_deployments([entry['record'] for entry in pending])
+            for entry, result in zip(pending, results):
+                entry['result'] = result
+
+        with self._lock:
+            self.snapshot = snapshot
+            self.relists += 1
+            self.analyses += len(pending)
+            self.synced = True
+        console.print(f"[green]Indexed {len(snapshot.entries)} deployment(s) at resourceVersion "
+                      f"{snapshot.resource_version}, analyzed {len(pending)}[/green]")
+
+    def run(self):
+        """List, then follow the watch stream until stop() is called, re-listing when the resourceVersion expires."""
+        delay = RECONNECT_DELAY
+        needs_sync = True
+        while not self._stop.is_set():
+            try:
+                if needs_sync:
+                    self.sync()
+                    needs_sync = False
+                self._follow()
+                delay = RECONNECT_DELAY
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                if resource_version_expired(e):
+                    console.print("[yellow]Watch resourceVersion has expired, re-listing deployments...[/yellow]")
+                    needs_sync = True
+                    continue
+                console.print(f"[red]Watch failed, reconnecting in {delay:.0f}s: {str(e)}[/red]")
+                with self._lock:
+                    self.reconnects += 1
+                self._stop.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def stop(self):
+        """Ask run() to return once the current watch request ends."""
+        self._stop.set()
+
+    def _follow(self):
+        """Apply events from one watch request, resuming from the last resourceVersion seen."""
+        events = self.collector.watch_deployment_changes(self.namespace, self.snapshot.resource_version,
+                                                         timeout_seconds=self.watch_timeout)
+        for event_type, obj in events:
+            self.handle_event(event_type, obj)
+            if self._stop.is_set():
+                break
+
+    def handle_event(self, event_type: str, obj: Dict[str, Any]):
+        """Apply one watch event to the index, analyzing the deployment if its record changed."""
+        resource_version = (obj.get('metadata') or {}).get('resourceVersion')
+        key = self._key(obj) if event_type != 'BOOKMARK' else None
+        entry = None
+
+        with self._lock:
+            if key is not None and event_type in ('ADDED', 'MODIFIED'):
+                self.snapshot.apply(obj)
+                entry = self.snapshot.entries[key]
+            elif key is not None and event_type == 'DELETED':
+                self.snapshot.remove(obj)
+            # Bookmarks only move the resourceVersion forward, so a reconnect does not replay old events
+            if resource_version:
+                self.snapshot.resource_version = resource_version
+            self.events[event_type] += 1
+            self.last_event = time.time()
+
+        if entry is not None and entry['result'] is None:
+            # Analysis runs outside the lock so the HTTP endpoints stay responsive
+            result = self.analyzer.analyze_deployment(entry['record'])
+            with self._lock:
+                entry['result'] = result
+                self.analyses += 1
+
+    def _key(self, obj: Dict[str, Any]) -> Optional[str]:
+        """Return namespace/name for an object, or None if its namespace is excluded."""
+        metadata = obj.get('metadata') or {}
+        if metadata.get('namespace') in self.excluded_namespaces:
+            return None
+        return f"{metadata.get('namespace')}/{metadata.get('name')}"
+
+    def results(self, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the current analysis results as plain dicts, ordered by namespace and name."""
+        with self._lock:
+            entries = self.snapshot.select()
+            return [
+                entry['result'].to_dict() for entry in entries
+                if entry['result'] is not None and (namespace is None or entry['record'].namespace == namespace)
+            ]
+
+    def status(self) -> Dict[str, Any]:
+        """Return the state of the index and the watch stream."""
+        with self._lock:
+            return {
+                'synced': self.synced,
+                'context': self.snapshot.context,
+                'namespace': self.namespace,
+                'resource_version': self.snapshot.resource_version,
+                'deployments': len(self.snapshot.entries),
+                'events': dict(self.events),
+                'relists': self.relists,
+                'reconnects': self.reconnects,
+                'analyses': self.analyses,
+                'last_event': self.last_event
+            }
+
+    def metrics(self) -> str:
+        """Return the current results and watch counters in the Prometheus text exposition format."""
+        results = self.results()
+        status = self.status()
+        rule_failures = Counter()
+        for result in results:
+            rule_failures.update(set(result.get('rule_ids') or ()))
+
+        lines = [
+            '# HELP aca_assessor_deployments Deployments in the index.',
+            '# TYPE aca_assessor_deployments gauge',
+            f'aca_assessor_deployments {len(results)}',
+            '# HELP aca_assessor_deployments_with_issues Deployments with at least one compatibility issue.',
+            '# TYPE aca_assessor_deployments_with_issues gauge',
+            f"aca_assessor_deployments_with_issues {sum(1 for r in results if r['compatibility_issues'])}",
+            '# HELP aca_assessor_compatibility_score ACA compatibility score of each deployment, in percent.',
+            '# TYPE aca_assessor_compatibility_score gauge',
+        ]
+        for result in results:
+            lines.append(f'aca_assessor_compatibility_score{{namespace="{escape_label(result["namespace"])}",'
+                         f'deployment="{escape_label(result["name"])}"}} {result["compatibility_score"]}')
+        lines += [
+            '# HELP aca_assessor_rule_failures Deployments failing each rule.',
+            '# TYPE aca_assessor_rule_failures gauge',
+        ]
+        for rule_id, count in sorted(rule_failures.items()):
+            lines.append(f'aca_assessor_rule_failures{{rule="{escape_label(rule_id)}"}} {count}')
+        lines += [
+            '# HELP aca_assessor_watch_events_total Watch events received, by type.',
+            '# TYPE aca_assessor_watch_events_total counter',
+        ]
+        for event_type, count in sorted(status['events'].items()):
+            lines.append(f'aca_assessor_watch_events_total{{type="{escape_label(event_type)}"}} {count}')
+        lines += [
+            '# HELP aca_assessor_relists_total Full deployment lists, including the initial one.',
+            '# TYPE aca_assessor_relists_total counter',
+            f"aca_assessor_relists_total {status['relists']}",
+            '# HELP aca_assessor_watch_reconnects_total Watch requests that failed and were retried.',
+            '# TYPE aca_assessor_watch_reconnects_total counter',
+            f"aca_assessor_watch_reconnects_total {status['reconnects']}",
+            '# HELP aca_assessor_analyses_total Deployments analyzed since the daemon started.',
+            '# TYPE aca_assessor_analyses_total counter',
+            f"aca_assessor_analyses_total {status['analyses']}",
+            '# HELP aca_assessor_synced Whether the initial list has completed.',
+            '# TYPE aca_assessor_synced gauge',
+            f"aca_assessor_synced {int(status['synced'])}",
+        ]
+        if status['last_event'] is not None:
+            lines += [
+                '# HELP aca_assessor_last_event_timestamp_seconds Time of the last watch event.',
+                '# TYPE aca_assessor_last_event_timestamp_seconds gauge',
+                f"aca_assessor_last_event_timestamp_seconds {status['last_event']:.3f}",
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves /results, /metrics, /status and /healthz from the daemon bound to the server."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        daemon: AssessmentDaemon = self.server.assessment
+        if url.path == '/results':
+            namespace = parse_qs(url.query).get('namespace', [None])[0]
+            self._send(200, 'application/json', json.dumps(daemon.results(namespace)))
+        elif url.path == '/metrics':
+            self._send(200, 'text/plain; version=0.0.4; charset=utf-8', daemon.metrics())
+        elif url.path == '/status':
+            self._send(200, 'application/json', json.dumps(daemon.status()))
+        elif url.path == '/healthz':
+            # Not ready until the initial list has been analyzed
+            if daemon.synced:
+                self._send(200, 'text/plain; charset=utf-8', 'ok\n')
+            else:
+                self._send(503, 'text/plain; charset=utf-8', 'syncing\n')
+        else:
+            self._send(404, 'text/plain; charset=utf-8', 'not found\n')
+
+    def _send(self, status: int, content_type: str, body: str):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep request logs out of the console
+        pass
+
+
+def serve(daemon: AssessmentDaemon, host: str = '127.0.0.1', port: int = 9464) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """Start serving the daemon's results in a background thread and return the server and its thread."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.assessment = daemon
+    thread = threading.Thread(target=server.serve_forever, name='aca-assessor-http', daemon=True)
+    thread.start()
+    return server, thread
@@ -0,0 +1,156 @@
+"""
+Workload inventory module for ACA Assessor.
+Joins Services, Ingresses and HorizontalPodAutoscalers to the workloads they
+select, route to or scale, using in-memory indexes instead of comparing every
+pair of objects:
+
+- Services are indexed by one (namespace, key, value) pair of their selector,
+  so a workload only checks the services that share at least one of its pod
+  labels, and only those are matched against their full selector.
+- Ingresses are indexed by (namespace, backend service name).
+- Autoscalers are indexed by (namespace, kind, name) of their scaleTargetRef.
+
+CronJobIndex maps the Jobs a CronJob created back to it, so usage samples of
+their pods count towards the CronJob.
+
+Building the indexes and attaching them to each workload both take time linear
+in the number of objects, for the usual case of selectors with distinct labels.
+"""
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from . import records
+from .models import Deployment, Service, Ingress
+
+# Workload kinds that can be collected, by the lower-case name used on the command line
+WORKLOAD_KINDS = {
+    'deployment': 'Deployment',
+    'statefulset': 'StatefulSet',
+    'daemonset': 'DaemonSet',
+    'job': 'Job',
+    'cronjob': 'CronJob'
+}
+
+
+def parse_kinds(value: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated list of workload kinds, or `all`, into kind names."""
+    if not value:
+        return ('Deployment',)
+    given = [name.strip() for name in value.split(',') if name.strip()]
+    names = [name.lower().rstrip('s') for name in given]
+    if 'all' in names:
+        return tuple(WORKLOAD_KINDS.values())
+    unknown = [name for name, normalized in zip(given, names) if normalized not in WORKLOAD_KINDS]
+    if unknown:
+        raise ValueError(f"Unknown workload kind(s): {', '.join(unknown)} "
+                         f"(expected {', '.join(WORKLOAD_KINDS)} or all)")
+    return tuple(dict.fromkeys(WORKLOAD_KINDS[name] for name in names))
+
+
+class RelatedIndex:
+    """Services, Ingresses and autoscalers of an inventory, indexed for joining to workloads."""
+
+    def __init__(self):
+        # (namespace, label key, label value) -> (selector, service) for services whose selector has that pair
+        self._services: Dict[Tuple[str, str, str], List[Tuple[Dict[str, str], Service]]] = {}
+        # (namespace, service name) -> ingresses with that service as a backend
+        self._ingresses: Dict[Tuple[str, str], List[Ingress]] = {}
+        # (namespace, target kind, target name) -> maxReplicas
+        self._autoscalers: Dict[Tuple[str, str, str], int] = {}
+        self.counts = {'services': 0, 'ingresses': 0, 'autoscalers': 0}
+
+    def add_service(self, obj: Dict[str, Any]):
+        """Index a raw service object by one pair of its selector."""
+        selector = (obj.get('spec') or {}).get('selector')
+        if not selector:
+            # Services without a selector do not select pods, e.g. ExternalName services
+            return
+        namespace = (obj.get('metadata') or {}).get('namespace')
+        key, value = min(selector.items())
+        self._services.setdefault((namespace, key, value), []).append((selector, records.process_service(obj)))
+        self.counts['services'] += 1
+
+    def add_ingress(self, obj: Dict[str, Any]):
+        """Index a raw ingress object by each service it routes to."""
+        namespace = (obj.get('metadata') or {}).get('namespace')
+        ingress = records.process_ingress(obj)
+        for name in records.ingress_backends(obj):
+            self._ingresses.setdefault((namespace, name), []).append(ingress)
+        self.counts['ingresses'] += 1
+
+    def add_autoscaler(self, obj: Dict[str, Any]):
+        """Index a raw HorizontalPodAutoscaler object by its scale target."""
+        spec = obj.get('spec') or {}
+        target = spec.get('scaleTargetRef') or {}
+        if spec.get('maxReplicas') is None or not target.get('name'):
+            return
+        namespace = (obj.get('metadata') or {}).get('namespace')
+        self._autoscalers[(namespace, target.get('kind'), target['name'])] = spec['maxReplicas']
+        self.counts['autoscalers'] += 1
+
+    def add(self, kind: str, obj: Dict[str, Any]):
+        """Index a raw Service, Ingress or HorizontalPodAutoscaler object."""
+        if kind == 'Service':
+            self.add_service(obj)
+        elif kind == 'Ingress':
+            self.add_ingress(obj)
+        elif kind == 'HorizontalPodAutoscaler':
+            self.add_autoscaler(obj)
+
+    def attach(self, workload: Deployment, pod_labels: Optional[Dict[str, str]]) -> Deployment:
+        """Set the services, ingresses and autoscaler maximum of a workload from the indexes."""
+        namespace = workload.namespace
+        services = []
+        seen = set()
+        for key, value in (pod_labels or {}).items():
+            for selector, service in self._services.get((namespace, key, value), ()):
+                if service.name not in seen and all(pod_labels.get(k) == v for k, v in selector.items()):
+                    seen.add(service.name)
+                    services.append(service)
+
+        ingresses = []
+        routed = set()
+        for service in services:
+            for ingress in self._ingresses.get((namespace, service.name), ()):
+                if ingress.name not in routed:
+                    routed.add(ingress.name)
+                    ingresses.append(ingress)
+
+        workload.services = tuple(sorted(services, key=lambda service: service.name))
+        workload.ingresses = tuple(sorted(ingresses, key=lambda ingress: ingress.name))
+        workload.hpa_max_replicas = self._autoscalers.get((namespace, workload.kind, workload.name))
+        return workload
+
+
+class CronJobIndex:
+    """The CronJobs of an inventory and the Jobs they created, for attributing Job pods to their CronJob."""
+
+    def __init__(self):
+        # (namespace, name) of every CronJob
+        self._cronjobs: Set[Tuple[str, str]] = set()
+        # (namespace, job name) -> name of the CronJob in the Job's ownerReferences
+        self._jobs: Dict[Tuple[str, str], str] = {}
+
+    def add_cronjob(self, namespace: str, name: str):
+        """Index a CronJob by namespace and name."""
+        self._cronjobs.add((namespace, name))
+
+    def add_job(self, obj: Dict[str, Any]):
+        """Index a raw Job object by the CronJob that owns it, if any."""
+        metadata = obj.get('metadata') or {}
+        owner = records.controller_reference(metadata)
+        if owner is not None and owner[0] == 'CronJob' and metadata.get('name'):
+            self._jobs[(metadata.get('namespace') or 'default', metadata['name'])] = owner[1]
+
+    def __len__(self) -> int:
+        return len(self._cronjobs)
+
+    def job_owner(self, namespace: str, job: str) -> Tuple[str, str]:
+        """Return the (kind, name) of the workload a Job belongs to: its CronJob if known, otherwise the Job."""
+        cronjob = self._jobs.get((namespace, job))
+        if cronjob is not None:
+            return 'CronJob', cronjob
+        # Jobs created after the index was built are named <cronjob>-<scheduled time in minutes>
+        prefix, _, suffix = job.rpartition('-')
+        if suffix.isdigit() and (namespace, prefix) in self._cronjobs:
+            return 'CronJob', prefix
+        return 'Job', job
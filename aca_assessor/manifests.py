@@ -0,0 +1,235 @@
+"""
+Offline manifest collector module for ACA Assessor.
+Reads deployments from manifest files and kubectl dumps instead of a live cluster.
+Other workload kinds can be read as well, and Services, Ingresses and HPAs in the
+same files can be joined to them; the join needs every file parsed first, so
+workloads are then yielded only once all files have been read.
+"""
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
+
+import yaml
+from rich.console import Console
+from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn
+
+from . import records
+from .inventory import CronJobIndex, RelatedIndex
+from .models import Deployment
+from .parallel import ordered_map
+from .profiling import get_profiler
+
+console = Console()
+
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    _YamlLoader = yaml.SafeLoader
+
+MANIFEST_EXTENSIONS = ('.yaml', '.yml', '.json')
+
+# Whitespace between concatenated JSON documents
+_JSON_GAP = re.compile(r'\s*')
+
+# Kinds indexed for joining to workloads
+RELATED_KINDS = ('Service', 'Ingress', 'HorizontalPodAutoscaler')
+
+# File path, workload records with their pod labels, raw related objects by kind, and any parse error
+ParsedFile = Tuple[str, List[Tuple[Deployment, Optional[Dict[str, str]]]], List[Tuple[str, Dict[str, Any]]],
+                   Optional[str]]
+
+
+class ManifestCollector:
+    def __init__(self, path: str, workers: int = 1, kinds: Tuple[str, ...] = ('Deployment',),
+                 related: bool = False):
+        self.path = path
+        # Number of processes used to parse files in parallel
+        self.workers = max(1, workers)
+        # Workload kinds to read, and whether to join Services, Ingresses and HPAs to them
+        self.kinds = tuple(kinds)
+        self.related = related
+        self.files = find_manifest_files(path)
+        # Error from the last collection, e.g. a file that could not be parsed
+        self.last_error: Optional[str] = None
+        console.print(f"[green]Found {len(self.files)} manifest file(s) in {path}[/green]")
+
+    def collect_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> List[Deployment]:
+        """Collect all deployments in the specified namespace or all namespaces from the manifest files."""
+        return list(self.iter_deployments(namespace, excluded_namespaces))
+
+    def iter_deployments(self, namespace: str = None, excluded_namespaces: List[str] = None) -> Iterator[Deployment]:
+        """Yield deployments from the manifest files as each file is parsed."""
+        if excluded_namespaces is None:
+            excluded_namespaces = []
+        self.last_error = None
+
+        if namespace and namespace in excluded_namespaces:
+            console.print(f"[yellow]Skipping excluded namespace: {namespace}[/yellow]")
+            return
+
+        skipped = 0
+        # A workload can appear in several files, e.g. a kubectl dump next to its GitOps manifest; the first is kept
+        seen: Set[Tuple[str, str, str]] = set()
+        duplicates = 0
+        index = RelatedIndex() if self.related else None
+        # With a join, workloads and their pod labels are held until every file has been indexed
+        pending: List[Tuple[Deployment, Optional[Dict[str, str]]]] = []
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console
+        ) as progress:
+            task = progress.add_task("[yellow]Parsing manifest files...", total=len(self.files))
+
+            for path, deployments, related, error in self._parse_files():
+                if error:
+                    self.last_error = f"{path}: {error}"
+                    console.print(f"[red]Error parsing {path}: {error}[/red]")
+                for kind, obj in related:
+                    index.add(kind, obj)
+                for dep, labels in deployments:
+                    if namespace and dep.namespace != namespace:
+                        continue
+                    if dep.namespace in excluded_namespaces:
+                        skipped += 1
+                        continue
+                    key = (dep.namespace, dep.kind, dep.name)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    if index is not None:
+                        pending.append((dep, labels))
+                    else:
+                        yield dep
+                progress.update(task, description=f"[yellow]Parsed {path}")
+                progress.advance(task)
+
+        for dep, labels in pending:
+            yield index.attach(dep, labels)
+
+        if skipped:
+            console.print(f"[yellow]Skipped {skipped} deployment(s) in excluded namespaces[/yellow]")
+        if duplicates:
+            console.print(f"[yellow]Skipped {duplicates} duplicate workload(s) with the same namespace, kind and name "
+                          f"as one read earlier[/yellow]")
+
+    def index_cron_jobs(self, namespace: str = None) -> CronJobIndex:
+        """Index the CronJobs in the manifest files, to attribute the Job pods of a usage recording to them."""
+        index = CronJobIndex()
+        if 'CronJob' not in self.kinds:
+            return index
+        for path in self.files:
+            _, cronjobs, _, _ = parse_manifest_file(path, kinds=('CronJob',))
+            for cronjob, _ in cronjobs:
+                if not namespace or cronjob.namespace == namespace:
+                    index.add_cronjob(cronjob.namespace, cronjob.name)
+        return index
+
+    def _parse_files(self) -> Iterator[ParsedFile]:
+        """Parse every manifest file, in file order, across a process pool if configured."""
+        parse = partial(parse_manifest_file, kinds=self.kinds, related=self.related)
+        if self.workers == 1 or len(self.files) < 2:
+            profiler = get_profiler()
+            for path in self.files:
+                with profiler.phase('parse'):
+                    parsed = parse(path)
+                if profiler.enabled:
+                    profiler.count('bytes_read', os.path.getsize(path))
+                yield parsed
+            return
+
+        # A bounded window keeps parsed-but-unconsumed files from piling up in memory
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for _, parsed in ordered_map(executor, parse, self.files, window=self.workers * 4):
+                yield parsed
+
+
+def find_manifest_files(path: str) -> List[str]:
+    """Return the manifest files at a path, walking directories recursively in sorted order."""
+    if os.path.isfile(path):
+        return [path]
+
+    files = []
+    for root, dirs, names in os.walk(path):
+        # Skip hidden directories such as .git
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(names):
+            if name.lower().endswith(MANIFEST_EXTENSIONS):
+                files.append(os.path.join(root, name))
+    return files
+
+
+def parse_manifest_file(path: str, kinds: Tuple[str, ...] = ('Deployment',), related: bool = False) -> ParsedFile:
+    """
+    Parse one file into workload records, paired with their pod labels when related objects are joined,
+    and the raw related objects, returning any error instead of raising.
+    """
+    deployments = []
+    related_objects = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith('.json'):
+                # Concatenated and newline-delimited JSON files hold one document after another
+                documents = iter_json_documents(f.read())
+            else:
+                # Multi-document YAML is parsed one document at a time
+                documents = yaml.load_all(f, Loader=_YamlLoader)
+            for document in documents:
+                for obj in iter_objects(document):
+                    kind = obj.get('kind')
+                    if kind in kinds:
+                        labels = records.pod_labels(obj, kind) if related else None
+                        deployments.append((process_manifest_workload(obj, kind), labels))
+                    elif related and kind in RELATED_KINDS:
+                        related_objects.append((kind, with_default_namespace(obj)))
+    except Exception as e:
+        return path, deployments, related_objects, str(e)
+    return path, deployments, related_objects, None
+
+
+def iter_json_documents(text: str) -> Iterator[Any]:
+    """Yield each JSON document in a text in turn, so a file may hold several, e.g. one object per line."""
+    decoder = json.JSONDecoder()
+    position = _JSON_GAP.match(text).end()
+    while position < len(text):
+        document, position = decoder.raw_decode(text, position)
+        yield document
+        position = _JSON_GAP.match(text, position).end()
+
+
+def iter_objects(document: Any) -> Iterator[Dict[str, Any]]:
+    """Yield the Kubernetes objects in a document, unwrapping List kinds such as kubectl dumps."""
+    if not isinstance(document, dict):
+        return
+    if str(document.get('kind') or '').endswith('List') and isinstance(document.get('items'), list):
+        for item in document['items']:
+            yield from iter_objects(item)
+    else:
+        yield document
+
+
+def process_manifest_workload(obj: Dict[str, Any], kind: str) -> Deployment:
+    """Process a workload manifest, applying the defaults the API server would set."""
+    processed = records.process_workload(obj, kind)
+    if not processed.namespace:
+        processed.namespace = 'default'
+    # Replicas and parallelism default to 1; DaemonSets run one pod per node instead
+    if processed.replicas is None and kind != 'DaemonSet':
+        processed.replicas = 1
+    return processed
+
+
+def with_default_namespace(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Return an object with its namespace defaulted, so it joins to workloads defaulted the same way."""
+    metadata = obj.get('metadata') or {}
+    if metadata.get('namespace'):
+        return obj
+    return dict(obj, metadata=dict(metadata, namespace='default'))
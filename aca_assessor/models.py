@@ -0,0 +1,370 @@
+"""
+Data model module for ACA Assessor.
+Compact, slotted records for deployments, containers and analysis results.
+
+Records are accessed by attribute in the analyzer's hot paths, but also behave
+as read-only mappings (record['name'], record.get('replicas'), 'cpu' in limits)
+so code written against the original dict records keeps working. Use to_dict()
+for JSON serialization and from_dict() to rebuild a record from that form.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Intern a frequently repeated string, such as an image name or protocol."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _plain(value: Any) -> Any:
+    """Convert records and tuples of records into plain dicts and lists."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+class Record(Mapping):
+    """Base class for slotted records with a dict-compatible adapter."""
+    __slots__ = ()
+
+    # Keys exposed through the mapping interface, in to_dict() order
+    _fields: Tuple[str, ...] = ()
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._keys():
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __eq__(self, other: Any) -> bool:
+        # Compare in plain form so records also equal the dicts they replace
+        if isinstance(other, Record):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == _plain(dict(other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickle as constructor arguments, which is smaller and faster than the default slot state
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={self[key]!r}" for key in self)
+        return f"{self.__class__.__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as plain dicts and lists."""
+        return {key: _plain(self[key]) for key in self}
+
+
+class ResourceList(Record):
+    """CPU and memory quantities of a container's requests or limits."""
+    __slots__ = ('cpu', 'memory')
+    _fields = ('cpu', 'memory')
+
+    def __init__(self, cpu: Optional[str] = None, memory: Optional[str] = None):
+        self.cpu = intern(cpu)
+        self.memory = intern(memory)
+
+    def _keys(self) -> Tuple[str, ...]:
+        # An unset list has no keys at all, like the empty dict it replaces
+        return () if self.cpu is None and self.memory is None else self._fields
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'ResourceList':
+        if not data:
+            return EMPTY_RESOURCE_LIST
+        return cls(data.get('cpu', ''), data.get('memory', ''))
+
+
+EMPTY_RESOURCE_LIST = ResourceList()
+
+
+class Resources(Record):
+    """Container resource requests and limits."""
+    __slots__ = ('requests', 'limits')
+    _fields = ('requests', 'limits')
+
+    def __init__(self, requests: ResourceList = EMPTY_RESOURCE_LIST, limits: ResourceList = EMPTY_RESOURCE_LIST):
+        self.requests = requests
+        self.limits = limits
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'Resources':
+        data = data or {}
+        return cls(ResourceList.from_dict(data.get('requests')), ResourceList.from_dict(data.get('limits')))
+
+
+class Port(Record):
+    """A container port."""
+    __slots__ = ('name', 'container_port', 'protocol')
+    _fields = ('name', 'container_port', 'protocol')
+
+    def __init__(self, name: Optional[str], container_port: Optional[int], protocol: Optional[str]):
+        self.name = intern(name)
+        self.container_port = container_port
+        self.protocol = intern(protocol)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Port':
+        return cls(data.get('name'), data.get('container_port'), data.get('protocol'))
+
+
+class EnvVar(Record):
+    """A container environment variable; values from secrets or references are masked."""
+    __slots__ = ('name', 'value')
+    _fields = ('name', 'value')
+
+    def __init__(self, name: Optional[str], value: str):
+        self.name = intern(name)
+        self.value = value
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EnvVar':
+        return cls(data.get('name'), data.get('value'))
+
+
+class VolumeMount(Record):
+    """A container volume mount."""
+    __slots__ = ('name', 'mount_path', 'read_only')
+    _fields = ('name', 'mount_path', 'read_only')
+
+    def __init__(self, name: Optional[str], mount_path: Optional[str], read_only: Optional[bool]):
+        self.name = intern(name)
+        self.mount_path = intern(mount_path)
+        self.read_only = read_only
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'VolumeMount':
+        return cls(data.get('name'), data.get('mount_path'), data.get('read_only'))
+
+
+class Volume(Record):
+    """A pod volume; source_name holds the claim, config map or secret name for those types."""
+    __slots__ = ('name', 'type', 'source_name')
+    _fields = ('name', 'type')
+
+    # Mapping key that exposes source_name for each volume type
+    SOURCE_KEYS = {'pvc': 'claim_name', 'configmap': 'config_map_name', 'secret': 'secret_name'}
+
+    def __init__(self, name: Optional[str], type: str, source_name: Optional[str] = None):
+        self.name = intern(name)
+        self.type = intern(type)
+        self.source_name = source_name
+
+    def _keys(self) -> Tuple[str, ...]:
+        source_key = self.SOURCE_KEYS.get(self.type)
+        return self._fields + (source_key,) if source_key else self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key == self.SOURCE_KEYS.get(self.type):
+            return self.source_name
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key == self.SOURCE_KEYS.get(self.type):
+            self.source_name = value
+        else:
+            super().__setitem__(key, value)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Volume':
+        volume_type = data.get('type', 'other')
+        return cls(data.get('name'), volume_type, data.get(cls.SOURCE_KEYS.get(volume_type, '')))
+
+
+class Container(Record):
+    """A container of a deployment's pod template."""
+    __slots__ = ('name', 'image', 'resources', 'ports', 'env', 'volume_mounts')
+    _fields = ('name', 'image', 'resources', 'ports', 'env', 'volume_mounts')
+
+    def __init__(self, name: Optional[str], image: Optional[str], resources: Resources,
+                 ports: Tuple[Port, ...] = (), env: Tuple[EnvVar, ...] = (),
+                 volume_mounts: Tuple[VolumeMount, ...] = ()):
+        self.name = intern(name)
+        self.image = intern(image)
+        self.resources = resources
+        self.ports = ports
+        self.env = env
+        self.volume_mounts = volume_mounts
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Container':
+        return cls(
+            data.get('name'),
+            data.get('image'),
+            Resources.from_dict(data.get('resources')),
+            tuple(Port.from_dict(p) for p in data.get('ports') or ()),
+            tuple(EnvVar.from_dict(e) for e in data.get('env') or ()),
+            tuple(VolumeMount.from_dict(m) for m in data.get('volume_mounts') or ())
+        )
+
+
+class ServicePort(Record):
+    """A port exposed by a service."""
+    __slots__ = ('name', 'port', 'target_port', 'protocol')
+    _fields = ('name', 'port', 'target_port', 'protocol')
+
+    def __init__(self, name: Optional[str], port: Optional[int], target_port: Any = None,
+                 protocol: Optional[str] = None):
+        self.name = intern(name)
+        self.port = port
+        self.target_port = target_port
+        self.protocol = intern(protocol)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ServicePort':
+        return cls(data.get('name'), data.get('port'), data.get('target_port'), data.get('protocol'))
+
+
+class Service(Record):
+    """A service whose selector matches a workload's pods."""
+    __slots__ = ('name', 'type', 'ports')
+    _fields = ('name', 'type', 'ports')
+
+    def __init__(self, name: Optional[str], type: Optional[str], ports: Tuple[ServicePort, ...] = ()):
+        self.name = name
+        self.type = intern(type)
+        self.ports = ports
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Service':
+        return cls(data.get('name'), data.get('type'), tuple(ServicePort.from_dict(p) for p in data.get('ports') or ()))
+
+
+class Ingress(Record):
+    """An ingress routing to one of a workload's services; backends counts the distinct services it routes to."""
+    __slots__ = ('name', 'hosts', 'tls', 'backends')
+    _fields = ('name', 'hosts', 'tls', 'backends')
+
+    def __init__(self, name: Optional[str], hosts: Tuple[str, ...] = (), tls: bool = False, backends: int = 0):
+        self.name = name
+        self.hosts = hosts
+        self.tls = tls
+        self.backends = backends
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Ingress':
+        return cls(data.get('name'), tuple(data.get('hosts') or ()), bool(data.get('tls')), data.get('backends', 0))
+
+
+class Deployment(Record):
+    """
+    A workload and the parts of its pod template relevant to the assessment.
+    Despite the name, kind may be any workload kind, e.g. StatefulSet or CronJob.
+    """
+    __slots__ = ('name', 'namespace', 'replicas', 'containers', 'volumes', 'labels', 'annotations', 'cluster',
+                 'kind', 'hpa_max_replicas', 'services', 'ingresses')
+    _fields = ('name', 'namespace', 'replicas', 'containers', 'volumes', 'labels', 'annotations', 'cluster',
+               'kind', 'hpa_max_replicas', 'services', 'ingresses')
+
+    def __init__(self, name: Optional[str], namespace: Optional[str], replicas: Optional[int],
+                 containers: Tuple[Container, ...] = (), volumes: Tuple[Volume, ...] = (),
+                 labels: Optional[Dict[str, str]] = None, annotations: Optional[Dict[str, str]] = None,
+                 cluster: Optional[str] = None, kind: str = 'Deployment', hpa_max_replicas: Optional[int] = None,
+                 services: Tuple[Service, ...] = (), ingresses: Tuple[Ingress, ...] = ()):
+        self.name = name
+        self.namespace = intern(namespace)
+        self.replicas = replicas
+        self.containers = containers
+        self.volumes = volumes
+        self.labels = labels or {}
+        self.annotations = annotations or {}
+        # Kubeconfig context the deployment was collected from, if any
+        self.cluster = intern(cluster)
+        self.kind = intern(kind)
+        # maxReplicas of the HorizontalPodAutoscaler targeting the workload, if any
+        self.hpa_max_replicas = hpa_max_replicas
+        # Services selecting the workload's pods, and ingresses routing to those services
+        self.services = services
+        self.ingresses = ingresses
+
+    @property
+    def max_replicas(self) -> Optional[int]:
+        """The most replicas the workload can run: the autoscaler's maximum if it has one, otherwise replicas."""
+        return self.hpa_max_replicas if self.hpa_max_replicas is not None else self.replicas
+
+    @property
+    def exposed_ports(self) -> int:
+        """The number of distinct pod ports the workload's services route traffic to."""
+        return len({
+            port.target_port if port.target_port is not None else port.port
+            for service in self.services for port in service.ports
+        })
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Deployment':
+        if isinstance(data, Deployment):
+            return data
+        return cls(
+            data.get('name'),
+            data.get('namespace'),
+            data.get('replicas'),
+            tuple(Container.from_dict(c) for c in data.get('containers') or ()),
+            tuple(Volume.from_dict(v) for v in data.get('volumes') or ()),
+            data.get('labels'),
+            data.get('annotations'),
+            data.get('cluster'),
+            data.get('kind') or 'Deployment',
+            data.get('hpa_max_replicas'),
+            tuple(Service.from_dict(s) for s in data.get('services') or ()),
+            tuple(Ingress.from_dict(i) for i in data.get('ingresses') or ())
+        )
+
+
+class AnalysisResult(Record):
+    """The compatibility assessment of a single workload; rule_ids[i] is the rule that raised compatibility_issues[i]."""
+    __slots__ = ('name', 'namespace', 'compatibility_issues', 'recommendations', 'compatibility_score', 'rule_ids',
+                 'template', 'cluster', 'kind', 'usage')
+    _fields = ('name', 'namespace', 'compatibility_issues', 'recommendations', 'compatibility_score', 'rule_ids',
+               'template', 'cluster', 'kind', 'usage')
+
+    def __init__(self, name: Optional[str], namespace: Optional[str], compatibility_issues: List[str] = None,
+                 recommendations: List[str] = None, compatibility_score: int = 100, rule_ids: List[str] = None,
+                 template: Optional[str] = None, cluster: Optional[str] = None,
+                 kind: str = 'Deployment', usage: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.namespace = intern(namespace)
+        self.compatibility_issues = compatibility_issues if compatibility_issues is not None else []
+        self.recommendations = recommendations if recommendations is not None else []
+        self.compatibility_score = compatibility_score
+        self.rule_ids = rule_ids if rule_ids is not None else []
+        # Id of the pod template fingerprint; deployments with the same id were assessed identically
+        self.template = template
+        self.cluster = intern(cluster)
+        self.kind = intern(kind)
+        # Observed usage percentiles and recommended size, when usage was sampled
+        self.usage = usage
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnalysisResult':
+        return cls(
+            data.get('name'),
+            data.get('namespace'),
+            list(data.get('compatibility_issues') or []),
+            list(data.get('recommendations') or []),
+            data.get('compatibility_score', 100),
+            list(data.get('rule_ids') or []),
+            data.get('template'),
+            data.get('cluster'),
+            data.get('kind') or 'Deployment',
+            data.get('usage')
+        )
@@ -0,0 +1,24 @@
+"""
+Parallel execution helpers for ACA Assessor.
+"""
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+
+def ordered_map(executor: Executor, func: Callable[[Any], Any], items: Iterable[Any],
+                window: int) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yield (item, func(item)) in input order while keeping at most `window` calls in flight.
+    Unlike Executor.map, items are consumed lazily, so memory stays bounded for long inputs.
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(func, item)))
+        if len(pending) >= window:
+            head, future = pending.popleft()
+            yield head, future.result()
+
+    while pending:
+        head, future = pending.popleft()
+        yield head, future.result()
@@ -0,0 +1,188 @@
+"""
+Profiling module for ACA Assessor.
+Records wall time per phase, counters such as API calls and bytes received, and
+per-namespace latency for an assess run, and writes them as a JSON trace or an
+OpenMetrics text file.
+
+Instrumented code calls get_profiler(), which returns a no-op profiler unless
+--profile started a real one, so instrumentation costs almost nothing in
+normal runs. Worker processes always use the no-op profiler; per-check timings
+are only recorded when analysis runs in the main process (--workers 1).
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterator, List, Any, Optional
+
+if TYPE_CHECKING:
+    from rich.table import Table
+
+
+# Shared, reusable no-op context manager returned by NullProfiler.phase
+_NO_PHASE = nullcontext()
+
+
+class NullProfiler:
+    """Profiler used when profiling is off; every method does nothing."""
+    enabled = False
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return _NO_PHASE
+
+    def record(self, name: str, seconds: float):
+        pass
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def record_namespace(self, namespace: str, seconds: float):
+        pass
+
+
+class Profiler(NullProfiler):
+    """Collects phase timings, counters and per-namespace latency; safe to use from collector threads."""
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.finished: Optional[float] = None
+        # Phase name -> [calls, total seconds, slowest call], in order of first appearance
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        # Namespace -> seconds spent listing its deployments
+        self.namespaces: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block of code as one call of a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Add one call of a phase that took `seconds`."""
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                self.phases[name] = [1, seconds, seconds]
+            else:
+                phase[0] += 1
+                phase[1] += seconds
+                phase[2] = max(phase[2], seconds)
+
+    def count(self, name: str, amount: int = 1):
+        """Increase a counter, e.g. api_calls or bytes_received."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_namespace(self, namespace: str, seconds: float):
+        """Record the time spent collecting a namespace."""
+        with self._lock:
+            self.namespaces[namespace] = self.namespaces.get(namespace, 0.0) + seconds
+
+    def stop(self):
+        """Mark the end of the run."""
+        self.finished = time.perf_counter()
+
+    @property
+    def wall_time(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trace as plain data."""
+        return {
+            'started': self.started,
+            'wall_seconds': self.wall_time,
+            'phases': [
+                {'name': name, 'calls': int(calls), 'seconds': total, 'max_seconds': slowest}
+                for name, (calls, total, slowest) in self.phases.items()
+            ],
+            'counters': dict(self.counters),
+            'namespaces': dict(sorted(self.namespaces.items()))
+        }
+
+    def to_openmetrics(self) -> str:
+        """Return the trace in the OpenMetrics text format."""
+        lines = [
+            '# TYPE aca_assessor_wall_seconds gauge',
+            f'aca_assessor_wall_seconds {self.wall_time:.6f}',
+            '# TYPE aca_assessor_phase_seconds counter',
+        ]
+        for name, (_, total, _) in self.phases.items():
+            lines.append(f'aca_assessor_phase_seconds_total{{phase="{escape_label(name)}"}} {total:.6f}')
+        lines.append('# TYPE aca_assessor_phase_calls counter')
+        for name, (calls, _, _) in self.phases.items():
+            lines.append(f'aca_assessor_phase_calls_total{{phase="{escape_label(name)}"}} {int(calls)}')
+        for name, value in self.counters.items():
+            metric = f'aca_assessor_{name}'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}_total {value}')
+        if self.namespaces:
+            lines.append('# TYPE aca_assessor_namespace_seconds gauge')
+            for namespace, seconds in sorted(self.namespaces.items()):
+                lines.append(f'aca_assessor_namespace_seconds{{namespace="{escape_label(namespace)}"}} {seconds:.6f}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str, output_format: str = 'json'):
+        """Write the trace to a file as JSON or OpenMetrics text."""
+        with open(path, 'w', encoding='utf-8') as f:
+            if output_format == 'openmetrics':
+                f.write(self.to_openmetrics())
+            else:
+                json.dump(self.to_dict(), f, indent=2)
+                f.write('\n')
+
+    def summary_table(self, top_namespaces: int = 5) -> 'Table':
+        """Build a short table of phase timings, counters and the slowest namespaces."""
+        from rich.table import Table
+
+        table = Table(title=f"Profile ({self.wall_time:.2f}s wall time)")
+        table.add_column("Phase", style="cyan")
+        table.add_column("Calls", style="magenta", justify="right")
+        table.add_column("Total", style="magenta", justify="right")
+        table.add_column("Slowest", style="magenta", justify="right")
+        for name, (calls, total, slowest) in self.phases.items():
+            table.add_row(name, str(int(calls)), f"{total:.3f}s", f"{slowest:.3f}s")
+        for name, value in self.counters.items():
+            table.add_row(name, str(value), "", "")
+        slowest_namespaces = sorted(self.namespaces.items(), key=lambda item: -item[1])[:top_namespaces]
+        for namespace, seconds in slowest_namespaces:
+            table.add_row(f"namespace {namespace}", "", f"{seconds:.3f}s", "")
+        return table
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the OpenMetrics text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_active: NullProfiler = NullProfiler()
+
+
+def get_profiler() -> NullProfiler:
+    """Return the active profiler, which does nothing unless profiling was started."""
+    return _active
+
+
+def start_profiler() -> Profiler:
+    """Start recording a profile for this process and return the profiler."""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def stop_profiler() -> NullProfiler:
+    """Stop recording and return the profiler that was active."""
+    global _active
+    profiler = _active
+    if isinstance(profiler, Profiler):
+        profiler.stop()
+    _active = NullProfiler()
+    return profiler
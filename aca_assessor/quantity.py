@@ -0,0 +1,136 @@
+"""
+Kubernetes quantity module for ACA Assessor.
+Parses resource quantities such as `500m`, `1.5Gi`, `2e3` or `128M` exactly,
+following the Kubernetes quantity grammar:
+
+    <quantity> ::= <signedNumber><suffix>
+    <suffix>   ::= <binarySI> | <decimalExponent> | <decimalSI>
+    <binarySI> ::= Ki | Mi | Gi | Ti | Pi | Ei
+    <decimalSI> ::= n | u | m | "" | k | M | G | T | P | E
+    <decimalExponent> ::= "e" <signedNumber> | "E" <signedNumber>
+
+Parsing is exact (Fractions), so `1.5Gi` is exactly 1.5 GiB and `100m` exactly
+0.1 cores; the unit helpers round that exact value once to a float, which keeps
+comparisons in the analyzer's hot path cheap. A fleet only holds a few hundred
+distinct quantity strings, so parsing sits behind a bounded cache and each
+string is parsed once per process.
+"""
+import re
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+# Distinct quantity strings kept per cache; a fleet rarely has more than a few hundred
+QUANTITY_CACHE_SIZE = 4096
+
+# Multiplier for each suffix
+SUFFIXES = {
+    'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40, 'Pi': 2 ** 50, 'Ei': 2 ** 60,
+    'n': Fraction(1, 10 ** 9), 'u': Fraction(1, 10 ** 6), 'm': Fraction(1, 10 ** 3), '': 1,
+    'k': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9, 'T': 10 ** 12, 'P': 10 ** 15, 'E': 10 ** 18
+}
+
+# Units accepted by the batch API, as the number of base units (cores or bytes) in each
+UNITS = {
+    'cores': 1,
+    'millicores': Fraction(1, 1000),
+    'bytes': 1,
+    'mib': 2 ** 20,
+    'gib': 2 ** 30
+}
+
+# An exponent needs digits, so a bare trailing E is the exa suffix rather than an exponent
+_QUANTITY_RE = re.compile(
+    r'([+-]?(?:\d+(?:\.\d*)?|\.\d+))(?:[eE]([+-]?\d+)|(Ki|Mi|Gi|Ti|Pi|Ei|[numkMGTPE])?)'
+)
+
+_GIB = 2 ** 30
+
+
+@lru_cache(maxsize=QUANTITY_CACHE_SIZE)
+def _parse(value: Any) -> Optional[Fraction]:
+    """Parse a quantity, returning None if it is not valid."""
+    match = _QUANTITY_RE.fullmatch(str(value).strip())
+    if not match:
+        return None
+    number, exponent, suffix = match.groups()
+    if exponent is not None:
+        return Fraction(number) * Fraction(10) ** int(exponent)
+    return Fraction(number) * SUFFIXES[suffix or '']
+
+
+@lru_cache(maxsize=QUANTITY_CACHE_SIZE)
+def cpu_cores(value: Any) -> float:
+    """Convert a CPU quantity to cores; invalid quantities count as zero."""
+    return float(_parse(value) or 0)
+
+
+@lru_cache(maxsize=QUANTITY_CACHE_SIZE)
+def memory_gib(value: Any) -> float:
+    """Convert a memory quantity to GiB; invalid quantities count as zero."""
+    return float((_parse(value) or 0) / _GIB)
+
+
+def usage_value(value: Any, unit: str = 'cores') -> float:
+    """
+    Convert a metrics usage quantity to a float in a unit; invalid quantities count as zero.
+    Usage samples rarely repeat, so they bypass the parse cache; the integer nanocore and
+    kibibyte forms the metrics server reports skip the exact parse as well.
+    """
+    text = str(value)
+    if text[-1:] == 'n' and text[:-1].isdigit():
+        return int(text[:-1]) / 1e9 / UNITS[unit]
+    if text[-2:] == 'Ki' and text[:-2].isdigit():
+        return int(text[:-2]) * 1024 / UNITS[unit]
+    match = _QUANTITY_RE.fullmatch(text.strip())
+    if not match:
+        return 0.0
+    number, exponent, suffix = match.groups()
+    multiplier = Fraction(10) ** int(exponent) if exponent is not None else SUFFIXES[suffix or '']
+    return float(Fraction(number) * multiplier / UNITS[unit])
+
+
+def convert_column(values: Iterable[Any], unit: str = 'cores') -> List[Optional[float]]:
+    """Convert a column of quantities to floats in a unit; missing or invalid entries become None."""
+    if unit not in UNITS:
+        raise ValueError(f"Unknown unit '{unit}', expected one of: {', '.join(UNITS)}")
+    scale = UNITS[unit]
+
+    # Columns repeat a handful of distinct strings, so each is converted once
+    converted: Dict[Any, Optional[float]] = {}
+    column = []
+    for value in values:
+        if value is None or value == '':
+            column.append(None)
+            continue
+        if value not in converted:
+            parsed = _parse(value)
+            if parsed is None:
+                converted[value] = None
+            else:
+                converted[value] = float(parsed / scale if scale != 1 else parsed)
+        column.append(converted[value])
+    return column
+
+
+def resource_columns(deployments: Iterable[Any]) -> Dict[str, List[Any]]:
+    """
+    Split container requests and limits into columns, one row per container, with the position of its
+    deployment in `deployments`.
+    """
+    columns = {
+        'workload': [],
+        'requests.cpu': [],
+        'requests.memory': [],
+        'limits.cpu': [],
+        'limits.memory': []
+    }
+    for index, deployment in enumerate(deployments):
+        for container in deployment.containers:
+            resources = container.resources
+            columns['workload'].append(index)
+            columns['requests.cpu'].append(resources.requests.cpu)
+            columns['requests.memory'].append(resources.requests.memory)
+            columns['limits.cpu'].append(resources.limits.cpu)
+            columns['limits.memory'].append(resources.limits.memory)
+    return columns
@@ -0,0 +1,168 @@
+"""
+Raw record mapping module for ACA Assessor.
+Maps Kubernetes objects in their JSON form (camelCase keys, as returned by the
+API server) directly into the workload, service and ingress records used by the
+analyzer, without building kubernetes client model objects first.
+"""
+from typing import Dict, List, Any, Optional, Tuple
+
+from .models import (Deployment, Container, Resources, ResourceList, Port, EnvVar, VolumeMount, Volume,
+                     Service, ServicePort, Ingress, EMPTY_RESOURCE_LIST)
+
+
+def process_deployments(deployments: List[Dict[str, Any]]) -> List[Deployment]:
+    """Process raw deployment objects into a structured format."""
+    return [process_deployment(dep) for dep in deployments]
+
+
+def process_deployment(dep: Dict[str, Any]) -> Deployment:
+    """Process a single raw deployment object, matching KubernetesCollector._process_deployments."""
+    return process_workload(dep, 'Deployment')
+
+
+def pod_template(obj: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    """Return the pod template of a raw workload object; CronJobs nest it inside their job template."""
+    spec = obj.get('spec') or {}
+    if kind == 'CronJob':
+        spec = (spec.get('jobTemplate') or {}).get('spec') or {}
+    return spec.get('template') or {}
+
+
+def pod_labels(obj: Dict[str, Any], kind: str) -> Optional[Dict[str, str]]:
+    """Return the pod template labels of a raw workload object, which service selectors match against."""
+    return (pod_template(obj, kind).get('metadata') or {}).get('labels')
+
+
+def controller_reference(metadata: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Return the (kind, name) of the controller in an object's ownerReferences, or None if it has none."""
+    for reference in metadata.get('ownerReferences') or ():
+        if reference.get('controller') and reference.get('kind') and reference.get('name'):
+            return reference['kind'], reference['name']
+    return None
+
+
+def workload_replicas(obj: Dict[str, Any], kind: str) -> Optional[int]:
+    """Return the number of pods a raw workload object asks for; DaemonSets run one per node and have none."""
+    spec = obj.get('spec') or {}
+    if kind == 'DaemonSet':
+        return None
+    if kind == 'Job':
+        return spec.get('parallelism')
+    if kind == 'CronJob':
+        return ((spec.get('jobTemplate') or {}).get('spec') or {}).get('parallelism')
+    return spec.get('replicas')
+
+
+def process_workload(obj: Dict[str, Any], kind: str) -> Deployment:
+    """Process a raw Deployment, StatefulSet, DaemonSet, Job or CronJob object into a workload record."""
+    metadata = obj.get('metadata') or {}
+    pod_spec = pod_template(obj, kind).get('spec') or {}
+    return Deployment(
+        metadata.get('name'),
+        metadata.get('namespace'),
+        workload_replicas(obj, kind),
+        tuple(Container(
+            c.get('name'),
+            c.get('image'),
+            process_resources(c.get('resources')),
+            process_ports(c.get('ports')),
+            process_env(c.get('env')),
+            process_volume_mounts(c.get('volumeMounts'))
+        ) for c in pod_spec.get('containers') or ()),
+        process_volumes(pod_spec.get('volumes')),
+        metadata.get('labels'),
+        metadata.get('annotations'),
+        kind=kind
+    )
+
+
+def process_service(svc: Dict[str, Any]) -> Service:
+    """Process a raw service object."""
+    spec = svc.get('spec') or {}
+    return Service(
+        (svc.get('metadata') or {}).get('name'),
+        spec.get('type') or 'ClusterIP',
+        tuple(ServicePort(p.get('name'), p.get('port'), p.get('targetPort'), p.get('protocol') or 'TCP')
+              for p in spec.get('ports') or ())
+    )
+
+
+def ingress_backends(ing: Dict[str, Any]) -> List[str]:
+    """Return the names of the services a raw networking.k8s.io/v1 ingress routes to, in order of first use."""
+    spec = ing.get('spec') or {}
+    backends = [spec.get('defaultBackend')]
+    for rule in spec.get('rules') or ():
+        for path in (rule.get('http') or {}).get('paths') or ():
+            backends.append(path.get('backend'))
+
+    names = []
+    for backend in backends:
+        name = ((backend or {}).get('service') or {}).get('name')
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def process_ingress(ing: Dict[str, Any]) -> Ingress:
+    """Process a raw ingress object."""
+    spec = ing.get('spec') or {}
+    return Ingress(
+        (ing.get('metadata') or {}).get('name'),
+        tuple(rule['host'] for rule in spec.get('rules') or () if rule.get('host')),
+        bool(spec.get('tls')),
+        len(ingress_backends(ing))
+    )
+
+
+def process_resources(resources: Dict[str, Any]) -> Resources:
+    """Process raw container resource requirements."""
+    if not resources:
+        return Resources()
+
+    requests = resources.get('requests')
+    limits = resources.get('limits')
+    return Resources(
+        ResourceList(requests.get('cpu', ''), requests.get('memory', '')) if requests else EMPTY_RESOURCE_LIST,
+        ResourceList(limits.get('cpu', ''), limits.get('memory', '')) if limits else EMPTY_RESOURCE_LIST
+    )
+
+
+def process_ports(ports: List[Dict[str, Any]]) -> Tuple[Port, ...]:
+    """Process raw container port configurations."""
+    if not ports:
+        return ()
+    return tuple(Port(p.get('name'), p.get('containerPort'), p.get('protocol')) for p in ports)
+
+
+def process_env(env: List[Dict[str, Any]]) -> Tuple[EnvVar, ...]:
+    """Process raw container environment variables."""
+    if not env:
+        return ()
+    return tuple(EnvVar(
+        e.get('name'),
+        e.get('value') if e.get('value') else 'FROM_SECRET' if e.get('valueFrom') is not None else ''
+    ) for e in env)
+
+
+def process_volume_mounts(mounts: List[Dict[str, Any]]) -> Tuple[VolumeMount, ...]:
+    """Process raw container volume mounts."""
+    if not mounts:
+        return ()
+    return tuple(VolumeMount(m.get('name'), m.get('mountPath'), m.get('readOnly')) for m in mounts)
+
+
+def process_volumes(volumes: List[Dict[str, Any]]) -> Tuple[Volume, ...]:
+    """Process raw pod volumes."""
+    if not volumes:
+        return ()
+    processed = []
+    for vol in volumes:
+        if vol.get('persistentVolumeClaim') is not None:
+            processed.append(Volume(vol.get('name'), 'pvc', vol['persistentVolumeClaim'].get('claimName')))
+        elif vol.get('configMap') is not None:
+            processed.append(Volume(vol.get('name'), 'configmap', vol['configMap'].get('name')))
+        elif vol.get('secret') is not None:
+            processed.append(Volume(vol.get('name'), 'secret', vol['secret'].get('secretName')))
+        else:
+            processed.append(Volume(vol.get('name'), 'other'))
+    return tuple(processed)
@@ -0,0 +1,424 @@
+"""
+Report writers for ACA Assessor.
+Every writer receives analysis results one at a time through write() and emits
+them immediately, so reports for large fleets never have to be held in memory.
+"""
+import csv
+import heapq
+import json
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Any, IO, Optional
+
+from rich.console import Console
+from rich.markup import escape
+
+from . import __version__
+
+if TYPE_CHECKING:
+    from rich.table import Table
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+CSV_COLUMNS = ['namespace', 'name', 'compatibility_score', 'issue_count', 'rule_ids',
+               'compatibility_issues', 'recommendations', 'template', 'cluster', 'kind',
+               'recommended_cpu', 'recommended_memory_gib']
+
+
+class ClusterRollup:
+    """Per-cluster totals for reports that merge several clusters."""
+
+    def __init__(self):
+        # Cluster -> [deployment count, total score, deployments with issues]
+        self.clusters: Dict[str, List[int]] = {}
+
+    def add(self, result: Dict[str, Any]):
+        cluster = result.get('cluster')
+        if cluster is None:
+            return
+        entry = self.clusters.setdefault(cluster, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += result['compatibility_score']
+        if result['compatibility_issues']:
+            entry[2] += 1
+
+    def table(self) -> Optional['Table']:
+        """Build a table with one row per cluster, or None if no result was tagged with a cluster."""
+        from rich.table import Table
+
+        if not self.clusters:
+            return None
+        table = Table(title="Cluster Rollup")
+        table.add_column("Cluster", style="cyan")
+        table.add_column("Deployments", style="magenta", justify="right")
+        table.add_column("Average Score", style="magenta", justify="right")
+        table.add_column("With Issues", style="red", justify="right")
+        for cluster, (count, total_score, with_issues) in sorted(self.clusters.items()):
+            table.add_row(cluster, str(count), f"{total_score / count:.0f}%", str(with_issues))
+        return table
+
+
+class TemplateTally:
+    """Count how many deployments share each pod template, to spot bulk migration candidates."""
+
+    def __init__(self):
+        # Template id -> [deployment count, score, first deployment seen]
+        self.templates: Dict[str, List[Any]] = {}
+
+    def add(self, result: Dict[str, Any]):
+        template = result.get('template')
+        if template is None:
+            return
+        entry = self.templates.get(template)
+        if entry is None:
+            self.templates[template] = [1, result['compatibility_score'], display_name(result)]
+        else:
+            entry[0] += 1
+
+    def shared(self, top: int = 10) -> List[Any]:
+        """Return (template, count, score, example) for the most widely shared templates."""
+        shared = [(template, *entry) for template, entry in self.templates.items() if entry[0] > 1]
+        shared.sort(key=lambda item: (-item[1], item[0]))
+        return shared[:top]
+
+    def table(self, top: int = 10) -> Optional['Table']:
+        """Build a table of the most widely shared templates, or None if every template is unique."""
+        from rich.table import Table
+
+        shared = self.shared(top)
+        if not shared:
+            return None
+        table = Table(title="Shared Pod Templates")
+        table.add_column("Template", style="cyan")
+        table.add_column("Deployments", style="magenta", justify="right")
+        table.add_column("Compatibility Score", style="magenta", justify="right")
+        table.add_column("Example", style="green")
+        for template, count, score, example in shared:
+            table.add_row(template, str(count), f"{score}%", example)
+        return table
+
+
+class ReportWriter:
+    """Base class for report writers; keeps the running totals used for summaries."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_score = 0
+        self.with_issues = 0
+
+    def write(self, result: Dict[str, Any]):
+        """Write a single analysis result."""
+        self.count += 1
+        self.total_score += result['compatibility_score']
+        if result['compatibility_issues']:
+            self.with_issues += 1
+
+    def close(self):
+        """Finish the report."""
+        pass
+
+
+class StreamingReporter(ReportWriter):
+    """Print each analysis result to the terminal as soon as it is produced."""
+
+    def __init__(self, console: Console):
+        super().__init__()
+        self.console = console
+        self.templates = TemplateTally()
+        self.clusters = ClusterRollup()
+
+    def write(self, result: Dict[str, Any]):
+        """Print a single analysis result."""
+        super().write(result)
+        self.templates.add(result)
+        self.clusters.add(result)
+
+        score = result['compatibility_score']
+        color = 'green' if score >= 80 else 'yellow' if score >= 50 else 'red'
+        self.console.print(f"[cyan]{escape(display_name(result))}[/cyan] [{color}]{score}%[/{color}]")
+
+        if not result['compatibility_issues']:
+            self.console.print("  [green]No issues found[/green]")
+        for issue in result['compatibility_issues']:
+            self.console.print(f"  [red]✗ {escape(issue)}[/red]")
+        for recommendation in result['recommendations']:
+            self.console.print(f"  [green]→ {escape(recommendation)}[/green]")
+
+    def close(self):
+        """Print a one-line summary of everything written."""
+        if not self.count:
+            return
+        average = self.total_score / self.count
+        self.console.print(f"\n[bold]Assessed {self.count} deployment(s): average score {average:.0f}%, "
+                           f"{self.with_issues} with issues[/bold]")
+        for table in (self.clusters.table(), self.templates.table()):
+            if table is not None:
+                self.console.print(table)
+
+
+class SummaryReporter(ReportWriter):
+    """Print only fleet-level totals, the most common issues and the lowest-scoring deployments."""
+
+    def __init__(self, console: Console, top: int = 10):
+        super().__init__()
+        self.console = console
+        self.top = top
+        self.bands = Counter()
+        self.rule_counts = Counter()
+        self.templates = TemplateTally()
+        self.clusters = ClusterRollup()
+        # Bounded heap of (-score, key) so only the `top` lowest scores are kept
+        self.lowest: List[Any] = []
+
+    def write(self, result: Dict[str, Any]):
+        super().write(result)
+        score = result['compatibility_score']
+        self.bands['high' if score >= 80 else 'medium' if score >= 50 else 'low'] += 1
+        self.templates.add(result)
+        self.clusters.add(result)
+        # Count each rule once per deployment, however many containers it failed for
+        self.rule_counts.update(set(result.get('rule_ids') or []))
+
+        entry = (-score, display_name(result))
+        if len(self.lowest) < self.top:
+            heapq.heappush(self.lowest, entry)
+        elif entry > self.lowest[0]:
+            heapq.heapreplace(self.lowest, entry)
+
+    def close(self):
+        """Print the summary tables."""
+        from rich.table import Table
+
+        if not self.count:
+            return
+        average = self.total_score / self.count
+        self.console.print(f"\n[bold]Assessed {self.count} deployment(s): average score {average:.0f}%, "
+                           f"{self.with_issues} with issues[/bold]")
+        self.console.print(f"[green]{self.bands['high']} scoring 80% or more[/green], "
+                           f"[yellow]{self.bands['medium']} scoring 50-79%[/yellow], "
+                           f"[red]{self.bands['low']} scoring below 50%[/red]")
+
+        if self.rule_counts:
+            table = Table(title="Most Common Issues")
+            table.add_column("Rule", style="cyan")
+            table.add_column("Deployments", style="magenta", justify="right")
+            for rule_id, count in self.rule_counts.most_common(self.top):
+                table.add_row(rule_id, str(count))
+            self.console.print(table)
+
+        table = Table(title="Lowest Scoring Deployments")
+        table.add_column("Application", style="cyan")
+        table.add_column("Compatibility Score", style="magenta", justify="right")
+        for negative_score, key in sorted(self.lowest, key=lambda entry: (-entry[0], entry[1])):
+            table.add_row(key, f"{-negative_score}%")
+        self.console.print(table)
+
+        clusters = self.clusters.table()
+        if clusters is not None:
+            self.console.print(clusters)
+
+        templates = self.templates.table(self.top)
+        if templates is not None:
+            self.console.print(f"[bold]{len(self.templates.templates)} distinct pod template(s)[/bold]")
+            self.console.print(templates)
+
+
+class DiffReporter:
+    """Print the changes between two result snapshots as they are found, then their counts."""
+
+    def __init__(self, console: Console, quiet: bool = False):
+        self.console = console
+        # Only count changes, for when they are written elsewhere
+        self.quiet = quiet
+        self.counts = Counter()
+        self.regressions = 0
+        self.improvements = 0
+
+    def write(self, change: Any):
+        self.counts[change.status] += 1
+        if change.regression:
+            self.regressions += 1
+        elif change.status == 'changed' and (change.score_delta > 0 or change.resolved_issues):
+            self.improvements += 1
+        if self.quiet:
+            return
+
+        name = escape(display_name(change.to_dict()))
+        if change.status == 'added':
+            self.console.print(f"[green]+ {name}[/green] {change.new_score}%")
+        elif change.status == 'removed':
+            self.console.print(f"[red]- {name}[/red] {change.old_score}%")
+        else:
+            delta = change.score_delta
+            color = 'red' if delta < 0 else 'green' if delta > 0 else 'yellow'
+            self.console.print(f"[yellow]~ {name}[/yellow] {change.old_score}% → {change.new_score}% "
+                               f"[{color}]({delta:+d})[/{color}]")
+        for rule_id, issue in change.added_issues:
+            self.console.print(f"  [red]+ {escape(rule_id or '-')}: {escape(issue)}[/red]")
+        for rule_id, issue in change.resolved_issues:
+            self.console.print(f"  [green]- {escape(rule_id or '-')}: {escape(issue)}[/green]")
+
+    def close(self):
+        """Print how many results were added, removed and changed."""
+        if not sum(self.counts.values()):
+            self.console.print("[green]No changes between the snapshots[/green]")
+            return
+        self.console.print(f"\n[bold]{self.counts['added']} added, {self.counts['removed']} removed, "
+                           f"{self.counts['changed']} changed[/bold]: "
+                           f"[red]{self.regressions} regressed[/red], [green]{self.improvements} improved[/green]")
+
+
+class NDJSONWriter(ReportWriter):
+    """Write one JSON object per line."""
+
+    def __init__(self, out: IO[str]):
+        super().__init__()
+        self.out = out
+
+    def write(self, result: Dict[str, Any]):
+        super().write(result)
+        self.out.write(json.dumps(_plain_result(result), separators=(',', ':')) + '\n')
+        self.out.flush()
+
+
+class CSVWriter(ReportWriter):
+    """Write one CSV row per deployment; multiple issues and recommendations are separated by newlines."""
+
+    def __init__(self, out: IO[str]):
+        super().__init__()
+        self.out = out
+        self.writer = csv.writer(out, lineterminator='\n')
+        self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, result: Dict[str, Any]):
+        super().write(result)
+        usage = result.get('usage') or {}
+        self.writer.writerow([
+            result['namespace'],
+            result['name'],
+            result['compatibility_score'],
+            len(result['compatibility_issues']),
+            ' '.join(result.get('rule_ids') or []),
+            '\n'.join(result['compatibility_issues']),
+            '\n'.join(result['recommendations']),
+            result.get('template') or '',
+            result.get('cluster') or '',
+            result.get('kind') or 'Deployment',
+            usage.get('recommended_cpu') or '',
+            usage.get('recommended_memory_gib') or ''
+        ])
+        self.out.flush()
+
+
+class JSONWriter(ReportWriter):
+    """Write a JSON array of results, one element at a time."""
+
+    def __init__(self, out: IO[str]):
+        super().__init__()
+        self.out = out
+        self.out.write('[')
+
+    def write(self, result: Dict[str, Any]):
+        super().write(result)
+        separator = ',\n  ' if self.count > 1 else '\n  '
+        self.out.write(separator + json.dumps(_plain_result(result)))
+        self.out.flush()
+
+    def close(self):
+        self.out.write('\n]\n' if self.count else ']\n')
+        self.out.flush()
+
+
+class SARIFWriter(ReportWriter):
+    """Write a SARIF 2.1.0 log with one result per compatibility issue, for code scanning tools."""
+
+    def __init__(self, out: IO[str], rules: List[Dict[str, Any]] = None):
+        super().__init__()
+        self.out = out
+        self.results_written = 0
+
+        # Rules are known before any result, so the document up to the results array is written at once
+        driver = {
+            'name': 'aca-assessor',
+            'version': __version__,
+            'rules': [_sarif_rule(rule) for rule in rules or []]
+        }
+        self.out.write(f'{{"$schema": {json.dumps(SARIF_SCHEMA)}, "version": "2.1.0", '
+                       f'"runs": [{{"tool": {json.dumps({"driver": driver})}, "results": [')
+
+    def write(self, result: Dict[str, Any]):
+        super().write(result)
+        rule_ids = result.get('rule_ids') or []
+        for index, issue in enumerate(result['compatibility_issues']):
+            sarif_result = {
+                'ruleId': rule_ids[index] if index < len(rule_ids) else 'aca-compatibility',
+                'level': 'warning',
+                'message': {'text': issue},
+                'locations': [{
+                    'logicalLocations': [{
+                        'name': result['name'],
+                        'fullyQualifiedName': display_name(result),
+                        'kind': (result.get('kind') or 'Deployment').lower()
+                    }]
+                }],
+                'properties': {
+                    'namespace': result['namespace'],
+                    'cluster': result.get('cluster'),
+                    'compatibilityScore': result['compatibility_score'],
+                    'template': result.get('template'),
+                    'recommendations': list(result['recommendations'])
+                }
+            }
+            self.out.write((',\n' if self.results_written else '\n') + json.dumps(sarif_result))
+            self.results_written += 1
+        self.out.flush()
+
+    def close(self):
+        self.out.write('\n]}]}\n')
+        self.out.flush()
+
+
+# Writers for --output-format; terminal formats are handled by the CLI
+FILE_WRITERS = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'json': JSONWriter,
+    'sarif': SARIFWriter
+}
+
+
+def create_writer(output_format: str, out: IO[str], rules: Optional[List[Dict[str, Any]]] = None) -> ReportWriter:
+    """Create the machine-readable writer for an output format."""
+    if output_format not in FILE_WRITERS:
+        raise ValueError(f"Unknown output format '{output_format}'")
+    if output_format == 'sarif':
+        return SARIFWriter(out, rules)
+    return FILE_WRITERS[output_format](out)
+
+
+def display_name(result: Dict[str, Any]) -> str:
+    """
+    Return namespace/name, prefixed with the cluster for results from a multi-cluster run and
+    followed by the kind for workloads other than Deployments.
+    """
+    name = f"{result['namespace']}/{result['name']}"
+    if result.get('cluster'):
+        name = f"{result['cluster']}/{name}"
+    kind = result.get('kind')
+    return f"{name} ({kind})" if kind and kind != 'Deployment' else name
+
+
+def _plain_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a result as plain JSON-serializable data."""
+    return result.to_dict() if hasattr(result, 'to_dict') else dict(result)
+
+
+def _sarif_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a rule spec as a SARIF reporting descriptor."""
+    descriptor = {
+        'id': rule['id'],
+        'shortDescription': {'text': rule.get('description') or rule['id']},
+        'properties': {'field': rule.get('field'), 'deduction': rule.get('deduction', 0)}
+    }
+    if rule.get('recommendation'):
+        descriptor['help'] = {'text': rule['recommendation']}
+    return descriptor
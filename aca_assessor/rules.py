@@ -0,0 +1,447 @@
+"""
+Rule engine module for ACA Assessor.
+
+Compatibility checks are declared as data rather than code. Each rule names a
+field path into a deployment record, a comparison against a threshold (either
+a literal or one of the analyzer's ACA constraints), a score deduction and
+message templates. Rules come from DEFAULT_RULES and the `analysis` section of
+the configuration file, and are compiled once into predicates.
+
+Field paths use `[]` to iterate collections, e.g. `containers[].ports[].protocol`
+checks the protocol of every port of every container. Rules are grouped into
+stages by the collection they iterate, and within a stage by field, so each
+field is read and converted once per element, and records with an empty
+collection skip that stage's rules entirely.
+
+Message templates may use {value}, {threshold}, {deployment}, {namespace},
+{cluster} and the name of each enclosing collection element, e.g. {container},
+{port} or {volume}. Rules from the configuration file are checked when they are
+compiled, so an unknown placeholder, or an ordering comparison between text and
+a number, is reported before any record is assessed.
+
+RuleEngine.fingerprint() reads the same fields as evaluate() without checking
+them, so two deployments with equal fingerprints always get the same issues,
+recommendations and score.
+"""
+import operator
+import re
+import string
+import time
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+from .models import Deployment, AnalysisResult, Record
+
+# Built-in rules, equivalent to the original hard-coded checks
+DEFAULT_RULES = [
+    {
+        'id': 'cpu-limit',
+        'description': 'Container CPU limit exceeds the ACA maximum',
+        'field': 'containers[].resources.limits.cpu',
+        'convert': 'cpu',
+        'operator': 'gt',
+        'constraint': 'max_cpu',
+        'deduction': 15,
+        'issue': "Container '{container}' CPU limit ({value}) exceeds ACA maximum ({threshold} cores)",
+        'recommendation': "Reduce CPU limit for container '{container}' to {threshold} cores or less"
+    },
+    {
+        'id': 'memory-limit',
+        'description': 'Container memory limit exceeds the ACA maximum',
+        'field': 'containers[].resources.limits.memory',
+        'convert': 'memory',
+        'operator': 'gt',
+        'constraint': 'max_memory',
+        'deduction': 15,
+        'issue': "Container '{container}' memory limit ({value}) exceeds ACA maximum ({threshold})",
+        'recommendation': "Reduce memory limit for container '{container}' to {threshold} or less"
+    },
+    {
+        'id': 'volume-type',
+        'description': 'Volume type is not supported in ACA',
+        'field': 'volumes[].type',
+        'operator': 'not_in',
+        'constraint': 'supported_volume_types',
+        'deduction': 10,
+        'issue': "Volume type '{value}' is not supported in ACA",
+        'recommendation': "Consider using Azure Storage or other cloud storage solutions for persistent storage needs"
+    },
+    {
+        'id': 'port-protocol',
+        'description': 'Container port protocol is not supported in ACA',
+        'field': 'containers[].ports[].protocol',
+        'operator': 'not_in',
+        'constraint': 'supported_protocols',
+        'deduction': 10,
+        'issue': "Protocol '{value}' is not supported in ACA",
+        'recommendation': "Consider using HTTP/HTTPS or TCP for container '{container}'"
+    },
+    {
+        'id': 'max-replicas',
+        'description': 'Replica count, or the autoscaler maximum, exceeds the ACA maximum',
+        'field': 'max_replicas',
+        'operator': 'gt',
+        'constraint': 'max_replicas',
+        'deduction': 10,
+        'issue': "Maximum replica count ({value}) exceeds ACA maximum ({threshold})",
+        'recommendation': "Consider reducing max replicas or splitting the service"
+    },
+    {
+        'id': 'workload-kind',
+        'description': 'Workload kind has no ACA equivalent',
+        'field': 'kind',
+        'operator': 'in',
+        'constraint': 'unsupported_kinds',
+        'deduction': 20,
+        'issue': "Workload kind '{value}' has no ACA equivalent",
+        'recommendation': "Redesign the {value} as a stateless app, or move its function to a managed service"
+    },
+    {
+        'id': 'service-type',
+        'description': 'Service type has no ACA equivalent',
+        'field': 'services[].type',
+        'operator': 'not_in',
+        'constraint': 'supported_service_types',
+        'deduction': 5,
+        'issue': "Service '{service}' of type '{value}' has no ACA equivalent",
+        'recommendation': "Expose the app through ACA ingress instead of service '{service}'"
+    },
+    {
+        'id': 'exposed-ports',
+        'description': 'Services route to more pod ports than ACA ingress targets',
+        'field': 'exposed_ports',
+        'operator': 'gt',
+        'constraint': 'max_exposed_ports',
+        'deduction': 5,
+        'issue': "Services route to {value} pod ports; ACA ingress targets {threshold} port per app",
+        'recommendation': "Serve traffic on a single port, or configure additional TCP port mappings"
+    },
+    {
+        'id': 'ingress-fanout',
+        'description': 'Ingress routes to several services',
+        'field': 'ingresses[].backends',
+        'operator': 'gt',
+        'constraint': 'max_ingress_backends',
+        'deduction': 5,
+        'issue': "Ingress '{ingress}' routes to {value} services; ACA ingress routes each app separately",
+        'recommendation': "Use Azure Application Gateway or Front Door for path-based routing across apps"
+    }
+]
+
+# Comparisons available to rules; each is called as op(value, threshold)
+OPERATORS = {
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'in': lambda value, threshold: value in threshold,
+    'not_in': lambda value, threshold: value not in threshold,
+    'matches': lambda value, threshold: threshold.search(str(value)) is not None,
+    'not_matches': lambda value, threshold: threshold.search(str(value)) is None
+}
+
+
+# Comparisons that order their operands, and so need numbers on both sides
+ORDERING_OPERATORS = ('gt', 'ge', 'lt', 'le')
+
+# Template variables available to every rule, besides the names of the enclosing collection elements
+TEMPLATE_VARIABLES = ('value', 'threshold', 'deployment', 'namespace', 'cluster')
+
+
+def _context_key(collection: str) -> str:
+    """Return the template variable naming an element of a collection, e.g. containers -> container."""
+    if collection.endswith('sses'):
+        return collection[:-2]
+    return collection[:-1] if collection.endswith('s') else collection
+
+
+def _lookup(obj: Any, segments: List[str]) -> Any:
+    """Follow a field path through records and plain dicts such as labels, returning None if it is missing."""
+    for segment in segments:
+        if obj is None:
+            return None
+        if isinstance(obj, Mapping) and not isinstance(obj, Record):
+            obj = obj.get(segment)
+        else:
+            obj = getattr(obj, segment, None)
+    return obj
+
+
+def _declared_type(cls: Any, name: str) -> Any:
+    """Return the annotated type of a record field or property, or None if it is not declared."""
+    attribute = getattr(cls, name, None)
+    try:
+        if isinstance(attribute, property):
+            return get_type_hints(attribute.fget).get('return')
+        return get_type_hints(cls.__init__).get(name)
+    except Exception:
+        return None
+
+
+def _unwrap(hint: Any) -> Any:
+    """Strip Optional from a type hint and return the element type of a Tuple[X, ...]."""
+    if get_origin(hint) is Union:
+        args = [arg for arg in get_args(hint) if arg is not type(None)]
+        hint = args[0] if len(args) == 1 else None
+    if get_origin(hint) is tuple:
+        hint = get_args(hint)[0]
+    return hint
+
+
+def _field_type(scope: Tuple[str, ...], field: str) -> Optional[type]:
+    """
+    Return the declared type of a rule's field on deployment records, or None where it cannot be resolved,
+    such as keys of labels.
+    """
+    cls = Deployment
+    for name in scope + tuple(field.split('.')):
+        if not isinstance(cls, type) or not issubclass(cls, Record):
+            return None
+        cls = _unwrap(_declared_type(cls, name))
+    return cls if isinstance(cls, type) else None
+
+
+def _check_template(rule_id: str, template: Any, variables: Tuple[str, ...]):
+    """Raise ValueError if a message template is malformed or uses a placeholder the engine does not fill in."""
+    if not isinstance(template, str):
+        raise ValueError(f"Rule '{rule_id}' message must be a string, got {template!r}")
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Rule '{rule_id}' has a malformed message template {template!r}: {str(e)}")
+    for _, name, format_spec, _ in parsed:
+        if name is None:
+            continue
+        # {container.name} and {value[0]} look up the variable before the first . or [
+        root = re.split(r'[.\[]', name, maxsplit=1)[0]
+        if root not in variables:
+            raise ValueError(f"Rule '{rule_id}' message uses unknown placeholder '{{{name}}}', "
+                             f"expected one of: {', '.join(variables)}")
+        if format_spec:
+            # Nested fields, as in {value:>{width}}
+            _check_template(rule_id, format_spec, variables)
+
+
+class Rule:
+    """A compiled compatibility rule."""
+    __slots__ = ('id', 'scope', 'field', 'op', 'threshold', 'display_threshold', 'convert',
+                 'deduction', 'issue', 'recommendation')
+
+    def __init__(self, spec: Dict[str, Any], constraints: Dict[str, Any],
+                 converters: Dict[str, Callable[[Any], Any]]):
+        self.id = spec.get('id')
+        if not self.id:
+            raise ValueError(f"Rule is missing an id: {spec}")
+
+        path = spec.get('field')
+        if not path or not isinstance(path, str):
+            raise ValueError(f"Rule '{self.id}' is missing a field path")
+        # Everything up to the last [] is the collection the rule iterates
+        scope, _, field = path.rpartition('[].')
+        self.scope = tuple(scope.split('[].')) if scope else ()
+        if '[]' in field:
+            raise ValueError(f"Rule '{self.id}' field path must end with a field, not a collection: {path}")
+        self.field = field
+
+        op_name = spec.get('operator', 'gt')
+        if op_name not in OPERATORS:
+            raise ValueError(f"Rule '{self.id}' has unknown operator '{op_name}'")
+        self.op = OPERATORS[op_name]
+
+        self.convert = None
+        if spec.get('convert'):
+            if spec['convert'] not in converters:
+                raise ValueError(f"Rule '{self.id}' has unknown conversion '{spec['convert']}'")
+            self.convert = converters[spec['convert']]
+
+        if 'constraint' in spec:
+            if spec['constraint'] not in constraints:
+                raise ValueError(f"Rule '{self.id}' references unknown constraint '{spec['constraint']}'")
+            raw_threshold = constraints[spec['constraint']]
+        elif 'threshold' in spec:
+            raw_threshold = spec['threshold']
+        else:
+            raise ValueError(f"Rule '{self.id}' needs a threshold or a constraint")
+        self.display_threshold = raw_threshold
+
+        # Thresholds are converted once here rather than for every record
+        if op_name in ('in', 'not_in'):
+            self.threshold = frozenset(raw_threshold if isinstance(raw_threshold, (list, tuple, set)) else [raw_threshold])
+        elif op_name in ('matches', 'not_matches'):
+            self.threshold = re.compile(str(raw_threshold))
+        elif self.convert:
+            self.threshold = self.convert(str(raw_threshold))
+        else:
+            self.threshold = raw_threshold
+
+        if op_name in ORDERING_OPERATORS:
+            if isinstance(self.threshold, bool) or not isinstance(self.threshold, (int, float)):
+                raise ValueError(f"Rule '{self.id}' operator '{op_name}' needs a numeric threshold or a conversion "
+                                 f"that yields one, got {raw_threshold!r}")
+            if self.convert is None and _field_type(self.scope, self.field) is str:
+                raise ValueError(f"Rule '{self.id}' compares the text field '{path}' with '{op_name}'; "
+                                 f"add a conversion, or use eq, in or matches")
+
+        self.deduction = int(spec.get('deduction', 0))
+        self.issue = spec.get('issue', f"Rule '{self.id}' failed for {{value}}")
+        self.recommendation = spec.get('recommendation')
+        variables = TEMPLATE_VARIABLES + tuple(_context_key(collection) for collection in self.scope)
+        _check_template(self.id, self.issue, variables)
+        if self.recommendation is not None:
+            _check_template(self.id, self.recommendation, variables)
+
+
+class RuleStage:
+    """The rules that iterate one collection path, grouped by the field they read."""
+    __slots__ = ('scope', 'keys', 'fields', 'getters', 'paths', 'label')
+
+    def __init__(self, scope: Tuple[str, ...]):
+        self.scope = scope
+        # Template variable naming the element at each level, e.g. ('container', 'port')
+        self.keys = tuple(_context_key(collection) for collection in scope)
+        # (getter, path segments, conversion, rules) per field, in order of first appearance
+        self.fields: List[Tuple[Callable[[Any], Any], List[str], Any, List[Rule]]] = []
+        # Getter and path segments of every distinct field, for fingerprints
+        self.getters: List[Callable[[Any], Any]] = []
+        self.paths: List[List[str]] = []
+        # Profiling phase name, e.g. "check cpu-limit,memory-limit"
+        self.label = 'check'
+
+    def add(self, rule: Rule):
+        for _, _, convert, rules in self.fields:
+            if rules[0].field == rule.field and convert is rule.convert:
+                rules.append(rule)
+                return
+        # attrgetter resolves dotted record paths in C; paths into dicts such as labels fall back to _lookup
+        self.fields.append((operator.attrgetter(rule.field), rule.field.split('.'), rule.convert, [rule]))
+        self.label = f"{self.label},{rule.id}" if self.label != 'check' else f"check {rule.id}"
+        if rule.field.split('.') not in self.paths:
+            self.getters.append(operator.attrgetter(rule.field))
+            self.paths.append(rule.field.split('.'))
+
+
+class RuleEngine:
+    def __init__(self, specs: List[Dict[str, Any]], constraints: Dict[str, Any],
+                 converters: Dict[str, Callable[[Any], Any]]):
+        self.rules = [Rule(spec, constraints, converters) for spec in specs]
+        self.stages: List[RuleStage] = []
+
+        stages_by_scope = {}
+        for rule in self.rules:
+            if rule.scope not in stages_by_scope:
+                stages_by_scope[rule.scope] = RuleStage(rule.scope)
+                self.stages.append(stages_by_scope[rule.scope])
+            stages_by_scope[rule.scope].add(rule)
+
+        # Messages naming the deployment differ per copy, so identity becomes part of the fingerprint
+        formatter = string.Formatter()
+        template_fields = {
+            name for rule in self.rules for template in (rule.issue, rule.recommendation or '')
+            for _, name, _, _ in formatter.parse(template) if name
+        }
+        self.uses_identity = bool(template_fields & {'deployment', 'namespace', 'cluster'})
+
+    def evaluate(self, deployment: Deployment, analysis: AnalysisResult, profiler: Any = None):
+        """Run every applicable rule against a deployment, recording issues on the analysis."""
+        for stage in self.stages:
+            start = time.perf_counter() if profiler is not None else 0.0
+            if stage.scope:
+                self._walk(deployment, analysis, stage, deployment, 0, ())
+            else:
+                self._check(deployment, analysis, stage, (deployment,), ())
+            if profiler is not None:
+                profiler.record(stage.label, time.perf_counter() - start)
+
+    def fingerprint(self, deployment: Deployment) -> Tuple[Any, ...]:
+        """Return the values every rule reads from a deployment, with the element names used in messages."""
+        parts: List[Any] = [(deployment.cluster, deployment.namespace, deployment.name)] if self.uses_identity else []
+        for stage in self.stages:
+            if stage.scope:
+                parts.append(self._collect(stage, deployment, 0))
+            else:
+                parts.append(self._read(stage, deployment))
+        fingerprint = tuple(parts)
+        try:
+            hash(fingerprint)
+        except TypeError:
+            # A rule read a whole dict or list, e.g. `labels`
+            fingerprint = (repr(fingerprint),)
+        return fingerprint
+
+    def _collect(self, stage: RuleStage, obj: Any, depth: int) -> Tuple[Any, ...]:
+        """Return the name and checked field values of every element along a stage's collection path."""
+        items = getattr(obj, stage.scope[depth], None) or ()
+        if depth + 1 < len(stage.scope):
+            return tuple([(getattr(item, 'name', None), self._collect(stage, item, depth + 1)) for item in items])
+        return tuple([(getattr(item, 'name', None), self._read(stage, item)) for item in items])
+
+    def _read(self, stage: RuleStage, element: Any) -> Tuple[Any, ...]:
+        """Read every field a stage checks from one element."""
+        try:
+            return tuple([getter(element) for getter in stage.getters])
+        except AttributeError:
+            return tuple([_lookup(element, segments) for segments in stage.paths])
+
+    def _walk(self, deployment: Deployment, analysis: AnalysisResult, stage: RuleStage, obj: Any,
+              depth: int, parents: Tuple[Any, ...]):
+        """Visit every element of a stage's collection path; empty collections cost nothing."""
+        items = getattr(obj, stage.scope[depth], None)
+        if not items:
+            return
+        if depth + 1 < len(stage.scope):
+            for item in items:
+                self._walk(deployment, analysis, stage, item, depth + 1, parents + (item,))
+        else:
+            self._check(deployment, analysis, stage, items, parents)
+
+    def _check(self, deployment: Deployment, analysis: AnalysisResult, stage: RuleStage, elements: Any,
+               parents: Tuple[Any, ...]):
+        """Run a stage's rules against sibling elements, reading and converting each field once per element."""
+        fields = stage.fields
+        for element in elements:
+            for getter, segments, convert, rules in fields:
+                try:
+                    value = getter(element)
+                except AttributeError:
+                    value = _lookup(element, segments)
+                if value is None:
+                    continue
+                compared = convert(value) if convert is not None else value
+                for rule in rules:
+                    if rule.op(compared, rule.threshold):
+                        self._record(rule, deployment, analysis, value, stage.keys, parents + (element,))
+
+    def _record(self, rule: Rule, deployment: Deployment, analysis: AnalysisResult, value: Any,
+                keys: Tuple[str, ...], elements: Tuple[Any, ...]):
+        """Add a failed rule's issue, recommendation and deduction to the analysis."""
+        variables = {
+            'value': value,
+            'threshold': rule.display_threshold,
+            'deployment': deployment.name,
+            'namespace': deployment.namespace,
+            'cluster': deployment.cluster
+        }
+        for key, element in zip(keys, elements):
+            variables[key] = getattr(element, 'name', element)
+
+        analysis.compatibility_issues.append(rule.issue.format(**variables))
+        analysis.rule_ids.append(rule.id)
+        if rule.recommendation:
+            analysis.recommendations.append(rule.recommendation.format(**variables))
+        analysis.compatibility_score -= rule.deduction
+
+
+def merge_rules(custom_rules: List[Dict[str, Any]] = None,
+                disabled_rules: List[str] = None) -> List[Dict[str, Any]]:
+    """Combine the built-in rules with custom ones; a custom rule replaces a built-in rule with the same id."""
+    custom_rules = custom_rules or []
+    disabled = set(disabled_rules or [])
+    custom_by_id = {rule.get('id'): rule for rule in custom_rules}
+
+    merged = []
+    for rule in DEFAULT_RULES:
+        merged.append(custom_by_id.pop(rule['id'], rule))
+    merged.extend(rule for rule in custom_rules if rule.get('id') in custom_by_id)
+    return [rule for rule in merged if rule.get('id') not in disabled]
@@ -0,0 +1,191 @@
+"""
+Result snapshot module for ACA Assessor.
+Saves the analysis results of a run and compares two runs.
+
+A snapshot is newline-delimited JSON: a header line, then one result per line,
+gzip-compressed when the path ends in `.gz`. NDJSON and JSON reports from
+`assess` can be compared as well.
+
+Diffs run in linear time and hold only one snapshot in memory. The old
+snapshot is loaded into a hash index keyed by (cluster, namespace, kind, name)
+that keeps just the score and issues of each result. The new snapshot is then
+streamed against it: each result is looked up and popped, so whatever is left
+in the index at the end was removed.
+"""
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from typing import IO, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from .models import AnalysisResult, intern
+
+# Written in each snapshot header; bumped when the line layout changes
+SNAPSHOT_FORMAT = 1
+
+# (cluster, namespace, kind, name) of a result
+ResultKey = Tuple[Optional[str], Optional[str], str, Optional[str]]
+
+# Compatibility score and (rule id, issue) pairs of an indexed result
+IndexedResult = Tuple[int, Tuple[Tuple[str, str], ...]]
+
+
+def open_snapshot(path: str, mode: str = 'r', compressed: Optional[bool] = None) -> IO[str]:
+    """Open a snapshot file as text, through gzip if compressed, which defaults to whether the path ends in .gz."""
+    if compressed is None:
+        compressed = path.endswith('.gz')
+    if compressed:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class ResultSnapshotWriter:
+    """
+    Write results to a temporary file as they pass through. The snapshot replaces the file at the path only when
+    publish() is called, once the caller knows the collection was complete.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._temp_path = f"{path}.tmp"
+        self._file: Optional[IO[str]] = None
+        self._complete = False
+
+    def observe(self, analysis_results: Iterable[AnalysisResult]) -> Iterator[AnalysisResult]:
+        """Pass results through unchanged while writing them."""
+        self._file = open_snapshot(self._temp_path, 'w', compressed=self.path.endswith('.gz'))
+        header = {'snapshot': 'aca-assessor-results', 'format': SNAPSHOT_FORMAT, 'created': time.time()}
+        self._file.write(json.dumps(header) + '\n')
+        for result in analysis_results:
+            plain = result.to_dict() if hasattr(result, 'to_dict') else dict(result)
+            self._file.write(json.dumps(plain, separators=(',', ':')) + '\n')
+            self.count += 1
+            yield result
+        self._file.close()
+        self._file = None
+        self._complete = True
+
+    def publish(self):
+        """Replace the snapshot at the path with the one written, which must have been read to the end."""
+        if not self._complete:
+            raise RuntimeError("The snapshot was not written to the end")
+        os.replace(self._temp_path, self.path)
+        self._complete = False
+
+    def close(self):
+        """Discard a snapshot that was not published, such as after a failed or incomplete collection."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+        self._complete = False
+
+
+def iter_results(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the results in a snapshot, an NDJSON report or a JSON report, one at a time where possible."""
+    with open_snapshot(path) as f:
+        first = f.readline()
+        if first.lstrip().startswith('['):
+            # A JSON report is a single array
+            yield from json.loads(first + f.read())
+            return
+        if first.strip():
+            document = json.loads(first)
+            if document.get('snapshot') is None:
+                yield document
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def result_key(result: Dict[str, Any]) -> ResultKey:
+    return result.get('cluster'), result.get('namespace'), result.get('kind') or 'Deployment', result.get('name')
+
+
+def index_result(result: Dict[str, Any]) -> IndexedResult:
+    """Reduce a result to its score and (rule id, issue) pairs, all that a diff compares."""
+    issues = result.get('compatibility_issues') or []
+    rule_ids = result.get('rule_ids') or []
+    # Results written before rule ids existed pair each issue with an empty id; the same few issue texts
+    # repeat across a fleet, so they are interned to keep large indexes small
+    rule_ids = list(rule_ids) + [''] * (len(issues) - len(rule_ids))
+    pairs = tuple((intern(rule_id), intern(issue)) for rule_id, issue in zip(rule_ids, issues))
+    return result.get('compatibility_score', 100), pairs
+
+
+def load_index(path: str) -> Dict[ResultKey, IndexedResult]:
+    """Load a snapshot into a hash index keyed by cluster, namespace, kind and name."""
+    return {result_key(result): index_result(result) for result in iter_results(path)}
+
+
+class ResultChange:
+    """One difference between two runs: an added, removed or changed result."""
+    __slots__ = ('status', 'key', 'old_score', 'new_score', 'added_issues', 'resolved_issues')
+
+    def __init__(self, status: str, key: ResultKey, old_score: Optional[int], new_score: Optional[int],
+                 added_issues: List[Tuple[str, str]], resolved_issues: List[Tuple[str, str]]):
+        # 'added', 'removed' or 'changed'
+        self.status = status
+        self.key = key
+        self.old_score = old_score
+        self.new_score = new_score
+        # (rule id, issue) pairs raised only in the new run, and only in the old one
+        self.added_issues = added_issues
+        self.resolved_issues = resolved_issues
+
+    @property
+    def score_delta(self) -> Optional[int]:
+        """The change in score, or None for added and removed results."""
+        if self.old_score is None or self.new_score is None:
+            return None
+        return self.new_score - self.old_score
+
+    @property
+    def regression(self) -> bool:
+        """Whether the result got worse: a new issue or a lower score for a workload that existed before."""
+        return self.status == 'changed' and (self.score_delta < 0 or bool(self.added_issues))
+
+    def to_dict(self) -> Dict[str, Any]:
+        cluster, namespace, kind, name = self.key
+        return {
+            'status': self.status,
+            'cluster': cluster,
+            'namespace': namespace,
+            'kind': kind,
+            'name': name,
+            'old_score': self.old_score,
+            'new_score': self.new_score,
+            'score_delta': self.score_delta,
+            'added_issues': [{'rule_id': rule_id, 'issue': issue} for rule_id, issue in self.added_issues],
+            'resolved_issues': [{'rule_id': rule_id, 'issue': issue} for rule_id, issue in self.resolved_issues]
+        }
+
+
+def diff_snapshots(old_path: str, new_path: str) -> Iterator[ResultChange]:
+    """
+    Yield the differences between two snapshots: added and changed results in the new snapshot's order,
+    then removed results in the old snapshot's order.
+    """
+    old = load_index(old_path)
+    for result in iter_results(new_path):
+        key = result_key(result)
+        new_score, new_issues = index_result(result)
+        previous = old.pop(key, None)
+        if previous is None:
+            yield ResultChange('added', key, None, new_score, list(new_issues), [])
+            continue
+        old_score, old_issues = previous
+        if old_score == new_score and old_issues == new_issues:
+            continue
+        # Issues are compared as multisets, so reordered rules are not reported as changes
+        added = Counter(new_issues) - Counter(old_issues)
+        resolved = Counter(old_issues) - Counter(new_issues)
+        if old_score == new_score and not added and not resolved:
+            continue
+        yield ResultChange('changed', key, old_score, new_score, list(added.elements()), list(resolved.elements()))
+
+    for key, (old_score, old_issues) in old.items():
+        yield ResultChange('removed', key, old_score, None, [], [])
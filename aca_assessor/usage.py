@@ -0,0 +1,265 @@
+"""
+Usage sampling module for ACA Assessor.
+Samples the actual CPU and memory usage of pods from the metrics.k8s.io API, or
+from a recorded metrics file, and sizes each workload for Azure Container Apps
+from the p50/p95/p99 of its per-pod usage.
+
+Each poll is a single cluster-wide PodMetrics list. Pods are attributed to their
+workload from their owner references, labels and name, with Job pods counted
+towards the CronJob that created the Job, and each workload keeps its samples in a
+pair of fixed-capacity float32 arrays. Once a workload's arrays are full, new
+samples replace existing ones by reservoir sampling, so the arrays stay a
+uniform sample of the whole window and memory is bounded by the number of
+workloads rather than by the length of the window or the number of pods.
+
+Requires NumPy (pip install 'aca-assessor[usage]').
+"""
+import json
+import random
+import time
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+import numpy as np
+from rich.console import Console
+from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn
+
+from . import records
+from .inventory import CronJobIndex
+from .profiling import get_profiler
+from .quantity import usage_value
+
+console = Console()
+
+# Samples kept per workload; percentiles of a uniform sample this size are within about 1% of the window's
+RESERVOIR_SIZE = 2048
+
+PERCENTILES = (50, 95, 99)
+
+# Recommended sizes leave this much room above p95 CPU and p99 memory
+HEADROOM = 1.2
+
+# Consumption plan CPU/memory combinations in cores and GiB: 0.25 cores per 0.5Gi, up to 4 cores and 8Gi
+ACA_SIZES = tuple((step * 0.25, step * 0.5) for step in range(1, 17))
+
+# (namespace, kind, name) of a workload
+WorkloadKey = Tuple[str, str, str]
+
+
+def pod_owner(metadata: Dict[str, Any], cronjobs: Optional[CronJobIndex] = None) -> Optional[Tuple[str, str]]:
+    """
+    Return the (kind, name) of the workload that owns a pod, or None if unknown. Owner references are used when
+    present, which PodMetrics objects do not carry, and labels and the pod name otherwise.
+    """
+    labels = metadata.get('labels') or {}
+    name = metadata.get('name') or ''
+    job = None
+    owner = records.controller_reference(metadata)
+    if owner is not None and owner[0] in ('StatefulSet', 'DaemonSet'):
+        return owner
+    if owner is not None and owner[0] == 'Job':
+        job = owner[1]
+    elif labels.get('job-name'):
+        job = labels['job-name']
+    if job is not None:
+        return cronjobs.job_owner(metadata.get('namespace') or 'default', job) if cronjobs else ('Job', job)
+
+    template_hash = labels.get('pod-template-hash')
+    if template_hash:
+        # Deployment pods are named <deployment>-<template hash>-<suffix>
+        marker = f"-{template_hash}-"
+        if marker in name:
+            return 'Deployment', name.rsplit(marker, 1)[0]
+    if 'statefulset.kubernetes.io/pod-name' in labels:
+        return 'StatefulSet', name.rsplit('-', 1)[0]
+    if 'controller-revision-hash' in labels:
+        return 'DaemonSet', name.rsplit('-', 1)[0]
+    return None
+
+
+def recommend_sizes(cpu: np.ndarray, memory: np.ndarray) -> np.ndarray:
+    """
+    Return the index into ACA_SIZES of the smallest combination covering each CPU and memory target,
+    or len(ACA_SIZES) where no combination is large enough.
+    """
+    size_cpu = np.array([size[0] for size in ACA_SIZES])
+    size_memory = np.array([size[1] for size in ACA_SIZES])
+    # Both columns ascend, so the first size covering both targets is the later of the two covering each
+    return np.maximum(np.searchsorted(size_cpu, cpu, side='left'),
+                      np.searchsorted(size_memory, memory, side='left'))
+
+
+class Reservoir:
+    """A bounded uniform sample of one workload's per-pod CPU (cores) and memory (GiB) usage."""
+    __slots__ = ('cpu', 'memory', 'size', 'seen')
+
+    def __init__(self, capacity: int):
+        # Arrays start small and double up to the capacity, so rarely sampled workloads stay cheap
+        initial = min(capacity, 16)
+        self.cpu = np.empty(initial, dtype=np.float32)
+        self.memory = np.empty(initial, dtype=np.float32)
+        self.size = 0
+        self.seen = 0
+
+    def add(self, cpu: float, memory: float, capacity: int, rng: random.Random):
+        self.seen += 1
+        if self.size < capacity:
+            if self.size == len(self.cpu):
+                grown = min(capacity, self.size * 2)
+                self.cpu = np.resize(self.cpu, grown)
+                self.memory = np.resize(self.memory, grown)
+            index = self.size
+            self.size += 1
+        else:
+            # Keep each of the samples seen so far with equal probability
+            index = rng.randrange(self.seen)
+            if index >= capacity:
+                return
+        self.cpu[index] = cpu
+        self.memory[index] = memory
+
+
+class UsageSampler:
+    """Collects per-pod usage samples by workload and turns them into percentiles and sizing recommendations."""
+
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE, headroom: float = HEADROOM, seed: Optional[int] = None,
+                 cronjobs: Optional[CronJobIndex] = None):
+        self.reservoir_size = max(1, reservoir_size)
+        self.headroom = headroom
+        # CronJobs and their Jobs, so Job pods are sampled under the CronJob that created them
+        self.cronjobs = cronjobs
+        self.workloads: Dict[WorkloadKey, Reservoir] = {}
+        self.polls = 0
+        # Pods whose workload could not be worked out, such as bare pods
+        self.unattributed = 0
+        self._rng = random.Random(seed)
+
+    def add_pod_metrics(self, items: List[Dict[str, Any]]) -> int:
+        """Add one poll's PodMetrics objects as samples, returning the number of pods attributed to a workload."""
+        sampled = 0
+        for item in items:
+            metadata = item.get('metadata') or {}
+            owner = pod_owner(metadata, self.cronjobs)
+            if owner is None:
+                self.unattributed += 1
+                continue
+            cpu = memory = 0.0
+            for container in item.get('containers') or []:
+                usage = container.get('usage') or {}
+                if usage.get('cpu'):
+                    cpu += usage_value(usage['cpu'], 'cores')
+                if usage.get('memory'):
+                    memory += usage_value(usage['memory'], 'gib')
+            key = (metadata.get('namespace') or 'default', owner[0], owner[1])
+            reservoir = self.workloads.get(key)
+            if reservoir is None:
+                reservoir = self.workloads[key] = Reservoir(self.reservoir_size)
+            reservoir.add(cpu, memory, self.reservoir_size, self._rng)
+            sampled += 1
+        self.polls += 1
+        return sampled
+
+    def sample(self, collector: Any, window: float, interval: float = 15, namespace: str = None,
+               record_path: str = None):
+        """Poll pod metrics every interval for a window of seconds, optionally recording each poll to a file."""
+        polls = max(1, int(window // interval) + 1)
+        record = open(record_path, 'w', encoding='utf-8') if record_path else None
+        profiler = get_profiler()
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]{task.description}"),
+                BarColumn(),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                console=console
+            ) as progress:
+                task = progress.add_task("[yellow]Sampling pod metrics...", total=polls)
+                deadline = time.monotonic()
+                for poll in range(polls):
+                    if poll:
+                        deadline += interval
+                        time.sleep(max(0.0, deadline - time.monotonic()))
+                    try:
+                        with profiler.phase('usage'):
+                            items = collector.list_pod_metrics(namespace)
+                            self.add_pod_metrics(items)
+                    except Exception as e:
+                        console.print(f"[red]Error sampling pod metrics: {str(e)}[/red]")
+                        progress.advance(task)
+                        continue
+                    if record is not None:
+                        record.write(json.dumps({'kind': 'PodMetricsList', 'apiVersion': 'metrics.k8s.io/v1beta1',
+                                                 'items': items}, separators=(',', ':')))
+                        record.write('\n')
+                    progress.advance(task)
+        finally:
+            if record is not None:
+                record.close()
+        console.print(f"[green]Sampled {len(self.workloads)} workload(s) over {self.polls} poll(s)[/green]")
+
+    def load(self, path: str):
+        """Add the polls in a recorded metrics file: PodMetricsList JSON documents, one per line or a single one."""
+        with open(path, 'r', encoding='utf-8') as f:
+            for document in _iter_documents(f):
+                self.add_pod_metrics(document.get('items') or [])
+        console.print(f"[green]Loaded usage for {len(self.workloads)} workload(s) "
+                      f"from {self.polls} poll(s) in {path}[/green]")
+
+    def profiles(self) -> Dict[WorkloadKey, Dict[str, Any]]:
+        """Return the usage percentiles and recommended ACA size of every sampled workload."""
+        keys = list(self.workloads)
+        if not keys:
+            return {}
+        # Workloads with the same number of samples, typically all full reservoirs, share one percentile call
+        by_size: Dict[int, List[int]] = {}
+        for row, key in enumerate(keys):
+            by_size.setdefault(self.workloads[key].size, []).append(row)
+        cpu = np.empty((len(keys), len(PERCENTILES)))
+        memory = np.empty((len(keys), len(PERCENTILES)))
+        for size, rows in by_size.items():
+            reservoirs = [self.workloads[keys[row]] for row in rows]
+            cpu[rows] = np.percentile(np.stack([r.cpu[:size] for r in reservoirs]), PERCENTILES, axis=1).T
+            memory[rows] = np.percentile(np.stack([r.memory[:size] for r in reservoirs]), PERCENTILES, axis=1).T
+        sizes = recommend_sizes(cpu[:, 1] * self.headroom, memory[:, 2] * self.headroom)
+
+        profiles = {}
+        for row, key in enumerate(keys):
+            profile = {
+                'samples': self.workloads[key].seen,
+                'cpu': [round(float(value), 4) for value in cpu[row]],
+                'memory_gib': [round(float(value), 4) for value in memory[row]],
+                'recommended_cpu': None,
+                'recommended_memory_gib': None
+            }
+            if sizes[row] < len(ACA_SIZES):
+                profile['recommended_cpu'], profile['recommended_memory_gib'] = ACA_SIZES[sizes[row]]
+            profile['recommendation'] = sizing_recommendation(profile)
+            profiles[key] = profile
+        return profiles
+
+
+def sizing_recommendation(profile: Dict[str, Any]) -> str:
+    """Describe the ACA size recommended for a workload's usage profile."""
+    observed = (f"p95 CPU {profile['cpu'][1]:g} cores, p99 memory {profile['memory_gib'][2]:g}Gi "
+                f"over {profile['samples']} samples")
+    if profile['recommended_cpu'] is None:
+        largest_cpu, largest_memory = ACA_SIZES[-1]
+        return (f"Observed usage ({observed}) exceeds the largest consumption size "
+                f"({largest_cpu:g} CPU / {largest_memory:g}Gi); split the workload or use a dedicated workload profile")
+    return (f"Size for observed usage ({observed}): "
+            f"{profile['recommended_cpu']:g} CPU / {profile['recommended_memory_gib']:g}Gi")
+
+
+def _iter_documents(f: Any) -> Iterator[Dict[str, Any]]:
+    """Yield JSON documents from a file holding one document per line or a single, possibly indented, document."""
+    first = f.readline()
+    try:
+        document = json.loads(first)
+    except ValueError:
+        # Not one document per line, so the file is a single pretty-printed document
+        yield json.loads(first + f.read())
+        return
+    yield document
+    # Recordings are read a poll at a time, however long the window was
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
@@ -0,0 +1,63 @@
+"""
+Benchmark the memory footprint of slotted records against plain dict records.
+
+Builds a synthetic inventory (100k deployments by default) once as the
+slotted records produced by the collector, and once as the nested dicts they
+replaced, and reports the traced memory retained by each.
+
+    python benchmarks/bench_models_memory.py --deployments 100000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List
+
+from aca_assessor import records
+
+from bench_raw_path import synthetic_list
+
+
+def iter_raw_deployments(deployments: int, containers: int, batch: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Yield raw deployment objects without holding the whole list response in memory."""
+    for start in range(0, deployments, batch):
+        for item in synthetic_list(min(batch, deployments - start), containers)['items']:
+            item['metadata']['name'] = f"app-{start}-{item['metadata']['name']}"
+            yield item
+
+
+def as_dict_record(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the plain dict record, with its own string objects as the client models provided them."""
+    return json.loads(json.dumps(records.process_deployment(obj).to_dict()))
+
+
+def retained(build: Callable[[Dict[str, Any]], Any], deployments: int, containers: int) -> int:
+    """Return the bytes still allocated after building and keeping every record."""
+    gc.collect()
+    tracemalloc.start()
+    kept: List[Any] = [build(obj) for obj in iter_raw_deployments(deployments, containers)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deployments', type=int, default=100000, help='Synthetic deployment count.')
+    parser.add_argument('--containers', type=int, default=2, help='Containers per deployment.')
+    args = parser.parse_args()
+
+    dict_bytes = retained(as_dict_record, args.deployments, args.containers)
+    model_bytes = retained(records.process_deployment, args.deployments, args.containers)
+
+    print(f"{args.deployments} deployments, {args.containers} container(s) each")
+    print(f"{'records':<10}{'total (MB)':>12}{'per deployment (B)':>20}")
+    print(f"{'dict':<10}{dict_bytes / 1e6:>12.1f}{dict_bytes / args.deployments:>20.0f}")
+    print(f"{'slotted':<10}{model_bytes / 1e6:>12.1f}{model_bytes / args.deployments:>20.0f}")
+    print(f"Reduction: {dict_bytes / model_bytes:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
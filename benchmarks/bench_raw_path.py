@@ -0,0 +1,136 @@
+"""
+Benchmark the raw-JSON collection fast path against client model deserialization.
+
+Processes one large deployment list response with both paths and reports
+wall time and peak traced memory. Use a recorded response with --input, e.g.:
+
+    kubectl get --raw /apis/apps/v1/deployments > deployments.json
+    python benchmarks/bench_raw_path.py --input deployments.json
+
+Without --input, a synthetic list response is generated.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from kubernetes import client
+
+from aca_assessor import records
+from aca_assessor.collector import KubernetesCollector
+
+
+class _Response:
+    """Minimal stand-in for the REST response consumed by ApiClient.deserialize."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def synthetic_list(deployments: int, containers: int) -> Dict[str, Any]:
+    """Build a deployment list response resembling what the API server returns."""
+    items = []
+    for i in range(deployments):
+        items.append({
+            'metadata': {
+                'name': f'app-{i}',
+                'namespace': f'ns-{i % 200}',
+                'uid': f'00000000-0000-0000-0000-{i:012d}',
+                'resourceVersion': str(1000 + i),
+                'generation': 3,
+                'creationTimestamp': '2024-01-01T00:00:00Z',
+                'labels': {'app': f'app-{i}', 'team': f'team-{i % 20}'},
+                'annotations': {'deployment.kubernetes.io/revision': '3'},
+                'managedFields': [{'manager': 'kubectl', 'operation': 'Update', 'apiVersion': 'apps/v1',
+                                   'time': '2024-01-01T00:00:00Z', 'fieldsType': 'FieldsV1',
+                                   'fieldsV1': {'f:spec': {'f:replicas': {}}}}],
+            },
+            'spec': {
+                'replicas': 1 + i % 40,
+                'selector': {'matchLabels': {'app': f'app-{i}'}},
+                'strategy': {'type': 'RollingUpdate', 'rollingUpdate': {'maxSurge': '25%', 'maxUnavailable': '25%'}},
+                'template': {
+                    'metadata': {'labels': {'app': f'app-{i}'}},
+                    'spec': {
+                        'containers': [{
+                            'name': f'container-{j}',
+                            'image': f'registry.example.com/app-{i % 50}:1.{j}',
+                            'imagePullPolicy': 'IfNotPresent',
+                            'resources': {'requests': {'cpu': '250m', 'memory': '256Mi'},
+                                          'limits': {'cpu': str(1 + i % 6), 'memory': f'{1 + i % 24}Gi'}},
+                            'ports': [{'name': 'http', 'containerPort': 8080 + j, 'protocol': 'TCP'}],
+                            'env': [{'name': 'MODE', 'value': 'production'},
+                                    {'name': 'PASSWORD', 'valueFrom': {'secretKeyRef': {'name': 'creds', 'key': 'pw'}}}],
+                            'volumeMounts': [{'name': 'config', 'mountPath': '/etc/app', 'readOnly': True}],
+                            'terminationMessagePath': '/dev/termination-log',
+                            'terminationMessagePolicy': 'File',
+                        } for j in range(containers)],
+                        'volumes': [{'name': 'config', 'configMap': {'name': f'app-{i}-config', 'defaultMode': 420}},
+                                    {'name': 'data', 'persistentVolumeClaim': {'claimName': f'app-{i}-data'}}],
+                        'restartPolicy': 'Always',
+                        'dnsPolicy': 'ClusterFirst',
+                    },
+                },
+            },
+            'status': {'replicas': 1 + i % 40, 'readyReplicas': 1 + i % 40, 'observedGeneration': 3},
+        })
+    return {'kind': 'DeploymentList', 'apiVersion': 'apps/v1', 'metadata': {'resourceVersion': '99999'}, 'items': items}
+
+
+def model_path(data: bytes) -> List[Dict[str, Any]]:
+    """Deserialize into client models, then flatten them like the collector does."""
+    collector = KubernetesCollector.__new__(KubernetesCollector)
+    deployment_list = client.ApiClient().deserialize(_Response(data), 'V1DeploymentList')
+    return collector._process_deployments(deployment_list.items)
+
+
+def raw_path(data: bytes) -> List[Dict[str, Any]]:
+    """Map the JSON response straight into records."""
+    return records.process_deployments(json.loads(data).get('items') or [])
+
+
+def measure(func: Callable[[bytes], Any], data: bytes, repeat: int) -> Tuple[float, int, Any]:
+    """Return the best wall time, peak traced memory and result of a path."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', help='Recorded deployment list response (JSON).')
+    parser.add_argument('--deployments', type=int, default=10000, help='Synthetic deployment count.')
+    parser.add_argument('--containers', type=int, default=2, help='Synthetic containers per deployment.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per path; the best is reported.')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, 'rb') as f:
+            data = f.read()
+    else:
+        data = json.dumps(synthetic_list(args.deployments, args.containers)).encode()
+
+    model_time, model_peak, model_result = measure(model_path, data, args.repeat)
+    raw_time, raw_peak, raw_result = measure(raw_path, data, args.repeat)
+
+    print(f"Response size: {len(data) / 1e6:.1f} MB, {len(raw_result)} deployments")
+    print(f"{'path':<8}{'time (s)':>12}{'peak (MB)':>12}")
+    print(f"{'model':<8}{model_time:>12.3f}{model_peak / 1e6:>12.1f}")
+    print(f"{'raw':<8}{raw_time:>12.3f}{raw_peak / 1e6:>12.1f}")
+    print(f"Speedup: {model_time / raw_time:.1f}x, memory: {model_peak / raw_peak:.1f}x less")
+    if model_result != raw_result:
+        raise SystemExit("Raw path produced different records than the model path")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Benchmark collection, analysis and reporting at fleet scale.
+
+For each inventory size, starts the fake API server (fake_apiserver.py) in a
+separate process with a synthetic inventory, then measures each stage:
+
+- collect: KubernetesCollector listing every deployment from the server
+- analyze: ACAAnalyzer assessing the collected records
+- report:<format>: the table that generate_report prints, or a report writer
+
+Each stage reports wall time, throughput, per-deployment latency (the p50 and
+p99 gap between consecutive records, so a page wait shows up in the p99) and
+peak traced memory, measured in a second run under tracemalloc so tracing does
+not slow the timed run.
+
+    python benchmarks/bench_scale.py --sizes 1000,10000,100000 --output results.json
+    python benchmarks/bench_scale.py --sizes 1000,10000 --latency 0.02 --baseline results.json
+
+With --baseline, results are compared with a previous --output file, and the
+script exits with status 1 if any stage's throughput dropped, or its peak
+memory grew, by more than --tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+REPORT_FORMATS = ('table', 'ndjson', 'csv', 'sarif')
+
+
+class FakeServerProcess:
+    """Runs fake_apiserver.py in a child process, so serving pages does not compete with the collector for the GIL."""
+
+    def __init__(self, deployments: int, namespaces: int, containers: int, duplication: int, latency: float,
+                 kubeconfig: str):
+        self.command = [
+            sys.executable, os.path.join(BENCHMARKS, 'fake_apiserver.py'), '--port', '0',
+            '--deployments', str(deployments), '--namespaces', str(namespaces), '--containers', str(containers),
+            '--duplication', str(duplication), '--latency', str(latency), '--kubeconfig', kubeconfig
+        ]
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> 'FakeServerProcess':
+        self.process = subprocess.Popen(self.command, cwd=BENCHMARKS, stdout=subprocess.PIPE, text=True)
+        # The server prints its address once the inventory is built and it is listening
+        for line in self.process.stdout:
+            if 'listening on' in line:
+                return self
+        raise RuntimeError(f"Fake API server exited with status {self.process.wait()}")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def timed(items: Iterable[Any]) -> Tuple[List[Any], List[float], float]:
+    """Consume an iterable, returning its items, the gaps between consecutive items and the total time."""
+    kept, gaps = [], []
+    start = last = time.perf_counter()
+    for item in items:
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+        kept.append(item)
+    return kept, gaps, time.perf_counter() - start
+
+
+def traced_peak(run: Callable[[], Any]) -> int:
+    """Return the peak traced memory of a run, in bytes."""
+    tracemalloc.start()
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def stage_result(size: int, stage: str, count: int, gaps: List[float], seconds: float,
+                 peak: Optional[int]) -> Dict[str, Any]:
+    return {
+        'deployments': size,
+        'stage': stage,
+        'seconds': round(seconds, 4),
+        'throughput': round(count / seconds, 1) if seconds else None,
+        'latency_p50_ms': round(percentile(gaps, 0.50) * 1000, 4) if gaps else None,
+        'latency_p99_ms': round(percentile(gaps, 0.99) * 1000, 4) if gaps else None,
+        'peak_mb': round(peak / 1e6, 2) if peak is not None else None
+    }
+
+
+def bench_size(size: int, args: argparse.Namespace, kubeconfig: str) -> List[Dict[str, Any]]:
+    """Measure every stage for one inventory size."""
+    from aca_assessor.analyzer import ACAAnalyzer
+    from aca_assessor.collector import KubernetesCollector
+    from aca_assessor.report import create_writer
+    from rich.console import Console
+
+    results = []
+    with FakeServerProcess(size, args.namespaces, args.containers, args.duplication, args.latency, kubeconfig):
+        def collect():
+            collector = KubernetesCollector(cluster_wide=True, page_size=args.page_size, raw=True,
+                                            show_progress=False)
+            return collector.iter_deployments()
+
+        records, gaps, seconds = timed(collect())
+        peak = None if args.skip_memory else traced_peak(lambda: list(collect()))
+        results.append(stage_result(size, 'collect', len(records), gaps, seconds, peak))
+
+    def analyze():
+        return ACAAnalyzer(workers=args.workers).iter_analysis(records)
+
+    analysis_results, gaps, seconds = timed(analyze())
+    peak = None if args.skip_memory else traced_peak(lambda: list(analyze()))
+    results.append(stage_result(size, 'analyze', len(analysis_results), gaps, seconds, peak))
+
+    analyzer = ACAAnalyzer()
+
+    def render_table():
+        # What generate_report prints, rendered off-screen at a fixed width
+        Console(file=io.StringIO(), width=160).print(analyzer.build_report_table(analysis_results))
+
+    def write_report(output_format: str) -> Iterator[Any]:
+        writer = create_writer(output_format, io.StringIO(), rules=analyzer.rule_specs)
+        for result in analysis_results:
+            writer.write(result)
+            yield result
+        writer.close()
+
+    for output_format in args.formats:
+        if output_format == 'table':
+            start = time.perf_counter()
+            render_table()
+            seconds, gaps = time.perf_counter() - start, []
+            peak = None if args.skip_memory else traced_peak(render_table)
+        else:
+            _, gaps, seconds = timed(write_report(output_format))
+            peak = None if args.skip_memory else traced_peak(lambda: list(write_report(output_format)))
+        results.append(stage_result(size, f'report:{output_format}', len(analysis_results), gaps, seconds, peak))
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return a description of every stage that regressed against the baseline."""
+    previous = {(entry['deployments'], entry['stage']): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry['deployments'], entry['stage']))
+        if before is None:
+            continue
+        label = f"{entry['stage']} @ {entry['deployments']}"
+        if before.get('throughput') and entry['throughput'] is not None \
+                and entry['throughput'] < before['throughput'] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {entry['throughput']:,.0f}/s, "
+                               f"was {before['throughput']:,.0f}/s")
+        if before.get('peak_mb') and entry['peak_mb'] is not None \
+                and entry['peak_mb'] > before['peak_mb'] * (1 + tolerance):
+            regressions.append(f"{label}: peak memory {entry['peak_mb']:.1f} MB, was {before['peak_mb']:.1f} MB")
+    return regressions
+
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"{'deployments':>12}  {'stage':<15}{'time (s)':>10}{'per sec':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}"
+          f"{'peak (MB)':>11}")
+    for entry in results:
+        def show(value: Any, spec: str) -> str:
+            return format(value, spec) if value is not None else '-'
+        print(f"{entry['deployments']:>12}  {entry['stage']:<15}{show(entry['seconds'], '.3f'):>10}"
+              f"{show(entry['throughput'], ',.0f'):>12}{show(entry['latency_p50_ms'], '.3f'):>10}"
+              f"{show(entry['latency_p99_ms'], '.3f'):>10}{show(entry['peak_mb'], '.1f'):>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated deployment counts.')
+    parser.add_argument('--namespaces', type=int, default=200, help='Namespaces the deployments are spread over.')
+    parser.add_argument('--containers', type=int, default=2, help='Containers per deployment.')
+    parser.add_argument('--duplication', type=int, default=10,
+                        help='Average number of deployments sharing each pod template.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the fake API server adds to every request.')
+    parser.add_argument('--page-size', type=int, default=500, help='Deployments requested per page.')
+    parser.add_argument('--workers', type=int, default=1, help='Analyzer worker processes.')
+    parser.add_argument('--formats', default=','.join(REPORT_FORMATS),
+                        help=f"Comma-separated report formats to time: {', '.join(REPORT_FORMATS)}.")
+    parser.add_argument('--skip-memory', action='store_true', help='Skip the tracemalloc runs for peak memory.')
+    parser.add_argument('--output', help='Save the results to this JSON file.')
+    parser.add_argument('--baseline', help='Compare with results saved by an earlier --output run.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed throughput drop or peak memory growth against the baseline, as a fraction.')
+    args = parser.parse_args()
+    args.formats = [name.strip() for name in args.formats.split(',') if name.strip()]
+    unknown = set(args.formats) - set(REPORT_FORMATS)
+    if unknown:
+        parser.error(f"unknown report format(s): {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        kubeconfig = os.path.join(directory, 'kubeconfig')
+        # The kubernetes client reads KUBECONFIG when it is first imported
+        os.environ['KUBECONFIG'] = kubeconfig
+        results = []
+        for size in (int(value) for value in args.sizes.split(',')):
+            # The collector and analyzer report progress on stdout; only the results are printed here
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                results.extend(bench_size(size, args, kubeconfig))
+
+    print(f"{args.namespaces} namespaces, {args.containers} container(s) per deployment, "
+          f"~{args.duplication} deployment(s) per pod template, {args.latency * 1000:.0f} ms API latency")
+    print_results(results)
+
+    if args.output:
+        from aca_assessor import __version__
+
+        saved = {
+            'version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': time.time(),
+            'parameters': {key: getattr(args, key) for key in ('namespaces', 'containers', 'duplication', 'latency',
+                                                                'page_size', 'workers', 'formats')},
+            'results': results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        print(f"Compared with {args.baseline} (version {baseline.get('version')}), tolerance {args.tolerance:.0%}")
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+CLI cold-start budget check.
+
+Imports aca_assessor.cli in fresh interpreters with `python -X importtime`,
+and fails if the import takes longer than the budget or loads modules that
+should only be imported once an assessment actually runs:
+
+    python benchmarks/bench_startup.py --budget-ms 120
+
+The fastest of several runs is compared to the budget, so a single slow run on
+a busy machine does not fail the check. The exit status is 1 on regression.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Modules that must not be imported just to load the CLI, e.g. for --help or --init-config
+DEFERRED_MODULES = ('kubernetes', 'azure', 'yaml', 'numpy', 'rich.progress', 'rich.table', 'cProfile')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def import_profile() -> Dict[str, int]:
+    """Import the CLI in a fresh interpreter and return the cumulative import time of each module in microseconds."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import aca_assessor.cli'],
+        capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def help_wall_time() -> float:
+    """Return the wall time in seconds of `aca-assess --help` in a fresh interpreter."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'aca_assessor.cli', '--help'], capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def deferred_imports(modules: Dict[str, int]) -> List[str]:
+    """Return the modules loaded at startup that should have been deferred."""
+    return sorted(
+        name for name in modules
+        if any(name == deferred or name.startswith(deferred + '.') for deferred in DEFERRED_MODULES)
+    )
+
+
+def measure(runs: int) -> Tuple[List[float], List[float], Dict[str, int]]:
+    """Return CLI import times and --help wall times in milliseconds, and the last import profile."""
+    # The first run compiles bytecode and warms the file system cache
+    import_profile()
+    import_times, help_times, modules = [], [], {}
+    for _ in range(runs):
+        modules = import_profile()
+        import_times.append(modules.get('aca_assessor.cli', 0) / 1000)
+        help_times.append(help_wall_time() * 1000)
+    return import_times, help_times, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=120.0,
+                        help='Maximum import time of aca_assessor.cli in milliseconds')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to measure')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list')
+    args = parser.parse_args()
+
+    import_times, help_times, modules = measure(args.runs)
+    fastest = min(import_times)
+    print(f"aca_assessor.cli import: fastest {fastest:.1f} ms, median {statistics.median(import_times):.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+    print(f"aca-assess --help wall time: median {statistics.median(help_times):.1f} ms")
+
+    print("Slowest imports:")
+    for name, micros in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    failed = False
+    deferred = deferred_imports(modules)
+    if deferred:
+        print(f"FAIL: modules imported at startup that should be deferred: {', '.join(deferred)}")
+        failed = True
+    if fastest > args.budget_ms:
+        print(f"FAIL: CLI import took {fastest:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
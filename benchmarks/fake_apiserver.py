@@ -0,0 +1,388 @@
+"""
+Local fake Kubernetes API server for exercising collection and the watch daemon.
+
+Serves a synthetic set of deployments with paginated lists, field selectors
+and watch streams (with resourceVersions, bookmarks, timeouts and 410 Gone for
+expired resourceVersions), and can keep changing deployments at a fixed rate.
+A Service per deployment, and some StatefulSets, Ingresses and
+HorizontalPodAutoscalers, are served as static lists for --kinds and --related.
+Pod metrics (metrics.k8s.io) are served for up to three pods per deployment,
+with fresh noisy usage on every poll, for --usage-window.
+Every request can be delayed by a fixed latency to mimic a remote API server,
+and list requests can be made to fail after a number of pages.
+A kubeconfig pointing at the server is written so the CLI can be run against it:
+
+    python benchmarks/fake_apiserver.py --deployments 5000 --churn 20 --kubeconfig /tmp/fake.kubeconfig
+    KUBECONFIG=/tmp/fake.kubeconfig aca-assess watch --port 9464
+
+The server can also be started from other scripts with FakeApiServer.
+"""
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from bench_raw_path import synthetic_list
+from synthetic import synthetic_inventory
+
+# Resources served as static lists, by URL plural
+STATIC_RESOURCES = ('services', 'statefulsets', 'daemonsets', 'jobs', 'cronjobs', 'ingresses',
+                    'horizontalpodautoscalers')
+
+
+def synthetic_related(deployments: List[Dict[str, Any]], containers: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Build Services, StatefulSets, Ingresses and HPAs for synthetic deployments."""
+    related: Dict[str, List[Dict[str, Any]]] = {resource: [] for resource in STATIC_RESOURCES}
+    for i, dep in enumerate(deployments):
+        name, namespace = dep['metadata']['name'], dep['metadata']['namespace']
+        ports = [{'name': 'http', 'port': 80, 'targetPort': 8080, 'protocol': 'TCP'}]
+        if i % 7 == 0:
+            ports.append({'name': 'metrics', 'port': 9090, 'targetPort': 9090, 'protocol': 'TCP'})
+        related['services'].append({
+            'metadata': {'name': name, 'namespace': namespace},
+            'spec': {'type': 'NodePort' if i % 11 == 0 else 'ClusterIP', 'selector': {'app': name}, 'ports': ports},
+        })
+        if i % 5 == 0:
+            related['horizontalpodautoscalers'].append({
+                'metadata': {'name': name, 'namespace': namespace},
+                'spec': {'scaleTargetRef': {'apiVersion': 'apps/v1', 'kind': 'Deployment', 'name': name},
+                         'minReplicas': 1, 'maxReplicas': 20 + (i % 3) * 10},
+            })
+        if i % 10 == 0:
+            # Path-based routing to this deployment and the next one in the namespace
+            paths = [{'path': f'/{backend}', 'pathType': 'Prefix',
+                      'backend': {'service': {'name': backend, 'port': {'number': 80}}}}
+                     for backend in (name, f"app-{i + 200}")]
+            related['ingresses'].append({
+                'metadata': {'name': name, 'namespace': namespace},
+                'spec': {'rules': [{'host': f'{name}.example.com', 'http': {'paths': paths}}]},
+            })
+    for obj in synthetic_list(len(deployments) // 10, containers)['items']:
+        obj['metadata']['name'] = f"db-{obj['metadata']['name']}"
+        obj['spec']['template']['metadata']['labels'] = {'app': obj['metadata']['name']}
+        related['statefulsets'].append(obj)
+    return related
+
+# Pods per deployment that pod metrics are served for
+METRICS_PODS = 3
+
+
+class FakeCluster:
+    """Deployments and the recent event history of a fake cluster."""
+
+    def __init__(self, deployments: int, containers: int = 2, history: int = 10000, seed: int = 0,
+                 namespaces: int = 200, duplication: int = 1):
+        self._lock = threading.Condition()
+        self._random = random.Random(seed)
+        self.resource_version = 1000
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        for obj in synthetic_inventory(deployments, namespaces, containers, duplication):
+            self._stamp(obj)
+            self.objects[self._key(obj)] = obj
+        self.static = synthetic_related(list(self.objects.values()), containers)
+        # Sorted, filtered listings by (resource, namespace, excluded namespaces), valid for one resourceVersion,
+        # so paging through a large list does not re-sort it for every page
+        self._listings: Dict[Tuple[str, Optional[str], Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        self._listings_version = self.resource_version
+        # (resourceVersion, event type, object); watches older than the first entry get 410 Gone
+        self.events: Deque[Tuple[int, str, Dict[str, Any]]] = deque(maxlen=history)
+        self.oldest = self.resource_version
+
+    @staticmethod
+    def _key(obj: Dict[str, Any]) -> str:
+        return f"{obj['metadata']['namespace']}/{obj['metadata']['name']}"
+
+    def _stamp(self, obj: Dict[str, Any]):
+        self.resource_version += 1
+        obj['metadata']['resourceVersion'] = str(self.resource_version)
+
+    def _record(self, event_type: str, obj: Dict[str, Any]):
+        self.events.append((self.resource_version, event_type, obj))
+        self.oldest = self.events[0][0] - 1
+        self._lock.notify_all()
+
+    def namespaces(self) -> List[str]:
+        with self._lock:
+            return sorted({obj['metadata']['namespace'] for obj in self.objects.values()})
+
+    def list(self, namespace: Optional[str], excluded: List[str], limit: Optional[int],
+             continue_token: Optional[str], resource: str = 'deployments') -> Dict[str, Any]:
+        """Return one page of a list, as the API server would."""
+        with self._lock:
+            if self._listings_version != self.resource_version:
+                self._listings = {}
+                self._listings_version = self.resource_version
+            listing_key = (resource, namespace, tuple(sorted(excluded)))
+            items = self._listings.get(listing_key)
+            if items is None:
+                objects = self.objects.values() if resource == 'deployments' else self.static[resource]
+                items = self._listings[listing_key] = [
+                    obj for obj in sorted(objects, key=self._key)
+                    if (namespace is None or obj['metadata']['namespace'] == namespace)
+                    and obj['metadata']['namespace'] not in excluded
+                ]
+            resource_version = str(self.resource_version)
+        start = int(continue_token or 0)
+        end = start + limit if limit else len(items)
+        metadata = {'resourceVersion': resource_version}
+        if end < len(items):
+            metadata['continue'] = str(end)
+            metadata['remainingItemCount'] = len(items) - end
+        return {'kind': 'List', 'apiVersion': 'v1', 'metadata': metadata, 'items': items[start:end]}
+
+    def pod_metrics(self, namespace: Optional[str]) -> Dict[str, Any]:
+        """Return a PodMetricsList with new usage for up to METRICS_PODS pods of every deployment."""
+        with self._lock:
+            items = []
+            for obj in sorted(self.objects.values(), key=self._key):
+                metadata = obj['metadata']
+                if namespace is not None and metadata['namespace'] != namespace:
+                    continue
+                # Each deployment idles around its own level, from 10m to 2.5 cores and 64Mi to 4Gi
+                stable = random.Random(metadata['name'])
+                level = stable.random()
+                template_hash = f"{stable.getrandbits(32):08x}"
+                for pod in range(min(METRICS_PODS, obj['spec'].get('replicas') or 1)):
+                    cpu = int((0.01 + 2.5 * level) * self._random.uniform(0.5, 1.5) * 1e9)
+                    memory = int((64 + 4032 * level) * self._random.uniform(0.8, 1.2) * 1024)
+                    items.append({
+                        'metadata': {'name': f"{metadata['name']}-{template_hash}-{pod:05d}",
+                                     'namespace': metadata['namespace'],
+                                     'labels': {'app': metadata['name'], 'pod-template-hash': template_hash}},
+                        'window': '15s',
+                        'containers': [{'name': 'main', 'usage': {'cpu': f'{cpu}n', 'memory': f'{memory}Ki'}}]
+                    })
+        return {'kind': 'PodMetricsList', 'apiVersion': 'metrics.k8s.io/v1beta1', 'metadata': {}, 'items': items}
+
+    def events_since(self, resource_version: int, timeout: float) -> Optional[List[Tuple[int, str, Dict[str, Any]]]]:
+        """Wait up to `timeout` for events after a resourceVersion; None if it is older than the history."""
+        with self._lock:
+            if resource_version < self.oldest:
+                return None
+            if self.resource_version <= resource_version:
+                self._lock.wait(timeout)
+            return [event for event in self.events if event[0] > resource_version]
+
+    def expire(self, changes: int = 1):
+        """
+        Apply some changes and then drop the event history, as etcd compaction does, so watches from any earlier
+        resourceVersion get 410 Gone.
+        """
+        with self._lock:
+            for _ in range(changes):
+                self.mutate()
+            self.events.clear()
+            self.oldest = self.resource_version
+            self._lock.notify_all()
+
+    def mutate(self):
+        """Apply one random change: mostly modifications, with occasional additions and deletions."""
+        with self._lock:
+            roll = self._random.random()
+            if roll < 0.1 or not self.objects:
+                obj = copy.deepcopy(synthetic_list(1, 1)['items'][0])
+                obj['metadata']['name'] = f"added-{self.resource_version}"
+                self._stamp(obj)
+                self.objects[self._key(obj)] = obj
+                self._record('ADDED', obj)
+            elif roll < 0.15:
+                key = self._random.choice(list(self.objects))
+                obj = self.objects.pop(key)
+                self._stamp(obj)
+                self._record('DELETED', obj)
+            else:
+                key = self._random.choice(list(self.objects))
+                obj = copy.deepcopy(self.objects[key])
+                container = obj['spec']['template']['spec']['containers'][0]
+                if roll < 0.6:
+                    # Changes the ACA assessment
+                    container['resources']['limits']['cpu'] = str(self._random.randint(1, 6))
+                else:
+                    # Status-only changes leave the assessment record untouched
+                    obj['status']['readyReplicas'] = self._random.randint(0, obj['spec']['replicas'])
+                self._stamp(obj)
+                self.objects[key] = obj
+                self._record('MODIFIED', obj)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        cluster: FakeCluster = self.server.cluster
+        parts = url.path.strip('/').split('/')
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if url.path == '/api/v1/namespaces':
+            items = [{'metadata': {'name': name}} for name in cluster.namespaces()]
+            return self._json({'kind': 'NamespaceList', 'apiVersion': 'v1', 'metadata': {}, 'items': items})
+        # e.g. /apis/apps/v1/deployments or /api/v1/namespaces/<namespace>/services
+        resource = parts[-1]
+        namespace = parts[-2] if len(parts) >= 3 and parts[-3] == 'namespaces' else None
+        if parts[:2] == ['apis', 'metrics.k8s.io'] and resource == 'pods':
+            return self._json(cluster.pod_metrics(namespace))
+        if resource != 'deployments' and resource not in STATIC_RESOURCES:
+            return self._json({'kind': 'Status', 'code': 404, 'reason': 'NotFound'}, 404)
+
+        if query.get('watch') in ('true', '1', 'True') and resource == 'deployments':
+            return self._watch(cluster, namespace, query)
+        excluded = [selector.split('!=', 1)[1] for selector in query.get('fieldSelector', '').split(',')
+                    if selector.startswith('metadata.namespace!=')]
+        limit = int(query['limit']) if query.get('limit') else None
+        if self.server.fail_after is not None:
+            self.server.lists_served += 1
+            if self.server.lists_served > self.server.fail_after:
+                return self._json({'kind': 'Status', 'code': 500, 'reason': 'InternalError',
+                                   'message': 'injected failure'}, 500)
+        self._json(cluster.list(namespace, excluded, limit, query.get('continue'), resource))
+
+    def _watch(self, cluster: FakeCluster, namespace: Optional[str], query: Dict[str, str]):
+        """Stream watch events as JSON lines until timeoutSeconds has passed."""
+        resource_version = int(query.get('resourceVersion') or cluster.resource_version)
+        deadline = time.monotonic() + float(query.get('timeoutSeconds') or 60)
+        bookmarks = query.get('allowWatchBookmarks') in ('true', '1', 'True')
+        bookmark_interval = self.server.bookmark_interval
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        last_bookmark = time.monotonic()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                events = cluster.events_since(resource_version, min(remaining, bookmark_interval))
+                if events is None:
+                    self._event('ERROR', {'kind': 'Status', 'apiVersion': 'v1', 'status': 'Failure', 'code': 410,
+                                          'reason': 'Expired', 'message': f'too old resource version: {resource_version}'})
+                    break
+                for event_resource_version, event_type, obj in events:
+                    resource_version = event_resource_version
+                    if namespace is None or obj['metadata']['namespace'] == namespace:
+                        self._event(event_type, obj)
+                if bookmarks and time.monotonic() - last_bookmark >= bookmark_interval:
+                    last_bookmark = time.monotonic()
+                    self._event('BOOKMARK', {'kind': 'Deployment', 'apiVersion': 'apps/v1',
+                                             'metadata': {'resourceVersion': str(resource_version)}})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _event(self, event_type: str, obj: Dict[str, Any]):
+        self.wfile.write(json.dumps({'type': event_type, 'object': obj}).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def _json(self, body: Dict[str, Any], status: int = 200):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeApiServer:
+    """Runs a fake cluster's API server, and optionally a change generator, in background threads."""
+
+    def __init__(self, cluster: FakeCluster, host: str = '127.0.0.1', port: int = 0,
+                 churn: float = 0.0, bookmark_interval: float = 5.0, latency: float = 0.0,
+                 fail_after: Optional[int] = None):
+        self.cluster = cluster
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.cluster = cluster
+        self.server.bookmark_interval = bookmark_interval
+        # Seconds added to every request
+        self.server.latency = latency
+        # List requests served before every later one fails with 500, to exercise collection errors
+        self.server.fail_after = fail_after
+        self.server.lists_served = 0
+        # Changes per second made by the change generator
+        self.churn = churn
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeApiServer':
+        self._threads.append(threading.Thread(target=self.server.serve_forever, daemon=True))
+        if self.churn > 0:
+            self._threads.append(threading.Thread(target=self._generate_changes, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _generate_changes(self):
+        while not self._stop.wait(1.0 / self.churn):
+            self.cluster.mutate()
+
+    def write_kubeconfig(self, path: str, context: str = 'fake'):
+        """Write a kubeconfig whose only context points at this server."""
+        kubeconfig = {
+            'apiVersion': 'v1',
+            'kind': 'Config',
+            'clusters': [{'name': context, 'cluster': {'server': self.url}}],
+            'users': [{'name': context, 'user': {'token': 'fake'}}],
+            'contexts': [{'name': context, 'context': {'cluster': context, 'user': context}}],
+            'current-context': context,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            # JSON is valid YAML, so the kubeconfig loader reads it as is
+            json.dump(kubeconfig, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--deployments', type=int, default=1000, help='Number of synthetic deployments.')
+    parser.add_argument('--containers', type=int, default=2, help='Containers per deployment.')
+    parser.add_argument('--namespaces', type=int, default=200, help='Namespaces the deployments are spread over.')
+    parser.add_argument('--duplication', type=int, default=1,
+                        help='Average number of deployments sharing each pod template.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request.')
+    parser.add_argument('--fail-after', type=int,
+                        help='Fail every list request after this many with 500 Internal Server Error.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=8001, help='Port to listen on.')
+    parser.add_argument('--churn', type=float, default=0.0, help='Deployment changes per second.')
+    parser.add_argument('--history', type=int, default=10000,
+                        help='Events kept for watches; older resourceVersions get 410 Gone.')
+    parser.add_argument('--bookmark-interval', type=float, default=5.0, help='Seconds between watch bookmarks.')
+    parser.add_argument('--kubeconfig', help='Write a kubeconfig for the server to this path.')
+    args = parser.parse_args()
+
+    cluster = FakeCluster(args.deployments, args.containers, args.history, namespaces=args.namespaces,
+                          duplication=args.duplication)
+    server = FakeApiServer(cluster, args.host, args.port, args.churn, args.bookmark_interval, args.latency,
+                           args.fail_after).start()
+    if args.kubeconfig:
+        server.write_kubeconfig(args.kubeconfig)
+        print(f"Wrote kubeconfig to {args.kubeconfig}", flush=True)
+    # Scripts starting the server wait for this line
+    print(f"Fake API server with {args.deployments} deployments listening on {server.url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Synthetic inventory generator for benchmarks.
+
+Builds deployment objects as the API server returns them, with a configurable
+number of namespaces, containers per pod and pod template duplication: with a
+duplication of 10, every pod template is shared by about 10 deployments, as
+with fleets stamped out from a few Helm charts. Deployments sharing a template
+share its spec objects, so 100k deployments stay cheap to hold and serve.
+"""
+from typing import Any, Dict, List
+
+from bench_raw_path import synthetic_list
+
+
+def synthetic_inventory(deployments: int, namespaces: int = 200, containers: int = 2,
+                        duplication: int = 1) -> List[Dict[str, Any]]:
+    """Build raw deployment objects; each distinct pod template is assessed once by the analyzer's template cache."""
+    namespaces = max(1, namespaces)
+    template_count = max(1, -(-deployments // max(1, duplication)))
+    templates = synthetic_list(min(template_count, max(deployments, 1)), containers)['items']
+    for t, template in enumerate(templates):
+        # Container names are part of a template's fingerprint, so they make every template distinct
+        for container in template['spec']['template']['spec']['containers']:
+            container['name'] = f"tpl-{t}-{container['name']}"
+
+    items = []
+    for i in range(deployments):
+        template = templates[i % len(templates)]
+        name = f'app-{i}'
+        metadata = dict(template['metadata'], name=name, namespace=f'ns-{i % namespaces}',
+                        uid=f'00000000-0000-0000-0000-{i:012d}', labels={'app': name, 'team': f'team-{i % 20}'})
+        spec = dict(template['spec'], selector={'matchLabels': {'app': name}},
+                    template={'metadata': {'labels': {'app': name}}, 'spec': template['spec']['template']['spec']})
+        items.append({'metadata': metadata, 'spec': spec, 'status': template['status']})
+    return items
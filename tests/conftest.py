@@ -0,0 +1,30 @@
+"""Shared fixtures: a local fake Kubernetes API server from benchmarks/fake_apiserver.py."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+# The kubernetes client reads KUBECONFIG when it is first imported, so every fake server writes its kubeconfig here
+KUBECONFIG = os.path.join(tempfile.mkdtemp(prefix='aca-assessor-tests-'), 'kubeconfig')
+os.environ['KUBECONFIG'] = KUBECONFIG
+
+from fake_apiserver import FakeApiServer, FakeCluster  # noqa: E402
+
+
+@pytest.fixture
+def fake_api():
+    """Start fake API servers with the given cluster and server options, pointing the kubeconfig at the latest."""
+    servers = []
+
+    def start(deployments: int = 300, history: int = 10000, **options) -> FakeApiServer:
+        server = FakeApiServer(FakeCluster(deployments, history=history), **options).start()
+        server.write_kubeconfig(KUBECONFIG)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
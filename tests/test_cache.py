@@ -0,0 +1,54 @@
+from kubernetes.client.rest import ApiException
+
+from aca_assessor.cache import InventoryCache
+from aca_assessor.collector import KubernetesCollector
+
+
+def keys(snapshot) -> list:
+    return sorted(snapshot.entries)
+
+
+def cached_inventory(fake_api, tmp_path):
+    api = fake_api(deployments=20)
+    collector = KubernetesCollector(cluster_wide=True, raw=True, show_progress=False)
+    cache = InventoryCache(str(tmp_path), ttl=3600, watch_timeout=1)
+    cache.save(cache.refresh(collector))
+    return api.cluster, collector, cache
+
+
+def test_refresh_applies_watch_events(fake_api, tmp_path, capsys):
+    cluster, collector, cache = cached_inventory(fake_api, tmp_path)
+    cluster.mutate()
+
+    snapshot = cache.refresh(collector)
+    assert 'Refreshed cached inventory: 1 change(s)' in capsys.readouterr().out
+    assert snapshot.resource_version == str(cluster.resource_version)
+    assert keys(snapshot) == sorted(cluster.objects)
+
+
+def test_expired_resource_version_relists(fake_api, tmp_path, capsys):
+    cluster, collector, cache = cached_inventory(fake_api, tmp_path)
+    cluster.expire(changes=3)
+
+    snapshot = cache.refresh(collector)
+    out = capsys.readouterr().out
+    assert 'Cached resourceVersion has expired' in out
+    assert 'full deployment list' in out
+    assert keys(snapshot) == sorted(cluster.objects)
+
+
+def test_failed_watch_relists(fake_api, tmp_path, capsys):
+    cluster, collector, cache = cached_inventory(fake_api, tmp_path)
+    cluster.mutate()
+
+    def failing_watch(*args, **kwargs):
+        raise ApiException(status=500, reason='Internal Server Error')
+        yield
+
+    collector.watch_deployment_changes = failing_watch
+    snapshot = cache.refresh(collector)
+    out = capsys.readouterr().out
+    assert 'Could not watch for changes since the cached inventory' in out
+    assert 'full deployment list' in out
+    assert snapshot.resource_version == str(cluster.resource_version)
+    assert keys(snapshot) == sorted(cluster.objects)
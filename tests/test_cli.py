@@ -0,0 +1,50 @@
+import pytest
+from click.testing import CliRunner
+
+from aca_assessor.cli import cli
+from aca_assessor.inventory import parse_kinds
+
+
+def test_parse_kinds():
+    assert parse_kinds(None) == ('Deployment',)
+    assert parse_kinds('Deployments, cronjob,deployment') == ('Deployment', 'CronJob')
+    assert len(parse_kinds('deployment,all')) == 5
+    with pytest.raises(ValueError, match=r'Unknown workload kind\(s\): pods, svc'):
+        parse_kinds('deployment,pods,svc')
+
+
+def test_invalid_kinds_are_a_usage_error(tmp_path):
+    result = CliRunner().invoke(cli, ['assess', '--from-path', str(tmp_path), '--kinds', 'deployment,pods'])
+
+    assert result.exit_code == 2
+    assert "Invalid value for '--kinds'" in result.output
+    assert 'pods' in result.output
+    assert 'deployment, statefulset, daemonset, job, cronjob or all' in result.output
+
+
+def test_unreachable_context_fails_the_run(fake_api):
+    fake_api(deployments=30)
+
+    result = CliRunner().invoke(cli, ['assess', '--contexts', 'fake,missing', '--output-format', 'summary'])
+
+    assert result.exit_code == 1
+    assert 'missing' in result.output
+    assert '--allow-partial to accept a partial report' in ' '.join(result.output.split())
+
+
+def test_allow_partial_accepts_unreachable_context(fake_api):
+    fake_api(deployments=30)
+
+    result = CliRunner().invoke(cli, ['assess', '--contexts', 'fake,missing', '--output-format', 'summary',
+                                      '--allow-partial'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Could not assess 1 cluster(s)' in result.output
+
+
+def test_every_context_reachable(fake_api):
+    fake_api(deployments=30)
+
+    result = CliRunner().invoke(cli, ['assess', '--contexts', 'fake', '--output-format', 'summary'])
+
+    assert result.exit_code == 0, result.output
@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from urllib.request import urlopen
+
+import pytest
+
+from aca_assessor.analyzer import ACAAnalyzer
+from aca_assessor.collector import KubernetesCollector
+from aca_assessor.daemon import AssessmentDaemon, serve
+
+
+def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the daemon")
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def running_daemon(fake_api):
+    """A daemon following a fake API server in a background thread, and the base URL of its HTTP server."""
+    api = fake_api(deployments=50, bookmark_interval=0.2)
+    collector = KubernetesCollector(cluster_wide=True, raw=True, show_progress=False)
+    daemon = AssessmentDaemon(collector, ACAAnalyzer(), watch_timeout=1)
+    server, _ = serve(daemon, port=0)
+    runner = threading.Thread(target=daemon.run, daemon=True)
+    runner.start()
+    host, port = server.server_address[:2]
+    yield api.cluster, daemon, f"http://{host}:{port}"
+    daemon.stop()
+    runner.join(timeout=5)
+    server.shutdown()
+
+
+def get(url: str) -> str:
+    with urlopen(url, timeout=5) as response:
+        return response.read().decode('utf-8')
+
+
+def changes(daemon: AssessmentDaemon) -> int:
+    return sum(count for event_type, count in daemon.status()['events'].items() if event_type != 'BOOKMARK')
+
+
+def test_initial_sync(running_daemon):
+    cluster, daemon, url = running_daemon
+    wait_for(lambda: daemon.synced)
+
+    status = daemon.status()
+    assert status['deployments'] == 50
+    assert status['relists'] == 1
+    assert status['analyses'] == 50
+    assert status['resource_version'] == str(cluster.resource_version)
+    assert get(f"{url}/healthz") == 'ok\n'
+
+
+def test_watch_event_is_applied(running_daemon):
+    cluster, daemon, _ = running_daemon
+    wait_for(lambda: daemon.synced)
+
+    cluster.mutate()
+    wait_for(lambda: changes(daemon) == 1)
+
+    assert daemon.status()['resource_version'] == str(cluster.resource_version)
+    assert sorted(f"{r['namespace']}/{r['name']}" for r in daemon.results()) == sorted(cluster.objects)
+    assert daemon.status()['relists'] == 1
+
+
+def test_expired_resource_version_relists(running_daemon):
+    cluster, daemon, _ = running_daemon
+    wait_for(lambda: daemon.synced)
+    analyses = daemon.status()['analyses']
+
+    # The changes are dropped from the watch history, so the daemon only sees them by listing again
+    cluster.expire(changes=5)
+    wait_for(lambda: daemon.status()['relists'] == 2)
+
+    status = daemon.status()
+    assert status['deployments'] == len(cluster.objects)
+    assert sorted(f"{r['namespace']}/{r['name']}" for r in daemon.results()) == sorted(cluster.objects)
+    # Unchanged deployments keep their results across the relist
+    assert status['analyses'] - analyses <= 5
+
+
+def test_metrics_and_results_endpoints(running_daemon):
+    cluster, daemon, url = running_daemon
+    wait_for(lambda: daemon.synced)
+
+    metrics = get(f"{url}/metrics")
+    assert 'aca_assessor_deployments 50\n' in metrics
+    assert 'aca_assessor_synced 1\n' in metrics
+    assert 'aca_assessor_relists_total 1\n' in metrics
+    assert 'aca_assessor_compatibility_score{namespace="ns-0",deployment="app-0"}' in metrics
+
+    results = json.loads(get(f"{url}/results"))
+    assert len(results) == 50
+    in_namespace = json.loads(get(f"{url}/results?namespace=ns-0"))
+    assert [result['name'] for result in in_namespace] == [
+        obj['metadata']['name'] for key, obj in sorted(cluster.objects.items()) if key.startswith('ns-0/')
+    ]
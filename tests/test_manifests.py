@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from aca_assessor.manifests import ManifestCollector, iter_json_documents, parse_manifest_file
+
+
+def deployment(name: str, namespace: str = 'default', replicas: int = 1) -> dict:
+    return {
+        'apiVersion': 'apps/v1',
+        'kind': 'Deployment',
+        'metadata': {'name': name, 'namespace': namespace},
+        'spec': {
+            'replicas': replicas,
+            'template': {'spec': {'containers': [{'name': 'app', 'image': 'nginx:1.25'}]}}
+        }
+    }
+
+
+def test_iter_json_documents():
+    assert list(iter_json_documents('')) == []
+    assert list(iter_json_documents(' {"a": 1}\n')) == [{'a': 1}]
+    assert list(iter_json_documents('{"a": 1}{"b": 2}\n\n[3]\n')) == [{'a': 1}, {'b': 2}, [3]]
+
+
+def test_iter_json_documents_rejects_trailing_garbage():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_documents('{"a": 1}\n{"b": '))
+
+
+def test_parse_newline_delimited_json(tmp_path):
+    path = tmp_path / 'deployments.json'
+    items = {'apiVersion': 'v1', 'kind': 'List', 'items': [deployment('b'), deployment('c')]}
+    path.write_text('\n'.join(json.dumps(document) for document in (deployment('a'), items)) + '\n')
+
+    _, deployments, _, error = parse_manifest_file(str(path))
+    assert error is None
+    assert [dep.name for dep, _ in deployments] == ['a', 'b', 'c']
+
+
+def test_duplicates_across_files_are_assessed_once(tmp_path, capsys):
+    dump = {'apiVersion': 'v1', 'kind': 'List', 'items': [deployment('web', replicas=3), deployment('api')]}
+    (tmp_path / 'a-dump.json').write_text(json.dumps(dump))
+    (tmp_path / 'b-gitops.json').write_text(json.dumps(deployment('web', replicas=5)) + '\n'
+                                            + json.dumps(deployment('web', namespace='other')))
+
+    collected = ManifestCollector(str(tmp_path)).collect_deployments()
+    assert [(dep.namespace, dep.name, dep.replicas) for dep in collected] == [
+        ('default', 'web', 3), ('default', 'api', 1), ('other', 'web', 1)
+    ]
+    assert 'Skipped 1 duplicate workload(s)' in capsys.readouterr().out
@@ -0,0 +1,65 @@
+from fractions import Fraction
+
+import pytest
+
+from aca_assessor.quantity import _parse, convert_column, cpu_cores, memory_gib
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1.5Gi', Fraction(3, 2) * 2 ** 30),
+    ('128Mi', 128 * 2 ** 20),
+    ('128M', 128 * 10 ** 6),
+    ('100m', Fraction(1, 10)),
+    ('2e3', 2000),
+    ('2E3', 2000),
+    ('1e-3', Fraction(1, 1000)),
+    ('1.5e+2', 150),
+    ('1Ei', 2 ** 60),
+    # A bare trailing E is the exa suffix, not an exponent
+    ('1E', 10 ** 18),
+    ('250n', Fraction(1, 4 * 10 ** 6)),
+    ('.5', Fraction(1, 2)),
+    ('-1k', -1000),
+    (' 2 ', 2),
+    (4, 4),
+])
+def test_parse_is_exact(value, expected):
+    assert _parse(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'abc', '1.5GB', '1e', 'Mi', '1 Gi', '1..5', '5mi'])
+def test_parse_rejects_invalid_quantities(value):
+    assert _parse(value) is None
+
+
+def test_cpu_cores():
+    assert cpu_cores('100m') == 0.1
+    assert cpu_cores('1500m') == 1.5
+    assert cpu_cores('2') == 2.0
+    assert cpu_cores('2e3') == 2000.0
+    assert cpu_cores('bogus') == 0.0
+
+
+def test_memory_gib():
+    assert memory_gib('1.5Gi') == 1.5
+    assert memory_gib('128Mi') == 0.125
+    assert memory_gib('128M') == 128 * 10 ** 6 / 2 ** 30
+    assert memory_gib('1Ei') == 2 ** 30
+    # m is milli on memory too, so 100m is a tenth of a byte
+    assert memory_gib('100m') == 0.1 / 2 ** 30
+    assert memory_gib('bogus') == 0.0
+
+
+def test_convert_column():
+    assert convert_column(['500m', '2', '500m'], 'millicores') == [500.0, 2000.0, 500.0]
+    assert convert_column(['1Gi', '512Mi'], 'mib') == [1024.0, 512.0]
+    assert convert_column(['1.5Gi'], 'gib') == [1.5]
+
+
+def test_convert_column_marks_missing_and_invalid_entries():
+    assert convert_column([None, '', 'bogus', '1Gi', 'bogus'], 'gib') == [None, None, None, 1.0, None]
+
+
+def test_convert_column_rejects_unknown_unit():
+    with pytest.raises(ValueError, match="Unknown unit 'kb'"):
+        convert_column(['1Gi'], 'kb')
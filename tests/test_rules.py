@@ -0,0 +1,65 @@
+import pytest
+
+from aca_assessor.analyzer import ACAAnalyzer
+from aca_assessor.models import Container, Deployment, Resources, ResourceList
+from aca_assessor.rules import RuleEngine
+
+CONSTRAINTS = {'max_cpu': '4', 'max_replicas': 30}
+CONVERTERS = {'cpu': float}
+
+
+def rule(**spec):
+    return dict({'id': 'custom', 'field': 'replicas', 'operator': 'gt', 'threshold': 5, 'deduction': 1}, **spec)
+
+
+def deployment(replicas: int = 10, image: str = 'nginx:latest') -> Deployment:
+    container = Container('web', image, Resources(ResourceList('8'), ResourceList('8')))
+    return Deployment('app', 'default', replicas, (container,))
+
+
+def test_unknown_placeholder_in_issue_is_rejected():
+    with pytest.raises(ValueError, match=r"Rule 'custom' .*unknown placeholder '\{foo\}'"):
+        RuleEngine([rule(issue="Too many replicas: {foo}")], CONSTRAINTS, CONVERTERS)
+
+
+def test_unknown_placeholder_in_recommendation_is_rejected():
+    with pytest.raises(ValueError, match=r"unknown placeholder '\{port\}'"):
+        # {port} only exists for rules that iterate containers[].ports[]
+        RuleEngine([rule(field='containers[].image', operator='eq', threshold='x', recommendation="Fix {port}")],
+                   CONSTRAINTS, CONVERTERS)
+
+
+def test_malformed_template_is_rejected():
+    with pytest.raises(ValueError, match="malformed message template"):
+        RuleEngine([rule(issue="Replicas {value")], CONSTRAINTS, CONVERTERS)
+
+
+def test_known_placeholders_are_accepted():
+    engine = RuleEngine([rule(field='containers[].image', operator='matches', threshold=':latest$',
+                              issue="{container} in {namespace}/{deployment} uses {value!r} ({threshold})",
+                              recommendation="Pin {container.upper}")], CONSTRAINTS, CONVERTERS)
+    analyzer = ACAAnalyzer(rules=[rule(issue="{deployment} runs {value:>3} replicas, over {threshold}")],
+                           disabled_rules=['cpu-limit', 'memory-limit'])
+    assert engine.rules[0].id == 'custom'
+    assert analyzer.analyze_deployment(deployment()).compatibility_issues == ["app runs  10 replicas, over 5"]
+
+
+def test_ordering_operator_needs_numeric_threshold():
+    with pytest.raises(ValueError, match=r"Rule 'custom' operator 'lt' needs a numeric threshold"):
+        RuleEngine([rule(operator='lt', threshold='ten')], CONSTRAINTS, CONVERTERS)
+
+
+def test_ordering_operator_on_text_field_is_rejected():
+    with pytest.raises(ValueError, match=r"Rule 'custom' compares the text field 'containers\[\]\.image' with 'gt'"):
+        RuleEngine([rule(field='containers[].image', threshold=5)], CONSTRAINTS, CONVERTERS)
+
+
+def test_ordering_operator_with_conversion_is_accepted():
+    engine = RuleEngine([rule(field='containers[].resources.limits.cpu', convert='cpu', constraint='max_cpu')],
+                        CONSTRAINTS, CONVERTERS)
+    assert engine.rules[0].threshold == 4.0
+
+
+def test_invalid_custom_rule_fails_when_the_analyzer_is_built():
+    with pytest.raises(ValueError, match="unknown placeholder"):
+        ACAAnalyzer(rules=[rule(issue="{foo}")])
@@ -0,0 +1,51 @@
+import json
+import os
+
+from click.testing import CliRunner
+
+from aca_assessor.cli import cli
+from aca_assessor.snapshots import iter_results
+
+
+def assess(*args: str):
+    return CliRunner().invoke(cli, ['assess', '--cluster-wide', '--raw', '--page-size', '20', *args])
+
+
+def test_save_snapshot(fake_api, tmp_path):
+    fake_api(deployments=300)
+    path = str(tmp_path / 'results.jsonl')
+
+    result = assess('--save-snapshot', path)
+
+    assert result.exit_code == 0, result.output
+    assert len(list(iter_results(path))) == 300
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_failed_collection_keeps_previous_snapshot(fake_api, tmp_path):
+    # Five pages of 20 are listed before the API server starts failing
+    fake_api(deployments=300, fail_after=5)
+    path = str(tmp_path / 'results.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'snapshot': 'aca-assessor-results', 'format': 1}) + '\n')
+    with open(path, 'rb') as f:
+        previous = f.read()
+
+    result = assess('--save-snapshot', path)
+
+    assert result.exit_code == 1
+    assert 'not saving the snapshot' in result.output
+    with open(path, 'rb') as f:
+        assert f.read() == previous
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_failed_collection_does_not_publish_new_snapshot(fake_api, tmp_path):
+    fake_api(deployments=300, fail_after=5)
+    path = str(tmp_path / 'partial.jsonl.gz')
+
+    result = assess('--output-format', 'ndjson', '--save-snapshot', path)
+
+    assert result.exit_code == 1
+    assert not os.path.exists(path)
+    assert not os.path.exists(f"{path}.tmp")
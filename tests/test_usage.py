@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from aca_assessor.inventory import CronJobIndex  # noqa: E402
+from aca_assessor.usage import UsageSampler, pod_owner  # noqa: E402
+
+
+def job(name: str, cronjob: str = None, namespace: str = 'batch') -> dict:
+    metadata = {'name': name, 'namespace': namespace}
+    if cronjob:
+        metadata['ownerReferences'] = [{'apiVersion': 'batch/v1', 'kind': 'CronJob', 'name': cronjob,
+                                        'controller': True}]
+    return {'kind': 'Job', 'metadata': metadata}
+
+
+def job_pod(job_name: str, namespace: str = 'batch', owned: bool = False) -> dict:
+    metadata = {'name': f"{job_name}-x7k2p", 'namespace': namespace,
+                'labels': {'job-name': job_name, 'controller-uid': 'b5c1'}}
+    if owned:
+        metadata['ownerReferences'] = [{'apiVersion': 'batch/v1', 'kind': 'Job', 'name': job_name,
+                                        'controller': True}]
+    return metadata
+
+
+def cronjob_index() -> CronJobIndex:
+    index = CronJobIndex()
+    index.add_cronjob('batch', 'nightly-report')
+    index.add_job(job('nightly-report-28512345', cronjob='nightly-report'))
+    index.add_job(job('backfill-2024'))
+    return index
+
+
+def test_cronjob_pod_is_attributed_to_its_cronjob():
+    index = cronjob_index()
+    assert pod_owner(job_pod('nightly-report-28512345', owned=True), index) == ('CronJob', 'nightly-report')
+    # PodMetrics carry labels but no owner references
+    assert pod_owner(job_pod('nightly-report-28512345'), index) == ('CronJob', 'nightly-report')
+
+
+def test_job_created_after_indexing_is_matched_by_name():
+    index = cronjob_index()
+    assert pod_owner(job_pod('nightly-report-28513785'), index) == ('CronJob', 'nightly-report')
+    # The suffix must be a schedule time, and the CronJob must be in the same namespace
+    assert pod_owner(job_pod('nightly-report-manual'), index) == ('Job', 'nightly-report-manual')
+    assert pod_owner(job_pod('nightly-report-28513785', namespace='other'), index) == \
+        ('Job', 'nightly-report-28513785')
+
+
+def test_job_without_cronjob_keeps_job_owner():
+    assert pod_owner(job_pod('backfill-2024'), cronjob_index()) == ('Job', 'backfill-2024')
+    assert pod_owner(job_pod('nightly-report-28512345')) == ('Job', 'nightly-report-28512345')
+
+
+def test_pod_owner_from_labels_and_references():
+    deployment_pod = {'name': 'web-6d4cf56db6-2xk9q', 'labels': {'pod-template-hash': '6d4cf56db6'}}
+    assert pod_owner(deployment_pod) == ('Deployment', 'web')
+    statefulset_pod = {'name': 'db-0', 'ownerReferences': [{'kind': 'StatefulSet', 'name': 'db', 'controller': True}]}
+    assert pod_owner(statefulset_pod) == ('StatefulSet', 'db')
+    assert pod_owner({'name': 'debug'}) is None
+
+
+def test_sampler_keys_cronjob_usage():
+    sampler = UsageSampler(seed=0, cronjobs=cronjob_index())
+    items = [{'metadata': job_pod(name), 'containers': [{'usage': {'cpu': '250m', 'memory': '256Mi'}}]}
+             for name in ('nightly-report-28512345', 'nightly-report-28513785')]
+    assert sampler.add_pod_metrics(items) == 2
+    assert list(sampler.workloads) == [('batch', 'CronJob', 'nightly-report')]
+    assert sampler.workloads[('batch', 'CronJob', 'nightly-report')].seen == 2